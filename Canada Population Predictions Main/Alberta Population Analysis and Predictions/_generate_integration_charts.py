@@ -1,16 +1,47 @@
 """
 Generates the 3 integration charts for Alberta Population vs Education Spending.
-Run from within the 'Alberta Population Analysis and Predictions' directory.
+
+Importable: every step is a function over preloaded frames, so one
+process can load the data once and build any number of charts and
+exports from it. Chart functions return the matplotlib Figure; nothing
+is written unless save_figure() / export_csv() is called.
+
+    python _generate_integration_charts.py              # CSV + charts
+    python _generate_integration_charts.py --csv-only   # CSV, no plotting imports
+    python _generate_integration_charts.py --prices real  # *_real.csv / *_real.png in CPI dollars
+
+    import _generate_integration_charts as ic
+    df  = ic.build_integration_df(ic.load_population(), ic.load_annual_spending())
+    fig = ic.plot_per_capita(df)
 """
+import argparse
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import seaborn as sns
+
+import data_store
+import profiling
+from lazy_modules import lazy_import
+from profiling import stage
+from statcan_data import load_population_table, PopulationMatrix
+from cpi_index import PRICES, price_label
+from spending_series import AnnualSpending, annual_frame, load_annual_spending
+from table_export import describe, write_table
+
+# Loaded on first use: --csv-only never imports the plotting stack.
+plt     = lazy_import('matplotlib.pyplot')
+mticker = lazy_import('matplotlib.ticker')
+mpatches = lazy_import('matplotlib.patches')
+sns     = lazy_import('seaborn')
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_CSV   = data_store.source('17100009.csv')
+BUDGET_DIR = data_store.source('budget_data')
+OUTPUT_CSV = SCRIPT_DIR / 'budget_data' / 'population_vs_spending.csv'
 
 # ── Dark infographic theme ───────────────────────────────────────────────────
-sns.set_theme(style='darkgrid', context='notebook', font_scale=1.15)
-plt.rcParams.update({
+THEME_RC = {
     'figure.facecolor': '#0D1117',
     'axes.facecolor':   '#161B22',
     'axes.edgecolor':   '#30363D',
@@ -22,202 +53,296 @@ plt.rcParams.update({
     'grid.alpha':       0.6,
     'font.family':      'sans-serif',
     'savefig.facecolor':'#0D1117',
-})
+}
 
 POP_COLOR  = '#F778BA'
 K12_COLOR  = '#58A6FF'
 PS_COLOR   = '#56D364'
 TOT_COLOR  = '#FFB703'
 
+EXPORT_COLS = [
+    'Fiscal_Year', 'Year', 'Flag', 'Population',
+    'K12_M', 'PostSec_M', 'Total_M',
+    'K12_PerCapita', 'PostSec_PerCapita', 'Total_PerCapita',
+    'Pop_Index', 'K12_Index', 'PostSec_Index', 'Total_Index',
+]
+
+
+def apply_theme():
+    sns.set_theme(style='darkgrid', context='notebook', font_scale=1.15)
+    plt.rcParams.update(THEME_RC)
+
+
+def style_legend(leg):
+    leg.get_frame().set_facecolor('#161B22')
+    for t in leg.get_texts():
+        t.set_color('#E6EDF3')
+
+
+def _short(path) -> str:
+    path = Path(path)
+    return f'{path.parent.name}/{path.name}'
+
+
+def save_figure(fig, path):
+    """Lay out fig, write it to path and close it."""
+    with stage('tight_layout', 'render'):
+        fig.tight_layout()
+    with stage('savefig', 'render', file=Path(path).name):
+        fig.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f'Saved -> {_short(path)}')
+
+
 # ── Population data ──────────────────────────────────────────────────────────
-pop_raw = pd.read_csv('17100009.csv')
-pop_raw['REF_DATE'] = pd.to_datetime(pop_raw['REF_DATE'])
-
-ab_pop = pop_raw[
-    (pop_raw['GEO'] == 'Alberta') &
-    (pop_raw['REF_DATE'].dt.month == 1) &
-    (pop_raw['REF_DATE'].dt.year.between(2012, 2025))
-][['REF_DATE', 'VALUE']].copy()
-ab_pop.columns = ['Date', 'Population']
-ab_pop['Year'] = ab_pop['Date'].dt.year
-ab_pop = ab_pop[['Year', 'Population']].reset_index(drop=True)
+
+def load_population(path=DATA_CSV) -> PopulationMatrix:
+    """17100009.csv as a GEO × quarter matrix, the same view regenerate_plots reads."""
+    return PopulationMatrix.from_frame(load_population_table(path))
+
 
 # ── Spending data + merge ────────────────────────────────────────────────────
-spending = pd.DataFrame([
-    {'Fiscal_Year': '2012-13', 'Year': 2012, 'K12_M': 6179,  'PostSec_M': 2856},
-    {'Fiscal_Year': '2013-14', 'Year': 2013, 'K12_M': 6210,  'PostSec_M': 2682},
-    {'Fiscal_Year': '2023-24', 'Year': 2023, 'K12_M': 8836,  'PostSec_M': 5604},
-    {'Fiscal_Year': '2024-25', 'Year': 2024, 'K12_M': 9252,  'PostSec_M': 6305},
-    {'Fiscal_Year': '2025-26', 'Year': 2025, 'K12_M': 9883,  'PostSec_M': 6635},
-])
-spending['Total_M'] = spending['K12_M'] + spending['PostSec_M']
-
-df = spending.merge(ab_pop, on='Year', how='left')
-df['K12_PerCapita']     = (df['K12_M']     * 1_000_000) / df['Population']
-df['PostSec_PerCapita'] = (df['PostSec_M'] * 1_000_000) / df['Population']
-df['Total_PerCapita']   = (df['Total_M']   * 1_000_000) / df['Population']
-
-base = df.iloc[0]
-df['Pop_Index']     = (df['Population']  / base['Population'])  * 100
-df['K12_Index']     = (df['K12_M']       / base['K12_M'])       * 100
-df['PostSec_Index'] = (df['PostSec_M']   / base['PostSec_M'])   * 100
-df['Total_Index']   = (df['Total_M']     / base['Total_M'])     * 100
+
+def build_integration_df(pop: PopulationMatrix, annual: AnnualSpending,
+                         prices: str = 'nominal') -> pd.DataFrame:
+    """
+    Every fiscal year from 2012-13 with Alberta's Q1 population,
+    per-capita and 2012-13 = 100 index columns (spending_series.annual_frame()).
+    prices='real' restates spending in the latest year's dollars (cpi_index.py).
+    """
+    return annual_frame(pop, annual, prices=prices)
+
+
+def growth_since_baseline(df: pd.DataFrame):
+    """(metric labels, % growth array) from the first to the last row of df."""
+    first, last = df.iloc[0], df.iloc[-1]
+    metrics = [
+        'Population',
+        'K-12 Spending',
+        'Post-Secondary\nSpending',
+        'Total Education\nSpending',
+    ]
+    cols = ['Population', 'K12_M', 'PostSec_M', 'Total_M']
+    pcts = (last[cols].to_numpy(dtype=float) / first[cols].to_numpy(dtype=float) - 1) * 100
+    return metrics, pcts
+
+
+def export_csv(df: pd.DataFrame, path=OUTPUT_CSV, parquet: bool = False):
+    """Write the export columns; files whose content is unchanged are not rewritten."""
+    with stage('write_csv', 'io', file=Path(path).name):
+        written = write_table(df[EXPORT_COLS], path, parquet=parquet)
+    print(f'Saved -> {Path(path).parent.name}/: {describe(written)}')
+
+
+def shade_interpolated(ax, x, df, alpha=0.07):
+    """
+    Shade and label the interpolated rows of df, drawn at positions x.
+    Returns whether there were any.
+    """
+    filled = (df['Flag'] == 'interpolated').to_numpy()
+    if not filled.any():
+        return False
+    xs, labels = np.asarray(x)[filled], df['Fiscal_Year'].to_numpy()[filled]
+    ax.axvspan(xs[0] - 0.5, xs[-1] + 0.5, alpha=alpha, color='#8B949E', zorder=1)
+    ax.text((xs[0] + xs[-1]) / 2, 0.95, f'Interpolated\n{labels[0]} - {labels[-1]}',
+            transform=ax.get_xaxis_transform(), ha='center', va='top', fontsize=11,
+            color='#8B949E', style='italic')
+    return True
+
 
 # ── CHART 1: Indexed Growth ──────────────────────────────────────────────────
-era1 = df[df['Year'].isin([2012, 2013])]
-era2 = df[df['Year'].isin([2023, 2024, 2025])]
-
-series = [
-    ('Pop_Index',     POP_COLOR, 'o', 'Population'),
-    ('K12_Index',     K12_COLOR, 's', 'K-12 Spending'),
-    ('PostSec_Index', PS_COLOR,  '^', 'Post-Secondary Spending'),
-    ('Total_Index',   TOT_COLOR, 'D', 'Total Education Spending'),
-]
 
-fig, ax = plt.subplots(figsize=(14, 7))
-
-for col, color, marker, label in series:
-    ax.plot(era1['Year'], era1[col], color=color, linewidth=3,
-            marker=marker, markersize=11, zorder=5, label=label)
-    ax.plot(era2['Year'], era2[col], color=color, linewidth=3,
-            marker=marker, markersize=11, zorder=5)
-
-ax.axhline(100, color='#8B949E', linewidth=1.2, linestyle='--',
-           alpha=0.55, label='2012-13 Baseline (= 100)')
-ax.axvspan(2013.4, 2022.6, alpha=0.07, color='#8B949E', zorder=1)
-ax.text(2018, 109, 'Data gap\n2014 - 2022', ha='center', fontsize=11,
-        color='#8B949E', style='italic')
-
-for col, color, _, _ in series:
-    val = df.iloc[-1][col]
-    ax.text(2025.25, val, f'{val:.0f}', color=color,
-            fontsize=10, fontweight='bold', va='center')
-
-ax.set_xlim(2011, 2027)
-ax.set_xticks(df['Year'].tolist())
-ax.set_xlabel('Calendar Year (Q1 population snapshot)', fontsize=13, labelpad=10)
-ax.set_ylabel('Index  (2012-13 = 100)', fontsize=13, labelpad=10)
-ax.set_title(
-    'Alberta: Population Growth vs. Education Spending\n'
-    'Indexed to 2012-13 = 100  |  Nominal figures',
-    fontsize=18, fontweight='bold', pad=20, color='white'
-)
-
-leg = ax.legend(fontsize=12, loc='upper left', framealpha=0.7, edgecolor='#30363D')
-leg.get_frame().set_facecolor('#161B22')
-for t in leg.get_texts():
-    t.set_color('#E6EDF3')
-
-sns.despine(left=True, bottom=True)
-plt.tight_layout()
-plt.savefig('budget_data/integration_indexed_growth.png', dpi=150, bbox_inches='tight')
-plt.close()
-print('Saved -> budget_data/integration_indexed_growth.png')
+def plot_indexed_growth(df: pd.DataFrame):
+    """Every fiscal year of an annual_frame(); interpolated spending is dashed."""
+    apply_theme()
+    years = df['Year'].to_numpy()
+    reported = (df['Flag'] != 'interpolated').to_numpy()
+
+    series = [
+        ('Pop_Index',     POP_COLOR, 'o', 'Population'),
+        ('K12_Index',     K12_COLOR, 's', 'K-12 Spending'),
+        ('PostSec_Index', PS_COLOR,  '^', 'Post-Secondary Spending'),
+        ('Total_Index',   TOT_COLOR, 'D', 'Total Education Spending'),
+    ]
+
+    fig, ax = plt.subplots(figsize=(14, 7))
+
+    for col, color, marker, label in series:
+        values = df[col].to_numpy()
+        if col == 'Pop_Index':
+            ax.plot(years, values, color=color, linewidth=3,
+                    marker=marker, markersize=9, zorder=5, label=label)
+            continue
+        # Solid between reported years, dashed through the interpolated ones.
+        ax.plot(years, values, color=color, linewidth=2, linestyle='--', alpha=0.6, zorder=4)
+        ax.plot(years, np.where(reported, values, np.nan), color=color, linewidth=3,
+                marker=marker, markersize=9, zorder=5, label=label)
+
+    ax.axhline(100, color='#8B949E', linewidth=1.2, linestyle='--',
+               alpha=0.55, label='2012-13 Baseline (= 100)')
+    if shade_interpolated(ax, years, df):
+        ax.plot([], [], color='#8B949E', linewidth=2, linestyle='--', alpha=0.6,
+                label='Spending, interpolated years')
+
+    for col, color, _, _ in series:
+        val = df.iloc[-1][col]
+        ax.text(years[-1] + 0.25, val, f'{val:.0f}', color=color,
+                fontsize=10, fontweight='bold', va='center')
+
+    ax.set_xlim(years[0] - 1, years[-1] + 2)
+    ax.set_xticks(years.tolist())
+    ax.set_xlabel('Calendar Year (Q1 population snapshot)', fontsize=13, labelpad=10)
+    ax.set_ylabel('Index  (2012-13 = 100)', fontsize=13, labelpad=10)
+    ax.set_title(
+        'Alberta: Population Growth vs. Education Spending\n'
+        f'Indexed to 2012-13 = 100  |  {price_label(df)}',
+        fontsize=18, fontweight='bold', pad=20, color='white'
+    )
+
+    style_legend(ax.legend(fontsize=12, loc='upper left', framealpha=0.7, edgecolor='#30363D'))
+    sns.despine(fig=fig, left=True, bottom=True)
+    return fig
+
 
 # ── CHART 2: Per-Capita Spending ─────────────────────────────────────────────
-labels = df['Fiscal_Year'].values
-x = np.arange(len(labels))
-w = 0.38
-
-fig, ax = plt.subplots(figsize=(14, 7))
-
-bars1 = ax.bar(x - w / 2, df['K12_PerCapita'],    w, label='K-12',
-               color=K12_COLOR, edgecolor='#0D1117', linewidth=1.5)
-bars2 = ax.bar(x + w / 2, df['PostSec_PerCapita'], w, label='Post-Secondary',
-               color=PS_COLOR,  edgecolor='#0D1117', linewidth=1.5)
-
-for bars, color in [(bars1, K12_COLOR), (bars2, PS_COLOR)]:
-    for bar in bars:
-        h = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width() / 2, h + 18,
-                f'${h:,.0f}', ha='center', va='bottom',
-                fontsize=9, fontweight='bold', color=color)
-
-gap_y = df['K12_PerCapita'].max() * 0.62
-ax.axvline(1.5, color='#8B949E', linewidth=1.2, linestyle=':', alpha=0.55)
-ax.text(1.5, gap_y, '9-year\ndata gap', ha='center', va='center',
-        fontsize=10, color='#8B949E', style='italic',
-        bbox=dict(boxstyle='round,pad=0.3', facecolor='#161B22',
-                  edgecolor='#30363D', alpha=0.85))
-
-ax.set_xticks(x)
-ax.set_xticklabels(labels, fontsize=12, fontweight='bold')
-ax.set_ylabel('Spending per Capita ($)', fontsize=13, labelpad=10)
-ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda v, _: f'${v:,.0f}'))
-ax.set_title(
-    'Alberta: Education Spending per Capita\n'
-    'K-12 vs Post-Secondary  |  Nominal figures',
-    fontsize=18, fontweight='bold', pad=20, color='white'
-)
-
-leg = ax.legend(fontsize=13, loc='upper left', framealpha=0.7, edgecolor='#30363D')
-leg.get_frame().set_facecolor('#161B22')
-for t in leg.get_texts():
-    t.set_color('#E6EDF3')
-
-sns.despine(left=True, bottom=True)
-plt.tight_layout()
-plt.savefig('budget_data/integration_per_capita.png', dpi=150, bbox_inches='tight')
-plt.close()
-print('Saved -> budget_data/integration_per_capita.png')
+
+def plot_per_capita(df: pd.DataFrame):
+    """Every fiscal year of an annual_frame(); interpolated years are hatched."""
+    apply_theme()
+    labels = df['Fiscal_Year'].values
+    x = np.arange(len(labels))
+    w = 0.38
+    filled = (df['Flag'] == 'interpolated').to_numpy()
+
+    fig, ax = plt.subplots(figsize=(16, 7))
+
+    for offset, col, color, label in [(-w / 2, 'K12_PerCapita',     K12_COLOR, 'K-12'),
+                                      ( w / 2, 'PostSec_PerCapita', PS_COLOR,  'Post-Secondary')]:
+        values = df[col].to_numpy()
+        # Reported and interpolated years are one container each, so each
+        # group is styled and labelled in a single call.
+        for mask, style in [(~filled, dict(label=label)),
+                            (filled,  dict(alpha=0.45, hatch='//'))]:
+            bars = ax.bar(x[mask] + offset, values[mask], w, color=color,
+                          edgecolor='#0D1117', linewidth=1.5, **style)
+            ax.bar_label(bars, fmt='${:,.0f}', padding=3, rotation=90,
+                         fontsize=8, fontweight='bold', color=color)
+
+    handles, _ = ax.get_legend_handles_labels()
+    if shade_interpolated(ax, x, df):
+        handles.append(mpatches.Patch(facecolor='#8B949E', alpha=0.45, hatch='//',
+                                      edgecolor='#0D1117', label='Interpolated years'))
+
+    ax.set_ylim(0, df[['K12_PerCapita', 'PostSec_PerCapita']].to_numpy().max() * 1.3)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, fontsize=11, fontweight='bold')
+    ax.set_ylabel('Spending per Capita ($)', fontsize=13, labelpad=10)
+    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda v, _: f'${v:,.0f}'))
+    ax.set_title(
+        'Alberta: Education Spending per Capita\n'
+        f'K-12 vs Post-Secondary  |  {price_label(df)}',
+        fontsize=18, fontweight='bold', pad=20, color='white'
+    )
+
+    style_legend(ax.legend(handles=handles, fontsize=13, loc='upper left',
+                           framealpha=0.7, edgecolor='#30363D'))
+    sns.despine(fig=fig, left=True, bottom=True)
+    return fig
+
 
 # ── CHART 3: Growth Rates Lollipop ───────────────────────────────────────────
-first, last = df.iloc[0], df.iloc[-1]
 
-metrics = [
-    'Population',
-    'K-12 Spending',
-    'Post-Secondary\nSpending',
-    'Total Education\nSpending',
-]
-pcts = [
-    (last['Population']  / first['Population']  - 1) * 100,
-    (last['K12_M']       / first['K12_M']        - 1) * 100,
-    (last['PostSec_M']   / first['PostSec_M']    - 1) * 100,
-    (last['Total_M']     / first['Total_M']      - 1) * 100,
-]
-colors = [POP_COLOR, K12_COLOR, PS_COLOR, TOT_COLOR]
-
-fig, ax = plt.subplots(figsize=(12, 6))
-y = np.arange(len(metrics))
-
-for i in range(len(metrics)):
-    ax.hlines(y[i], 0, pcts[i], color=colors[i], linewidth=4, alpha=0.85)
-    ax.scatter(pcts[i], y[i], color=colors[i], s=280, zorder=5,
-               edgecolor='#0D1117', linewidth=2)
-    ax.text(pcts[i] + 3, y[i], f'+{pcts[i]:.1f}%',
-            va='center', fontsize=14, fontweight='bold', color=colors[i])
-
-pop_pct = pcts[0]
-ax.axvline(pop_pct, color=POP_COLOR, linewidth=1.5, linestyle='--', alpha=0.45)
-ax.text(pop_pct + 1, len(metrics) - 0.55,
-        f'Population\ngrowth ({pop_pct:.1f}%)',
-        color=POP_COLOR, fontsize=9, alpha=0.85)
-
-ax.set_yticks(y)
-ax.set_yticklabels(metrics, fontsize=13, fontweight='bold')
-ax.set_xlabel('Growth from 2012-13 Baseline (%)', fontsize=13, labelpad=10)
-ax.set_xlim(-5, max(pcts) * 1.3)
-ax.set_title(
-    'Education Spending vs. Population Growth\n'
-    '2012-13 to 2025-26  |  Nominal figures',
-    fontsize=18, fontweight='bold', pad=20, color='white'
-)
-ax.axvline(0, color='#30363D', linewidth=1)
-
-sns.despine(left=True, bottom=True)
-plt.tight_layout()
-plt.savefig('budget_data/integration_growth_rates.png', dpi=150, bbox_inches='tight')
-plt.close()
-print('Saved -> budget_data/integration_growth_rates.png')
-
-# ── Export CSV ───────────────────────────────────────────────────────────────
-export_cols = [
-    'Fiscal_Year', 'Year', 'Population',
-    'K12_M', 'PostSec_M', 'Total_M',
-    'K12_PerCapita', 'PostSec_PerCapita', 'Total_PerCapita',
-    'Pop_Index', 'K12_Index', 'PostSec_Index', 'Total_Index',
+def plot_growth_rates(df: pd.DataFrame):
+    apply_theme()
+    metrics, pcts = growth_since_baseline(df)
+    colors = [POP_COLOR, K12_COLOR, PS_COLOR, TOT_COLOR]
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    y = np.arange(len(metrics))
+
+    # One collection for all stems and one for all heads.
+    ax.hlines(y, 0, pcts, colors=colors, linewidth=4, alpha=0.85)
+    ax.scatter(pcts, y, c=colors, s=280, zorder=5, edgecolor='#0D1117', linewidth=2)
+    for yi, pct, color in zip(y, pcts, colors):
+        ax.text(pct + 3, yi, f'+{pct:.1f}%',
+                va='center', fontsize=14, fontweight='bold', color=color)
+
+    pop_pct = pcts[0]
+    ax.axvline(pop_pct, color=POP_COLOR, linewidth=1.5, linestyle='--', alpha=0.45)
+    ax.text(pop_pct + 1, len(metrics) - 0.55,
+            f'Population\ngrowth ({pop_pct:.1f}%)',
+            color=POP_COLOR, fontsize=9, alpha=0.85)
+
+    ax.set_yticks(y)
+    ax.set_yticklabels(metrics, fontsize=13, fontweight='bold')
+    ax.set_xlabel('Growth from 2012-13 Baseline (%)', fontsize=13, labelpad=10)
+    ax.set_xlim(-5, max(pcts) * 1.3)
+    ax.set_title(
+        'Education Spending vs. Population Growth\n'
+        f'{df["Fiscal_Year"].iloc[0]} to {df["Fiscal_Year"].iloc[-1]}  |  {price_label(df)}',
+        fontsize=18, fontweight='bold', pad=20, color='white'
+    )
+    ax.axvline(0, color='#30363D', linewidth=1)
+
+    sns.despine(fig=fig, left=True, bottom=True)
+    return fig
+
+
+# (chart function, output PNG in budget_data/)
+CHARTS = [
+    (plot_indexed_growth, 'integration_indexed_growth.png'),
+    (plot_per_capita,     'integration_per_capita.png'),
+    (plot_growth_rates,   'integration_growth_rates.png'),
 ]
-df[export_cols].to_csv('budget_data/population_vs_spending.csv', index=False)
-print('Saved -> budget_data/population_vs_spending.csv')
-print('Done.')
+
+
+def output_name(filename, prices: str = 'nominal') -> str:
+    """filename, with a '_real' suffix on its stem for real-dollar output."""
+    path = Path(filename)
+    return path.name if prices == 'nominal' else f'{path.stem}_{prices}{path.suffix}'
+
+
+def render_charts(df: pd.DataFrame, out_dir=OUTPUT_CSV.parent, prices: str = 'nominal'):
+    """Build and save every chart in CHARTS from one build_integration_df() frame."""
+    for func, filename in CHARTS:
+        name = Path(filename).stem
+        with stage(name, 'chart'), profiling.cprofiled(name):
+            save_figure(func(df), Path(out_dir) / output_name(filename, prices))
+
+
+def build_from_sources(data_csv=DATA_CSV, budget_dir=BUDGET_DIR,
+                       prices: str = 'nominal') -> pd.DataFrame:
+    """Load both sources and return the integration frame."""
+    with stage('load_population', 'data'):
+        pop = load_population(data_csv)
+    with stage('load_annual_spending', 'data'):
+        annual = load_annual_spending(budget_dir)
+    with stage('derive_per_capita', 'data'):
+        return build_integration_df(pop, annual, prices)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Generate the 3 integration charts and population_vs_spending.csv.')
+    parser.add_argument('--csv-only', action='store_true',
+                        help='only write population_vs_spending.csv; skip the charts')
+    parser.add_argument('--parquet', action='store_true',
+                        help='also write population_vs_spending.parquet (needs pyarrow)')
+    parser.add_argument('--prices', choices=PRICES, default='nominal',
+                        help="nominal dollars, or 'real' for the latest year's dollars via "
+                             'the Alberta CPI, written as *_real.csv / *_real.png (default: nominal)')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args, '_generate_integration_charts')
+
+    df = build_from_sources(prices=args.prices)
+    export_csv(df, OUTPUT_CSV.with_name(output_name(OUTPUT_CSV, args.prices)),
+               parquet=args.parquet)
+    if not args.csv_only:
+        render_charts(df, prices=args.prices)
+    print('Done.')
+    profiling.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,100 +14,147 @@ Output columns:
     Canada_Population   – Canada-wide population as of Q1
     AB_Share_Pct        – Alberta's share of Canada's total population (%)
 
+The same metrics are also computed for every GEO in the table in one
+vectorized pass (build_all_geo_yoy) and exported in tidy long format,
+one row per GEO × Year, with National_Share_Pct in place of AB_Share_Pct.
+
 Data source: Statistics Canada, Table 17-10-0009-01
 """
 
+import argparse
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+import data_store
+import profiling
+from profiling import stage
+from statcan_data import load_population_table, PopulationMatrix
+from table_export import describe, write_table
+
 # ---------------------------------------------------------------------------
 # Configuration – resolve paths relative to this script's directory
 # ---------------------------------------------------------------------------
 SCRIPT_DIR = Path(__file__).resolve().parent
-DATA_PATH = SCRIPT_DIR / "17100009.csv"
+DATA_PATH = data_store.source("17100009.csv")
 START_YEAR = 2012
 END_YEAR = 2025
 OUTPUT_CSV = SCRIPT_DIR / "alberta_yoy_growth.csv"
+ALL_GEO_CSV = SCRIPT_DIR / "provincial_yoy_growth.csv"
+NATIONAL_GEO = "Canada"
 
 
 def load_raw_data(path: str) -> pd.DataFrame:
-    """Load the raw Statistics Canada CSV and parse the date column."""
-    df = pd.read_csv(path)
-    df["REF_DATE"] = pd.to_datetime(df["REF_DATE"], format="%Y-%m")
-    df["VALUE"] = pd.to_numeric(df["VALUE"], errors="coerce")
-    return df
+    """Load the Statistics Canada table (REF_DATE, GEO, VALUE) via the parsed-data cache."""
+    return load_population_table(path)
 
 
-def filter_q1_data(df: pd.DataFrame, geo: str, start: int, end: int) -> pd.DataFrame:
+def build_all_geo_yoy(
+    raw: pd.DataFrame, start: int = START_YEAR, end: int = END_YEAR
+) -> pd.DataFrame:
     """
-    Filter for Q1 (January) rows of a specific geography,
-    within the given year range (inclusive).
-    """
-    mask = (
-        (df["GEO"] == geo)
-        & (df["REF_DATE"].dt.month == 1)
-        & (df["REF_DATE"].dt.year >= start)
-        & (df["REF_DATE"].dt.year <= end)
-    )
-    return df.loc[mask].copy()
-
-
-def build_yoy_dataframe(raw: pd.DataFrame) -> pd.DataFrame:
-    """
-    Construct the year-over-year growth dataframe for Alberta,
-    enriched with Canada-level context.
+    Year-over-year metrics for every GEO at once, in tidy long format.
 
     Strategy:
-        1. Pull Q1-only rows for Alberta and Canada independently.
-        2. Merge on year so each row has both populations side-by-side.
-        3. Derive all growth and share columns from that merged set.
+        1. Pivot the table into a GEO × quarter matrix and take the
+           Q1 columns for [start, end] as a GEO × Year array.
+        2. Derive change, growth, cumulative growth and national share
+           as whole-array operations along the Year axis — no per-GEO
+           loop and no merge, since Canada is just another row.
+        3. Flatten to one row per GEO × Year, dropping years a GEO has
+           no estimate for (e.g. the pre-1991 Northwest Territories).
     """
-    # --- Alberta Q1 data ---
-    ab = filter_q1_data(raw, "Alberta", START_YEAR, END_YEAR)
-    ab["Year"] = ab["REF_DATE"].dt.year
-    ab = ab[["Year", "VALUE"]].rename(columns={"VALUE": "Population"})
-    ab = ab.sort_values("Year").reset_index(drop=True)
-
-    # --- Canada Q1 data (for national share calculation) ---
-    ca = filter_q1_data(raw, "Canada", START_YEAR, END_YEAR)
-    ca["Year"] = ca["REF_DATE"].dt.year
-    ca = ca[["Year", "VALUE"]].rename(columns={"VALUE": "Canada_Population"})
-    ca = ca.sort_values("Year").reset_index(drop=True)
-
-    # --- Merge Alberta + Canada on Year ---
-    yoy = pd.merge(ab, ca, on="Year", how="left")
-
-    # --- Year-over-year metrics ---
-    yoy["YoY_Change"] = yoy["Population"].diff()
-    yoy["YoY_Growth_Pct"] = yoy["Population"].pct_change() * 100
-
-    # --- Cumulative growth relative to the first year (2012) ---
-    base_pop = yoy["Population"].iloc[0]
-    yoy["Cumulative_Growth"] = yoy["Population"] - base_pop
-    yoy["Cumulative_Growth_Pct"] = ((yoy["Population"] - base_pop) / base_pop) * 100
-
-    # --- Alberta's share of Canada's population ---
-    yoy["AB_Share_Pct"] = (yoy["Population"] / yoy["Canada_Population"]) * 100
+    pop = PopulationMatrix.from_frame(raw)
+    years, q1 = pop.annual_matrix(month=1, start=start, end=f"{end}-12")
+
+    # --- Year-over-year change along the Year axis ---
+    change = np.full_like(q1, np.nan)
+    change[:, 1:] = q1[:, 1:] - q1[:, :-1]
+    growth_pct = np.full_like(q1, np.nan)
+    growth_pct[:, 1:] = change[:, 1:] / q1[:, :-1] * 100
+
+    # --- Cumulative growth relative to each GEO's first available year ---
+    first = np.argmax(~np.isnan(q1), axis=1)
+    base = q1[np.arange(len(q1)), first][:, None]
+    cumulative = q1 - base
+    cumulative_pct = cumulative / base * 100
+
+    # --- Share of the national total ---
+    national = q1[pop.row(NATIONAL_GEO)]
+    share_pct = q1 / national * 100
+
+    n_geo, n_year = q1.shape
+    tidy = pd.DataFrame({
+        "GEO": np.repeat(np.asarray(pop.geos, dtype=object), n_year),
+        "Year": np.tile(years, n_geo),
+        "Population": q1.ravel(),
+        "Canada_Population": np.tile(national, n_geo),
+        "YoY_Change": change.ravel(),
+        "YoY_Growth_Pct": growth_pct.ravel(),
+        "Cumulative_Growth": cumulative.ravel(),
+        "Cumulative_Growth_Pct": cumulative_pct.ravel(),
+        "National_Share_Pct": share_pct.ravel(),
+    })
+    tidy = tidy.dropna(subset=["Population"]).reset_index(drop=True)
+
+    int_cols = ["Population", "Canada_Population", "Cumulative_Growth"]
+    tidy[int_cols] = tidy[int_cols].astype("int64")
+    pct_cols = ["YoY_Growth_Pct", "Cumulative_Growth_Pct", "National_Share_Pct"]
+    tidy[pct_cols] = tidy[pct_cols].round(2)
+    return tidy
+
+
+def select_geo(tidy: pd.DataFrame, geo: str) -> pd.DataFrame:
+    """
+    Slice one GEO out of build_all_geo_yoy's output, laid out with the
+    historical alberta_yoy_growth.csv columns.
+    """
+    yoy = tidy.loc[tidy["GEO"] == geo].drop(columns="GEO")
+    yoy = yoy.rename(columns={"National_Share_Pct": "AB_Share_Pct"})
+    return yoy[[
+        "Year", "Population", "Canada_Population", "YoY_Change", "YoY_Growth_Pct",
+        "Cumulative_Growth", "Cumulative_Growth_Pct", "AB_Share_Pct",
+    ]].reset_index(drop=True)
 
-    # --- Round percentages for readability ---
-    pct_cols = ["YoY_Growth_Pct", "Cumulative_Growth_Pct", "AB_Share_Pct"]
-    yoy[pct_cols] = yoy[pct_cols].round(2)
 
-    return yoy
+def build_yoy_dataframe(raw: pd.DataFrame, geo: str = "Alberta") -> pd.DataFrame:
+    """
+    Construct the year-over-year growth dataframe for one province
+    (Alberta by default), enriched with Canada-level context.
+    """
+    return select_geo(build_all_geo_yoy(raw), geo)
 
 
-def main():
+def main(argv=None):
     """Entry point: load, transform, display, and export."""
-    raw = load_raw_data(DATA_PATH)
-    yoy = build_yoy_dataframe(raw)
+    parser = argparse.ArgumentParser(description="Export Alberta and all-GEO YoY growth CSVs.")
+    parser.add_argument("--parquet", action="store_true",
+                        help="also write a .parquet copy of each CSV (needs pyarrow)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args, "alberta_yoy_growth")
+
+    with stage("load_raw_data", "data"):
+        raw = load_raw_data(DATA_PATH)
+    with stage("build_all_geo_yoy", "data"):
+        all_geo = build_all_geo_yoy(raw)
+    with stage("select_geo", "data"):
+        yoy = select_geo(all_geo, "Alberta")
 
     # Pretty-print to console (with comma-formatted numbers)
     print("\n=== Alberta Year-over-Year Population Growth (2012–2025) ===\n")
     print(yoy.to_string(index=False))
 
-    # Export to CSV alongside the source data
-    yoy.to_csv(OUTPUT_CSV, index=False)
-    print(f"\n✅ Exported to {OUTPUT_CSV}")
+    # Export alongside the source data; unchanged files are left alone
+    with stage("write_csv", "io", file=OUTPUT_CSV.name):
+        written = write_table(yoy, OUTPUT_CSV, parquet=args.parquet)
+    print(f"\n✅ Exported to {OUTPUT_CSV.parent}: {describe(written)}")
+
+    with stage("write_csv", "io", file=ALL_GEO_CSV.name):
+        written = write_table(all_geo, ALL_GEO_CSV, parquet=args.parquet)
+    print(f"✅ Exported {all_geo['GEO'].nunique()} geographies: {describe(written)}")
+    profiling.finish()
 
 
 if __name__ == "__main__":
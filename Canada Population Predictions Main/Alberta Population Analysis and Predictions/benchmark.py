@@ -0,0 +1,296 @@
+"""
+benchmark.py
+────────────
+Times each stage of the population / spending pipeline on its own:
+loading 17100009.csv, the YoY and integration builders, and every one
+of the 13 plot_* functions.
+
+Each stage runs against the shipped table and against synthetic copies
+scaled by repeating every row under renamed geographies ('Alberta #2',
+...), so the quarter grid stays the same while the table grows 100× or
+1000×. Synthetic CSVs are written once to .cache/bench/ and reused.
+
+The cold import time of each module is measured too, in a fresh
+interpreter per run, along with whether it loaded matplotlib/seaborn.
+
+Results are written as JSON (one record per scale × stage, with every
+run's seconds plus min/median) so runs can be compared across commits.
+
+Usage:
+    python benchmark.py                           # scales 1, 100, 1000
+    python benchmark.py --scales 1 100 --repeat 5
+    python benchmark.py --stages 'load_*' 'build_*'
+    python benchmark.py --compare .cache/bench/results/<earlier run>.json
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import alberta_yoy_growth as yoy
+import regenerate_plots as rp
+from statcan_data import DATA_CSV, load_population_table, parse_population_csv
+
+SCRIPT_DIR  = Path(__file__).resolve().parent
+BENCH_DIR   = SCRIPT_DIR / '.cache' / 'bench'
+RESULTS_DIR = BENCH_DIR / 'results'
+
+DEFAULT_SCALES = [1, 100, 1000]
+DEFAULT_REPEAT = 3
+DEFAULT_WARMUP = 1
+
+
+# ── Synthetic tables ─────────────────────────────────────────────────────────
+
+def scaled_csv(scale: int, source: Path = DATA_CSV) -> Path:
+    """
+    source with every data row repeated `scale` times; copy k > 1 has its
+    GEO renamed '<GEO> #k'. Written once per scale and reused.
+    """
+    if scale == 1:
+        return source
+    out = BENCH_DIR / f'{source.stem}_x{scale}.csv'
+    if out.exists():
+        return out
+
+    header, *lines = source.read_text(encoding='utf-8-sig').splitlines()
+    # '"REF_DATE","GEO",rest' -> (date field, GEO without quotes, rest)
+    rows = []
+    for line in lines:
+        date, geo, rest = line.split(',', 2)
+        rows.append((date, geo.strip('"'), rest))
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(header + '\n')
+        fh.writelines(line + '\n' for line in lines)
+        for k in range(2, scale + 1):
+            fh.writelines(f'{date},"{geo} #{k}",{rest}\n' for date, geo, rest in rows)
+    os.replace(tmp, out)
+    return out
+
+
+# ── Stages ───────────────────────────────────────────────────────────────────
+
+def stages(csv: Path):
+    """
+    (name, func) for every benchmarked stage, in pipeline order. Each
+    func takes a shared state dict, reads its inputs from it and stores
+    its output for the stages after it.
+    """
+    out = [
+        ('load_population[parse]',  lambda s: s.update(raw=parse_population_csv(csv))),
+        ('load_population',         lambda s: s.update(raw=load_population_table(csv))),
+        ('load_raw_data',           lambda s: s.update(raw=yoy.load_raw_data(csv))),
+        ('build_population_matrix', lambda s: s.update(pop=rp.build_population_matrix(s['raw']))),
+        ('build_yoy_dataframe',     lambda s: s.update(yoy=yoy.build_yoy_dataframe(s['raw']))),
+        ('build_all_geo_yoy',       lambda s: s.update(all_yoy=yoy.build_all_geo_yoy(
+                                        s['raw'], yoy.START_YEAR, yoy.END_YEAR))),
+        ('load_spending',           lambda s: s.update(spending=rp.load_spending())),
+        ('build_education_df',      lambda s: s.update(zip(('headline', 'growth'),
+                                                           rp.build_education_df(s['spending'])))),
+        ('load_annual_spending',    lambda s: s.update(annual=rp.load_annual_spending(rp.BUDGET_DIR))),
+        ('build_integrated_df',     lambda s: s.update(df_int=rp.build_integrated_df(s['pop'], s['annual']))),
+    ]
+
+    def chart(name, inputs):
+        return lambda s: getattr(rp, name)(*(s[k] for k in inputs))
+
+    out += [(name, chart(name, inputs)) for _, name, inputs, _ in rp.CHART_JOBS]
+    return out
+
+
+def time_stage(func, state: dict, repeat: int, warmup: int = 0):
+    """Seconds for each of `repeat` calls, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        func(state)
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(state)
+        runs.append(time.perf_counter() - t0)
+    return runs
+
+
+def run_benchmarks(scales, repeat=DEFAULT_REPEAT, patterns=None, warmup=DEFAULT_WARMUP):
+    """
+    Benchmark records for every selected stage at every scale. Warm-up
+    calls fill the on-disk caches (parsed CSV, budget extracts) and
+    matplotlib's font cache, so timed runs measure steady state; the
+    uncached CSV parse is its own stage.
+    """
+    records = []
+    with tempfile.TemporaryDirectory() as plots_dir:
+        # Charts are written to a scratch directory, never over plots/.
+        rp.PLOTS_DIR = Path(plots_dir)
+        rp.matplotlib.use('Agg')
+        rp.apply_theme()
+        for scale in scales:
+            csv = scaled_csv(scale)
+            rows = sum(1 for _ in open(csv, 'rb')) - 1
+            print(f'\n--- scale {scale}× ({rows:,d} rows) ---')
+            state = {}
+            for name, func in stages(csv):
+                # Prerequisites always run once so later stages have inputs,
+                # but only selected stages are timed and reported.
+                selected = not patterns or any(fnmatch.fnmatch(name, p) for p in patterns)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if selected:
+                        runs = time_stage(func, state, repeat, warmup)
+                    else:
+                        func(state)
+                if not selected:
+                    continue
+                record = {'scale': scale, 'rows': rows, 'stage': name,
+                          'runs': runs, 'min': min(runs), 'median': statistics.median(runs)}
+                records.append(record)
+                print(f'  {name:<36s} min {record["min"]:8.4f}s  median {record["median"]:8.4f}s')
+    return records
+
+
+# ── Startup ──────────────────────────────────────────────────────────────────
+
+# Module imports timed in a fresh interpreter. The data-only modules must
+# not pull in the plotting stack; the last entry is its cost for reference.
+STARTUP_IMPORTS = [
+    'statcan_data',
+    'budget_extract',
+    'budget_ingest',
+    'alberta_yoy_growth',
+    'regenerate_plots',
+    '_generate_integration_charts',
+    'matplotlib.pyplot, seaborn',
+]
+
+_STARTUP_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {modules}
+print(time.perf_counter() - t0, 'matplotlib' in sys.modules, 'seaborn' in sys.modules)
+"""
+
+
+def time_startup(modules: str):
+    """(seconds, plotting stack loaded?) for importing modules in a new process."""
+    out = subprocess.run([sys.executable, '-c', _STARTUP_PROBE.format(modules=modules)],
+                         cwd=SCRIPT_DIR, capture_output=True, text=True, check=True)
+    secs, mpl, sns = out.stdout.split()
+    return float(secs), mpl == 'True' or sns == 'True'
+
+
+def run_startup(repeat=DEFAULT_REPEAT, patterns=None):
+    """Benchmark records for the cold import time of each STARTUP_IMPORTS entry."""
+    records = []
+    print('\n--- startup (fresh interpreter per run) ---')
+    for modules in STARTUP_IMPORTS:
+        name = f'startup[{modules}]'
+        if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        runs, plotting = [], False
+        for _ in range(repeat):
+            secs, plotting = time_startup(modules)
+            runs.append(secs)
+        records.append({'scale': 1, 'rows': None, 'stage': name, 'runs': runs,
+                        'min': min(runs), 'median': statistics.median(runs),
+                        'plotting_loaded': plotting})
+        print(f'  {name:<36s} min {min(runs):8.4f}s  median {statistics.median(runs):8.4f}s'
+              + ('  (loads matplotlib/seaborn)' if plotting else ''))
+    return records
+
+
+# ── Results ──────────────────────────────────────────────────────────────────
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import matplotlib
+    import seaborn
+
+    return {
+        'commit':     _git_commit(),
+        'timestamp':  datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python':     platform.python_version(),
+        'platform':   platform.platform(),
+        'cpu_count':  os.cpu_count(),
+        'packages':   {'numpy': np.__version__, 'pandas': pd.__version__,
+                       'matplotlib': matplotlib.__version__, 'seaborn': seaborn.__version__},
+    }
+
+
+def save_results(records, repeat, warmup, path=None) -> Path:
+    meta = environment()
+    if path is None:
+        stamp = meta['timestamp'].replace(':', '').replace('-', '')[:15]
+        path = RESULTS_DIR / f'{stamp}_{meta["commit"] or "nogit"}.json'
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'meta': {**meta, 'repeat': repeat, 'warmup': warmup}, 'results': records}, indent=2))
+    return path
+
+
+def compare(records, baseline_path):
+    """Print median time of this run against a saved run, stage by stage."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    before = {(r['scale'], r['stage']): r['median'] for r in baseline['results']}
+    print(f'\n--- vs {baseline["meta"].get("commit")} ({Path(baseline_path).name}) ---')
+    for r in records:
+        old = before.get((r['scale'], r['stage']))
+        if old is None:
+            continue
+        ratio = old / r['median'] if r['median'] else float('inf')
+        print(f'  {r["scale"]:>5d}×  {r["stage"]:<36s} '
+              f'{old:8.4f}s -> {r["median"]:8.4f}s  ({ratio:5.2f}×)')
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark each stage of the pipeline.')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='row multipliers of 17100009.csv (default: 1 100 1000)')
+    parser.add_argument('--repeat', '-r', type=int, default=DEFAULT_REPEAT,
+                        help=f'timed runs per stage (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'untimed runs per stage first (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--stages', nargs='+', metavar='PATTERN',
+                        help="only time stages matching these globs, e.g. 'plot_*'")
+    parser.add_argument('--output', '-o', type=Path,
+                        help='results JSON (default: .cache/bench/results/<time>_<commit>.json)')
+    parser.add_argument('--compare', type=Path, metavar='JSON',
+                        help='print speed-ups against an earlier results file')
+    args = parser.parse_args(argv)
+
+    records = run_startup(args.repeat, args.stages)
+    records += run_benchmarks(args.scales, args.repeat, args.stages, args.warmup)
+    out = save_results(records, args.repeat, args.warmup, args.output)
+    print(f'\nResults: {out}')
+    if args.compare:
+        compare(records, args.compare)
+
+
+if __name__ == '__main__':
+    main()
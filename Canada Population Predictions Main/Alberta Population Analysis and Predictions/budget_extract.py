@@ -0,0 +1,338 @@
+"""
+budget_extract.py
+─────────────────
+Extracts Alberta education operating expense (K-12 and post-secondary)
+from the Budget Fiscal Plans in budget_data/.
+
+Each expense_tables_20XX-YY.xlsx has an "Expense Summary" sheet with a
+fiscal-year header row, a Budget/Actual/Forecast/Estimate/Target row
+under it, and one line each for K-12 and post-secondary. The parsed
+rows of every workbook are cached in the shared cache's budget/
+(data_store.CACHE_DIR) under the workbook's SHA-256, shared by every
+copy of the workbook in the checkout, so openpyxl only runs when a workbook is new or
+has changed.
+
+The 2012 and 2013 budgets exist only as fiscal_plan_20XX-YY.pdf. Their
+"Operating Expense" by-ministry table (2012 p. 114, 2013 p. 133) is
+found through a page/keyword index built once per PDF; after that only
+the indexed candidate pages are parsed. Index and parsed rows are
+cached under the PDF's SHA-256 like the workbooks.
+
+Usage:
+    from budget_extract import load_education_spending, headline_spending
+    rows     = load_education_spending()   # every Actual/Budget/.../Target row
+    headline = headline_spending()         # one Estimate row per budget year
+"""
+
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+import data_store
+from statcan_data import atomic_write_bytes, file_fingerprint
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BUDGET_DIR = data_store.source('budget_data')
+CACHE_DIR  = data_store.CACHE_DIR / 'budget'
+
+# Bump when the extraction rules or the cached layout change.
+CACHE_VERSION = 1
+
+COLUMNS = [
+    'Budget_Year', 'Fiscal_Year', 'Type',
+    'K12_Operating_Expense', 'PostSecondary_Operating_Expense',
+    'Source', 'Total_Education_Expense',
+]
+
+# Budget documents report the same year several times (the Actual of a
+# past year, this year's Estimate, next year's Forecast, ...). When two
+# figures for one year compete, the lower rank wins: an outturn beats the
+# amount voted for the year, which beats any projection of it. The
+# reconcilers in spending_series.py and cpi_index.py both use this order.
+TYPE_RANK = {'Actual': 0, 'Estimate': 1, 'Forecast': 2, 'Budget': 3, 'Target': 4}
+
+_FISCAL_YEAR = re.compile(r'^\d{4}-\d{2}$')
+_BUDGET_YEAR = re.compile(r'Budget\s+(\d{4})')
+_K12_LABEL   = re.compile(r'kindergarten|kinder\b|k-12|grade 12|gr\. 12', re.I)
+_PSEC_LABEL  = re.compile(r'post-sec|advanced ed', re.I)
+
+# PDF fiscal plans: the by-ministry table title, the ministry lines that
+# carry K-12 and post-secondary, and the words a candidate page must contain.
+_PDF_TABLE_TITLE = re.compile(r'^Operating Expense\s*a?\s*$')
+_PDF_K12_LINE    = re.compile(r'^Education\s+(?=[\d(-])')
+_PDF_PSEC_LINE   = re.compile(r'^(?:Enterprise and )?Advanced Education(?: and Technology)?\s+(?=[\d(-])')
+_PDF_NUMBER      = re.compile(r'\(?[\d,]+\)?|-')
+PDF_INDEX_KEYWORDS = ['operating expense', 'actual', 'estimate', 'advanced education']
+
+# Transcribed headline estimates for the PDF-only budgets, used when
+# pypdf is not installed and no parsed copy is cached yet.
+PDF_HEADLINE = [
+    {'Budget_Year': 'Budget 2012', 'Fiscal_Year': '2012-13', 'Type': 'Estimate',
+     'K12_Operating_Expense': 6179, 'PostSecondary_Operating_Expense': 2856, 'Source': 'PDF'},
+    {'Budget_Year': 'Budget 2013', 'Fiscal_Year': '2013-14', 'Type': 'Estimate',
+     'K12_Operating_Expense': 6210, 'PostSecondary_Operating_Expense': 2682, 'Source': 'PDF'},
+]
+
+
+# ── Workbook parsing ─────────────────────────────────────────────────────────
+
+def _summary_rows(path: Path):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = next(ws for ws in wb.worksheets if ws.title.startswith('Expense Summary'))
+        return [tuple(row) for row in sheet.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def _label(cell) -> str:
+    return str(cell).strip() if cell is not None else ''
+
+
+def _is_amount(cell) -> bool:
+    return isinstance(cell, (int, float)) and not isinstance(cell, bool) and cell == cell
+
+
+def extract_expense_workbook(path) -> pd.DataFrame:
+    """
+    Parse one expense_tables workbook into COLUMNS rows, one per
+    fiscal-year column of the Expense Summary sheet.
+
+    A fiscal year shown twice (Budget then Forecast) is written once in
+    the header, so the year is carried forward and the second column is
+    labelled 'YYYY-YY (F)', matching education_spending_comparison.csv.
+    A column whose K-12 or post-secondary cell is blank is skipped.
+    """
+    path = Path(path)
+    rows = _summary_rows(path)
+
+    title = next((_label(r[0]) for r in rows if _BUDGET_YEAR.search(_label(r[0]))), '')
+    match = _BUDGET_YEAR.search(title) or _BUDGET_YEAR.search(path.stem.replace('_', ' '))
+    if match is None:
+        raise ValueError(f'{path.name}: cannot tell which budget year this is')
+    budget_year = f'Budget {match.group(1)}'
+
+    header_idx = next(i for i, r in enumerate(rows)
+                      if any(_FISCAL_YEAR.match(_label(c)) for c in r))
+    years, types = rows[header_idx], rows[header_idx + 1]
+
+    columns, current = [], None
+    for col, (year, kind) in enumerate(zip(years, types)):
+        if _FISCAL_YEAR.match(_label(year)):
+            current, repeat = _label(year), False
+        elif _label(kind) and current is not None:
+            repeat = True
+        else:
+            continue
+        fiscal = f'{current} (F)' if repeat else current
+        columns.append((col, fiscal, _label(kind)))
+
+    def find_line(pattern):
+        for r in rows[header_idx + 2:]:
+            if pattern.search(_label(r[0])) and any(isinstance(v, (int, float)) for v in r[1:]):
+                return r
+        raise ValueError(f'{path.name}: no line matching {pattern.pattern!r}')
+
+    k12, psec = find_line(_K12_LABEL), find_line(_PSEC_LABEL)
+    out = pd.DataFrame([{
+        'Budget_Year': budget_year,
+        'Fiscal_Year': fiscal,
+        'Type': kind,
+        'K12_Operating_Expense': round(k12[col]),
+        'PostSecondary_Operating_Expense': round(psec[col]),
+        'Source': 'Excel',
+    } for col, fiscal, kind in columns
+      if _is_amount(k12[col]) and _is_amount(psec[col])], columns=COLUMNS[:-1])
+    out['Total_Education_Expense'] = (out['K12_Operating_Expense']
+                                      + out['PostSecondary_Operating_Expense'])
+    return out[COLUMNS]
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _cached_json(path: Path, kind: str, version: int, build):
+    """Load CACHE_DIR/{sha256}.{kind}.json for path, or build() and store it."""
+    sha = file_fingerprint(path)['sha256']
+    cached = CACHE_DIR / f'{sha}.{kind}.json'
+    try:
+        payload = json.loads(cached.read_text())
+        if payload.get('version') == version:
+            return payload['data']
+    except (OSError, ValueError):
+        pass
+    data = build()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {'version': version, 'source': path.name, 'data': data}
+    atomic_write_bytes(cached, lambda fh: fh.write(json.dumps(payload, indent=2).encode()))
+    return data
+
+
+def load_expense_workbook(path, use_cache: bool = True) -> pd.DataFrame:
+    """extract_expense_workbook(), memoised on disk by the workbook's SHA-256."""
+    path = Path(path)
+    if not use_cache:
+        return extract_expense_workbook(path)
+    rows = _cached_json(path, 'rows', CACHE_VERSION,
+                        lambda: extract_expense_workbook(path).to_dict(orient='records'))
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+# ── PDF fiscal plans ─────────────────────────────────────────────────────────
+
+def build_page_index(path) -> dict:
+    """
+    {keyword: [1-based page numbers]} for PDF_INDEX_KEYWORDS. This is
+    the one full-document text pass; it is cached per PDF and survives
+    changes to the table-parsing rules.
+    """
+    import pypdf
+
+    index = {kw: [] for kw in PDF_INDEX_KEYWORDS}
+    for number, page in enumerate(pypdf.PdfReader(path).pages, start=1):
+        text = (page.extract_text() or '').lower()
+        for kw in PDF_INDEX_KEYWORDS:
+            if kw in text:
+                index[kw].append(number)
+    return index
+
+
+def load_page_index(path) -> dict:
+    path = Path(path)
+    return _cached_json(path, 'pages', 1, lambda: build_page_index(path))
+
+
+def _pdf_numbers(text: str):
+    values = []
+    for token in _PDF_NUMBER.findall(text):
+        if token == '-':
+            values.append(0)
+        else:
+            value = int(token.strip('()').replace(',', ''))
+            values.append(-value if token.startswith('(') else value)
+    return values
+
+
+def _parse_operating_table(lines):
+    """
+    Columns and K-12 / post-secondary values from the "Operating Expense"
+    by-ministry table on one page, or None if the page lacks that table.
+    """
+    for i, line in enumerate(lines[:-1]):
+        years = line.split()
+        if len(years) < 3 or not all(_FISCAL_YEAR.match(y) for y in years):
+            continue
+        title_at = i - 2 if lines[i - 1].lstrip().startswith('(millions') else i - 1
+        if title_at < 0 or not _PDF_TABLE_TITLE.match(lines[title_at].strip()):
+            continue
+        types = lines[i + 1].split()
+        if len(types) != len(years) or 'Actual' not in types:
+            continue
+
+        found = {}
+        for body in lines[i + 2:]:
+            body = body.strip()
+            if body.startswith('Total Operating Expense'):
+                break
+            for key, pattern in (('k12', _PDF_K12_LINE), ('psec', _PDF_PSEC_LINE)):
+                m = pattern.match(body)
+                if m and key not in found:
+                    values = _pdf_numbers(body[m.end():])
+                    if len(values) == len(years):
+                        found[key] = values
+        if len(found) == 2:
+            return years, types, found['k12'], found['psec']
+    return None
+
+
+def extract_fiscal_plan(path) -> pd.DataFrame:
+    """
+    Parse the by-ministry Operating Expense table of one fiscal plan PDF
+    into COLUMNS rows. Only pages the keyword index flags are opened.
+    """
+    import pypdf
+
+    path = Path(path)
+    match = re.search(r'fiscal_plan_(\d{4})', path.name)
+    if match is None:
+        raise ValueError(f'{path.name}: cannot tell which budget year this is')
+    budget_year = f'Budget {match.group(1)}'
+
+    index = load_page_index(path)
+    candidates = set.intersection(*(set(index[kw]) for kw in PDF_INDEX_KEYWORDS))
+    reader = pypdf.PdfReader(path)
+    for number in sorted(candidates):
+        table = _parse_operating_table((reader.pages[number - 1].extract_text() or '').splitlines())
+        if table is not None:
+            break
+    else:
+        raise ValueError(f'{path.name}: no Operating Expense by-ministry table found')
+
+    years, types, k12, psec = table
+    rows, seen = [], set()
+    for year, kind, k, p in zip(years, types, k12, psec):
+        fiscal = f'{year} (F)' if year in seen else year
+        seen.add(year)
+        rows.append({'Budget_Year': budget_year, 'Fiscal_Year': fiscal, 'Type': kind,
+                     'K12_Operating_Expense': k, 'PostSecondary_Operating_Expense': p,
+                     'Source': 'PDF'})
+    out = pd.DataFrame(rows)
+    out['Total_Education_Expense'] = (out['K12_Operating_Expense']
+                                      + out['PostSecondary_Operating_Expense'])
+    return out[COLUMNS]
+
+
+def load_fiscal_plan(path, use_cache: bool = True) -> pd.DataFrame:
+    """extract_fiscal_plan(), memoised on disk by the PDF's SHA-256."""
+    path = Path(path)
+    if not use_cache:
+        return extract_fiscal_plan(path)
+    rows = _cached_json(path, 'rows', CACHE_VERSION,
+                        lambda: extract_fiscal_plan(path).to_dict(orient='records'))
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+# ── Combined tables ──────────────────────────────────────────────────────────
+
+def load_education_spending(budget_dir=BUDGET_DIR, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Every extracted row from every fiscal plan PDF and expense workbook.
+    Without pypdf, a PDF that has no cached parse contributes its
+    transcribed PDF_HEADLINE row instead.
+    """
+    frames = []
+    for path in sorted(Path(budget_dir).glob('*/fiscal_plan_*.pdf')):
+        try:
+            frames.append(load_fiscal_plan(path, use_cache))
+        except ImportError:
+            year = re.search(r'fiscal_plan_(\d{4})', path.name).group(1)
+            fallback = pd.DataFrame([r for r in PDF_HEADLINE if r['Budget_Year'] == f'Budget {year}'])
+            fallback['Total_Education_Expense'] = (fallback['K12_Operating_Expense']
+                                                   + fallback['PostSecondary_Operating_Expense'])
+            frames.append(fallback)
+    for path in sorted(Path(budget_dir).glob('*/expense_tables_*.xlsx')):
+        frames.append(load_expense_workbook(path, use_cache))
+    return pd.concat(frames, ignore_index=True)[COLUMNS]
+
+
+def headline_spending(budget_dir=BUDGET_DIR, use_cache: bool = True) -> pd.DataFrame:
+    """
+    One headline (Estimate) row per budget year, in the
+    Budget_Year / Fiscal_Year / Year / K12_M / PostSec_M / Total_M
+    layout the charts use. Year is the fiscal year's starting calendar
+    year, which is aligned with that year's Q1 population.
+    """
+    rows = load_education_spending(budget_dir, use_cache)
+    est = rows[rows['Type'] == 'Estimate'].sort_values('Fiscal_Year')
+    out = pd.DataFrame({
+        'Budget_Year': est['Budget_Year'],
+        'Fiscal_Year': est['Fiscal_Year'],
+        'Year':        est['Fiscal_Year'].str[:4].astype(int),
+        'K12_M':       est['K12_Operating_Expense'].astype(int),
+        'PostSec_M':   est['PostSecondary_Operating_Expense'].astype(int),
+    })
+    out['Total_M'] = out['K12_M'] + out['PostSec_M']
+    return out.reset_index(drop=True)
@@ -0,0 +1,329 @@
+"""
+budget_ingest.py
+────────────────
+Bulk ingestion of every Budget workbook in budget_data/ (capital plan,
+economic outlook, expense, other, revenue and tax plan tables) into one
+long-format fact table:
+
+    budget_year | table | line_item | fiscal_year | type | value
+
+Every sheet with a row of fiscal-year ('2024-25') or calendar-year
+('2024') column headers is read; cover pages and chart-only sheets have
+no such row and are skipped. Workbooks are parsed concurrently on a
+process pool, each one cached in the shared budget cache under its SHA-256 like
+budget_extract.py, and the combined table is written to
+budget_data/budget_facts.parquet (a compressed .npz when pyarrow is
+missing). The stored table records a key over the SHA-256 of every
+workbook it was built from; load_budget_facts() rebuilds it, quietly,
+when a workbook has been added, removed or changed since.
+
+Usage:
+    python budget_ingest.py            # one worker per CPU
+    python budget_ingest.py --jobs 1   # serial, in-process
+
+    from budget_ingest import load_budget_facts
+    facts = load_budget_facts()
+    facts[facts['line_item'].str.startswith('Alberta Consumer Price Index')]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from budget_extract import BUDGET_DIR, _cached_json, _label
+from data_store import sha256
+from statcan_data import atomic_write_bytes
+
+FACTS_PATH = BUDGET_DIR / 'budget_facts.parquet'
+
+# Bump when the sheet-normalisation rules change.
+CACHE_VERSION = 1
+
+COLUMNS = ['budget_year', 'table', 'line_item', 'fiscal_year', 'type', 'value']
+TEXT_COLUMNS = COLUMNS[:-1]
+
+WORKBOOK_GLOB = '*/*_tables_*.xlsx'
+
+# '2024-25', 2024, '2017-18 Actuals' — a period label, optionally followed
+# by its Actual/Budget/... type in the same cell.
+_PERIOD   = re.compile(r'^((?:19|20)\d{2}(?:-\d{2})?)\b')
+_TYPE     = re.compile(r'\b(actual|budget|forecast|estimate|target)s?\b', re.I)
+_WB_YEAR  = re.compile(r'_((?:19|20)\d{2})-\d{2}$')
+# Numbers stored as text: '2,461c', '(1,234)', '5.8c' — thousands
+# separators, parenthesised negatives and a trailing footnote letter.
+_TEXT_NUMBER = re.compile(r'^(\()?(-?[\d,]*\.?\d+)\)?[a-z]?$')
+
+
+# ── Sheet normalisation ──────────────────────────────────────────────────────
+
+def _period(cell):
+    """The period a header cell names, or None."""
+    if isinstance(cell, bool):
+        return None
+    if isinstance(cell, int):
+        return str(cell) if 1900 <= cell <= 2099 else None
+    if isinstance(cell, str):
+        m = _PERIOD.match(cell.strip())
+        return m.group(1) if m else None
+    return None
+
+
+def _kind(cell) -> str:
+    m = _TYPE.search(_label(cell))
+    return m.group(1).title() if m else ''
+
+
+def _number(cell):
+    """A numeric cell as float, or None for text, blanks and footnote marks."""
+    if isinstance(cell, bool) or cell is None:
+        return None
+    if isinstance(cell, (int, float)):
+        return float(cell)
+    m = _TEXT_NUMBER.match(str(cell).strip())
+    if m is None:
+        return None
+    value = float(m.group(2).replace(',', ''))
+    return -value if m.group(1) else value
+
+
+def _header_columns(row, below):
+    """
+    [(col, fiscal_year, type)] if row is a period header row, else None.
+
+    A header needs at least two period cells after the label column and
+    no plain numbers (data rows for e.g. housing starts can look like
+    years). Years written once over a merged Budget/Forecast pair are
+    carried forward to the next column that has a type below it.
+    """
+    periods = [_period(c) for c in row]
+    if sum(p is not None for p in periods[1:]) < 2:
+        return None
+    if any(isinstance(c, float) for c in row):
+        return None
+
+    types = [_kind(c) for c in below] if below is not None else []
+    if not any(types):
+        types = []
+    columns, current = [], None
+    for col, (cell, period) in enumerate(zip(row, periods)):
+        if col == 0:
+            continue
+        kind = (types[col] if col < len(types) else '') or _kind(cell)
+        if period is not None:
+            current = period
+        elif not (kind and current is not None):
+            continue
+        columns.append((col, current, kind))
+    return columns, bool(types)
+
+
+def normalize_sheet(rows, budget_year: str, table: str):
+    """
+    Facts from one sheet's rows (tuples of cell values). The line item is
+    the first text cell to the left of the first value column (row
+    numbers and unlabelled subtotal rows are skipped); a new header row
+    part way down starts a new set of value columns.
+    """
+    facts, columns, i = [], None, 0
+    while i < len(rows):
+        row = rows[i]
+        below = rows[i + 1] if i + 1 < len(rows) else None
+        header = _header_columns(row, below)
+        if header is not None:
+            columns, has_type_row = header
+            i += 2 if has_type_row else 1
+            continue
+        i += 1
+        if not columns:
+            continue
+        first = columns[0][0]
+        line_item = next((' '.join(c.split()) for c in row[:first]
+                          if isinstance(c, str) and c.strip()), '')
+        if not line_item:
+            continue
+        for col, fiscal, kind in columns:
+            value = _number(row[col]) if col < len(row) else None
+            if value is not None:
+                facts.append((budget_year, table, line_item, fiscal, kind, value))
+    return facts
+
+
+def workbook_budget_year(path: Path) -> str:
+    match = _WB_YEAR.search(path.stem)
+    if match is None:
+        raise ValueError(f'{path.name}: cannot tell which budget year this is')
+    return f'Budget {match.group(1)}'
+
+
+def extract_workbook_facts(path) -> list:
+    """Every sheet of one workbook as a list of COLUMNS tuples."""
+    import openpyxl
+
+    path = Path(path)
+    budget_year = workbook_budget_year(path)
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        facts = []
+        for ws in wb.worksheets:
+            rows = [tuple(r) for r in ws.iter_rows(values_only=True)]
+            facts.extend(normalize_sheet(rows, budget_year, ws.title.strip()))
+        return facts
+    finally:
+        wb.close()
+
+
+def load_workbook_facts(path, use_cache: bool = True) -> list:
+    """extract_workbook_facts(), memoised on disk by the workbook's SHA-256."""
+    path = Path(path)
+    if not use_cache:
+        return extract_workbook_facts(path)
+    facts = _cached_json(path, 'facts', CACHE_VERSION,
+                         lambda: [list(f) for f in extract_workbook_facts(path)])
+    return [tuple(f) for f in facts]
+
+
+# ── Bulk ingestion ───────────────────────────────────────────────────────────
+
+def _ingest_one(path, use_cache):
+    t0 = time.perf_counter()
+    return path, load_workbook_facts(path, use_cache), time.perf_counter() - t0
+
+
+def ingest_workbooks(paths, jobs: int = 1, use_cache: bool = True,
+                     verbose: bool = False) -> pd.DataFrame:
+    """
+    Parse the workbooks (on `jobs` worker processes) and stack their
+    facts into one frame. Text columns are categoricals; rows keep the
+    order of `paths`, then sheet order, then row order. verbose prints
+    one progress line per workbook.
+    """
+    paths = [Path(p) for p in paths]
+    if jobs == 1:
+        results = [_ingest_one(p, use_cache) for p in paths]
+    else:
+        # Largest workbooks first so a capital plan is not the last task queued.
+        queue = sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            done = {r[0]: r for r in pool.map(_ingest_one, queue, [use_cache] * len(queue))}
+        results = [done[p] for p in paths]
+
+    for path, facts, secs in results if verbose else ():
+        print(f'  {path.parent.name}/{path.name:<40s} {len(facts):>6,d} facts  {secs:6.2f}s')
+    rows = [f for _, facts, _ in results for f in facts]
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df
+
+
+# ── Columnar store ───────────────────────────────────────────────────────────
+
+def workbook_paths(budget_dir=BUDGET_DIR) -> list:
+    return sorted(Path(budget_dir).glob(WORKBOOK_GLOB))
+
+
+def sources_key(paths) -> str:
+    """Hash of CACHE_VERSION and every workbook's name and SHA-256."""
+    key = json.dumps([CACHE_VERSION, [[f'{p.parent.name}/{p.name}', sha256(p)] for p in paths]])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def save_budget_facts(df: pd.DataFrame, path=FACTS_PATH, sources: str = '') -> Path:
+    """
+    Write the fact table as Parquet, or as a compressed .npz of category
+    codes + values next to it when pyarrow is not installed. sources
+    (see sources_key()) is stored with it.
+    """
+    path = Path(path)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        path = path.with_suffix('.npz')
+        arrays = {'value': df['value'].to_numpy(dtype='float64'), 'sources': np.asarray(sources)}
+        for col in TEXT_COLUMNS:
+            cat = df[col].astype('category').cat
+            arrays[f'{col}_codes'] = cat.codes.to_numpy()
+            arrays[f'{col}_categories'] = np.asarray(cat.categories, dtype=str)
+        atomic_write_bytes(path, lambda fh: np.savez_compressed(fh, **arrays))
+        return path
+    df = df.copy(deep=False)
+    df.attrs['sources'] = sources       # kept in the Parquet metadata
+    atomic_write_bytes(path, lambda fh: df.to_parquet(fh, index=False))
+    return path
+
+
+def read_budget_facts(path=FACTS_PATH, columns=None):
+    """The stored fact table (only `columns`, if given) with its sources key in attrs; None if absent."""
+    path = Path(path)
+    npz = path.with_suffix('.npz')
+    if path.exists():
+        return pd.read_parquet(path, columns=columns)
+    if not npz.exists():
+        return None
+
+    wanted = columns or COLUMNS
+    with np.load(npz, allow_pickle=False) as data:
+        out = {}
+        for col in wanted:
+            if col == 'value':
+                out[col] = data['value']
+            else:
+                out[col] = pd.Categorical.from_codes(data[f'{col}_codes'],
+                                                     categories=data[f'{col}_categories'])
+        df = pd.DataFrame(out)[wanted]
+        df.attrs['sources'] = str(data['sources']) if 'sources' in data else ''
+        return df
+
+
+def load_budget_facts(path=FACTS_PATH, columns=None, budget_dir=BUDGET_DIR) -> pd.DataFrame:
+    """
+    Read the stored fact table (only `columns`, if given), first
+    re-running the ingestion if it is missing or was built from
+    different workbooks than those now in budget_dir.
+    """
+    paths = workbook_paths(budget_dir)
+    key = sources_key(paths)
+    facts = read_budget_facts(path, columns)
+    if facts is None or facts.attrs.get('sources') != key:
+        save_budget_facts(ingest_workbooks(paths), path, key)
+        facts = read_budget_facts(path, columns)
+    return facts
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Normalise every budget_data/ workbook into one long fact table.')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='worker processes for parsing (default: CPU count; 1 = serial)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-parse every workbook, ignoring the budget cache')
+    parser.add_argument('--output', '-o', type=Path, default=FACTS_PATH,
+                        help=f'fact table path (default: {FACTS_PATH.relative_to(BUDGET_DIR.parent)})')
+    args = parser.parse_args(argv)
+
+    paths = workbook_paths()
+    jobs = max(1, min(args.jobs, len(paths)))
+    t0 = time.perf_counter()
+    print(f'Ingesting {len(paths)} workbooks on {jobs} worker process(es)...')
+    facts = ingest_workbooks(paths, jobs, use_cache=not args.no_cache, verbose=True)
+    out = save_budget_facts(facts, args.output, sources_key(paths))
+
+    print(f'\n{len(facts):,d} facts from {facts["table"].nunique()} tables '
+          f'in {time.perf_counter() - t0:.2f}s')
+    print(f'Saved: {out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+chart_export.py
+───────────────
+Writes one laid-out figure in several formats without rebuilding it.
+
+    png    150-dpi PNG          plots/<name>.png              (the usual output)
+    print  300-dpi PNG          plots/export/<name>@300dpi.png
+    thumb  320 px wide PNG      plots/export/<name>_thumb.png
+    webp   150-dpi WebP         plots/export/<name>.webp
+    svg    vector SVG           plots/export/<name>.svg
+
+Each resolution is drawn once by Agg into an RGBA buffer; every raster
+target at that resolution (PNG, thumbnail, WebP) is encoded from the
+same buffer on a thread pool — PIL's zlib and libwebp encoders release
+the GIL — while the SVG is drawn on the calling thread.
+
+PngOptimizer re-compresses finished PNGs losslessly (PIL optimize=True)
+in the background, keeping a file only if it got smaller.
+
+Usage:
+    from chart_export import export_figure
+    export_figure(fig, 'quarterly_growth_rate.png', ('png', 'webp', 'svg'), PLOTS_DIR)
+"""
+
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from lazy_modules import lazy_import
+from statcan_data import atomic_write_bytes
+
+Image          = lazy_import('PIL.Image')
+PngImagePlugin = lazy_import('PIL.PngImagePlugin')
+
+WEB_DPI     = 150
+PRINT_DPI   = 300
+THUMB_WIDTH = 320
+WEBP_QUALITY = 90
+EXPORT_DIR  = 'export'        # under the plots directory
+
+# format -> (dpi of the raster it is encoded from, or None for vector)
+FORMATS = {
+    'png':   WEB_DPI,
+    'print': PRINT_DPI,
+    'thumb': WEB_DPI,
+    'webp':  WEB_DPI,
+    'svg':   None,
+}
+
+ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+_pool = None
+
+
+def _encoder_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix='encode')
+    return _pool
+
+
+def export_paths(filename: str, formats) -> dict:
+    """{format: path relative to the plots directory} for one chart's outputs."""
+    rel = Path(filename)
+    base = Path(EXPORT_DIR) / rel.parent / rel.stem
+    paths = {
+        'png':   rel,
+        'print': base.with_name(f'{rel.stem}@{PRINT_DPI}dpi.png'),
+        'thumb': base.with_name(f'{rel.stem}_thumb.png'),
+        'webp':  base.with_suffix('.webp'),
+        'svg':   base.with_suffix('.svg'),
+    }
+    return {fmt: paths[fmt] for fmt in formats}
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+
+def render_rgba(fig, dpi: int) -> np.ndarray:
+    """Draw fig once at dpi, cropped like savefig(bbox_inches='tight'); h × w × 4 uint8."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='rgba', dpi=dpi, bbox_inches='tight')
+    renderer = fig.canvas.renderer       # the Agg renderer that just drew the cropped figure
+    return np.frombuffer(buf.getbuffer(), np.uint8).reshape(int(renderer.height), int(renderer.width), 4)
+
+
+# ── Encoders (thread-safe: they only touch the RGBA array) ───────────────────
+
+def _png_bytes(img, dpi, optimize=False) -> bytes:
+    info = PngImagePlugin.PngInfo()
+    info.add_text('Software', 'matplotlib')
+    buf = io.BytesIO()
+    img.save(buf, format='png', pnginfo=info, dpi=(dpi, dpi), optimize=optimize)
+    return buf.getvalue()
+
+
+def encode_png(rgba, path: Path, dpi: int):
+    data = _png_bytes(Image.fromarray(rgba), dpi)
+    atomic_write_bytes(path, lambda fh: fh.write(data))
+
+
+def encode_thumbnail(rgba, path: Path, width: int = THUMB_WIDTH):
+    img = Image.fromarray(rgba)
+    height = max(1, round(img.height * width / img.width))
+    data = _png_bytes(img.resize((width, height), Image.LANCZOS), WEB_DPI)
+    atomic_write_bytes(path, lambda fh: fh.write(data))
+
+
+def encode_webp(rgba, path: Path, quality: int = WEBP_QUALITY):
+    buf = io.BytesIO()
+    Image.fromarray(rgba).save(buf, format='webp', quality=quality, method=4)
+    atomic_write_bytes(path, lambda fh: fh.write(buf.getvalue()))
+
+
+_ENCODERS = {
+    'png':   lambda rgba, path: encode_png(rgba, path, WEB_DPI),
+    'print': lambda rgba, path: encode_png(rgba, path, PRINT_DPI),
+    'thumb': encode_thumbnail,
+    'webp':  encode_webp,
+}
+
+
+def export_figure(fig, filename: str, formats, plots_dir: Path) -> dict:
+    """
+    Write fig in every requested format; returns {format: absolute path}.
+    Raster targets sharing a dpi are encoded from one draw, in parallel.
+    """
+    paths = {fmt: plots_dir / rel for fmt, rel in export_paths(filename, formats).items()}
+    for path in paths.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    pool = _encoder_pool()
+    futures = []
+    for dpi in sorted({FORMATS[f] for f in formats if FORMATS[f] is not None}):
+        rgba = render_rgba(fig, dpi)
+        futures += [pool.submit(_ENCODERS[fmt], rgba, paths[fmt])
+                    for fmt in formats if FORMATS[fmt] == dpi]
+    if 'svg' in formats:
+        fig.savefig(paths['svg'], format='svg', bbox_inches='tight')
+    for fut in futures:
+        fut.result()
+    return paths
+
+
+# ── Lossless PNG optimisation ────────────────────────────────────────────────
+
+def optimize_png(path: Path) -> int:
+    """Re-encode path with optimize=True; keep it only if smaller. Returns bytes saved."""
+    path = Path(path)
+    old = path.read_bytes()
+    with Image.open(io.BytesIO(old)) as img:
+        dpi = round(img.info.get('dpi', (WEB_DPI,))[0])
+        new = _png_bytes(img, dpi, optimize=True)
+    if len(new) >= len(old):
+        return 0
+    atomic_write_bytes(path, lambda fh: fh.write(new))
+    return len(old) - len(new)
+
+
+class PngOptimizer:
+    """Background pool that optimizes PNGs as they are finished."""
+
+    def __init__(self, workers: int = ENCODE_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='optimize')
+        self._futures = []
+
+    def submit(self, paths):
+        self._futures += [self._pool.submit(optimize_png, p)
+                          for p in paths if Path(p).suffix == '.png']
+
+    def finish(self):
+        """Wait for every queued file; returns (files optimized, bytes saved)."""
+        wait(self._futures)
+        self._pool.shutdown()
+        return len(self._futures), sum(f.result() for f in self._futures)
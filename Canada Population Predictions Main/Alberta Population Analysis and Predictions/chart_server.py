@@ -0,0 +1,329 @@
+"""
+chart_server.py
+───────────────
+Local HTTP server that renders the regenerate_plots.py charts on demand
+for the dashboard.
+
+The parsed 17100009 table and the budget tables are loaded once and kept
+in memory. Each rendered chart is kept as encoded PNG bytes in an LRU
+cache keyed by chart, parameters and a data version (a hash of the
+loaded data), so repeat requests are a dictionary lookup and reloading
+changed sources never serves a stale image.
+
+Endpoints:
+    GET  /charts                          chart names and the parameters each takes
+    GET  /chart/<name>.png?geo=Ontario&start=2000&end=2025&dpi=100
+    GET  /stats                           cache hits, misses and size; data version
+    POST /reload                          re-read the sources, drop the cache if they changed
+
+Population charts (population_growth, quarterly_growth_rate,
+population_share, yoy_growth) take geo, start and end; every chart
+takes dpi.
+Unknown parameters, a reversed window or one holding no data for the
+chart are answered 400; a chart that fails to render, 500.
+
+Usage:
+    python chart_server.py                      # http://127.0.0.1:8050
+    python chart_server.py --port 9000 --cache-mb 512
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import regenerate_plots as rp
+
+DEFAULT_PORT     = 8050
+DEFAULT_CACHE_MB = 256
+DEFAULT_DPI      = 150
+DPI_RANGE        = (30, 400)
+
+# Chart name (plot function without 'plot_') -> (function, shared inputs).
+CHARTS = {name[len('plot_'):]: (name, inputs) for _, name, inputs, _ in rp.CHART_JOBS}
+
+# Charts that can be drawn for any GEO and date window.
+GEO_CHARTS = {'population_growth', 'quarterly_growth_rate', 'population_share', 'yoy_growth'}
+
+# Observed values a window must hold for the chart to draw anything.
+MIN_POINTS = {'quarterly_growth_rate': 2}
+
+_WHEN = re.compile(r'^\d{4}(-(0[1-9]|1[0-2]))?$')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _month(when, month_of_year: str) -> str:
+    """'YYYY-MM' for a window bound; a bare year becomes its first/last month."""
+    return f'{when:04d}-{month_of_year}' if isinstance(when, int) else when
+
+
+# ── PNG cache ────────────────────────────────────────────────────────────────
+
+class PngCache:
+    """Thread-safe LRU of encoded PNGs, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, count: bool = True):
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += count
+                return None
+            self._items.move_to_end(key)
+            self.hits += count
+            return png
+
+    def put(self, key, png: bytes):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._items[key] = png
+            self.nbytes += len(png)
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._items), 'bytes': self.nbytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+# ── Chart service ────────────────────────────────────────────────────────────
+
+def data_version(shared) -> str:
+    """Content hash of the loaded chart inputs."""
+    h = hashlib.sha256()
+    for key in sorted(shared):
+        rp._digest(shared[key], h)
+    return h.hexdigest()[:16]
+
+
+class ChartService:
+    """
+    In-memory data plus the PNG cache. Rendering is serialised (pyplot
+    is not thread-safe); cache hits never wait for it.
+    """
+
+    def __init__(self, cache_bytes: int):
+        self.cache = PngCache(cache_bytes)
+        self._render_lock = threading.Lock()
+        self.shared = None
+        self.version = None
+        self.reload()
+
+    def reload(self) -> bool:
+        """Re-read the sources (through their on-disk caches); True if the data changed."""
+        shared = rp.build_shared_data()
+        version = data_version(shared)
+        with self._render_lock:
+            changed = version != self.version
+            if changed:
+                rp._init_worker(shared)
+                self.shared, self.version = shared, version
+                self.cache.clear()
+        return changed
+
+    def params(self, name: str, query: dict) -> dict:
+        """Validated keyword arguments for chart `name` from a query string."""
+        allowed = {'dpi'} | ({'geo', 'start', 'end'} if name in GEO_CHARTS else set())
+        unknown = set(query) - allowed
+        if unknown:
+            raise BadRequest(f'{name} does not take {", ".join(sorted(unknown))}')
+
+        out = {}
+        if 'geo' in query:
+            if query['geo'] not in self.shared['pop'].geos:
+                raise BadRequest(f'unknown geo {query["geo"]!r}')
+            out['geo'] = query['geo']
+        for bound in ('start', 'end'):
+            if bound in query:
+                if not _WHEN.match(query[bound]):
+                    raise BadRequest(f'{bound} must be YYYY or YYYY-MM')
+                out[bound] = int(query[bound]) if len(query[bound]) == 4 else query[bound]
+        try:
+            dpi = int(query.get('dpi', DEFAULT_DPI))
+        except ValueError:
+            raise BadRequest('dpi must be an integer') from None
+        if not DPI_RANGE[0] <= dpi <= DPI_RANGE[1]:
+            raise BadRequest(f'dpi must be between {DPI_RANGE[0]} and {DPI_RANGE[1]}')
+        out['dpi'] = dpi
+        if name in GEO_CHARTS:
+            self._check_window(name, out)
+        return out
+
+    def _check_window(self, name: str, params: dict):
+        """Reject a window that is reversed or holds no data for the chart."""
+        func = getattr(rp, CHARTS[name][0])
+        defaults = {k: p.default for k, p in inspect.signature(func).parameters.items()}
+        geo, start, end = (params.get(k, defaults[k]) for k in ('geo', 'start', 'end'))
+        if start is not None and end is not None and _month(start, '01') > _month(end, '12'):
+            raise BadRequest(f'start {start} is after end {end}')
+
+        pop = self.shared['pop']
+        if name == 'yoy_growth':
+            years, values = pop.annual(geo, month=1)
+            values = values[(years >= rp._year(start, 0)) & (years <= rp._year(end, 9999))]
+        else:
+            _, values = pop.series(geo, start, end)
+            if name == 'population_share':
+                _, canada = pop.series('Canada', start, end)
+                values = np.where(np.isnan(canada), np.nan, values)
+        if np.isfinite(values).sum() < MIN_POINTS.get(name, 1):
+            raise BadRequest(f'no {geo} data for {name} between {start or "the start"} '
+                             f'and {end or "the end"}')
+
+    def render(self, name: str, params: dict):
+        """(png bytes, cache hit?, cache key) for one chart."""
+        version = self.version
+        key = (version, name, tuple(sorted(params.items())))
+        png = self.cache.get(key)
+        if png is not None:
+            return png, True, key
+
+        with self._render_lock:
+            # Another request may have rendered it while this one waited.
+            png = self.cache.get(key, count=False)
+            if png is not None:
+                return png, True, key
+            func, inputs = CHARTS[name]
+            kwargs = {k: v for k, v in params.items() if k != 'dpi'}
+            try:
+                with rp.capture_png(params['dpi']) as out:
+                    getattr(rp, func)(*(self.shared[k] for k in inputs), **kwargs)
+            except Exception:
+                # Do not leave a half-drawn figure for the next request.
+                rp.plt.close('all')
+                raise
+            png = next(iter(out.values()))
+            if version == self.version:
+                self.cache.put(key, png)
+        return png, False, key
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+class ChartHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'      # keep-alive: every response has a Content-Length
+    disable_nagle_algorithm = True     # headers and body go out as separate writes
+    service: ChartService = None
+    quiet = True
+
+    def _send(self, status, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _json(self, obj, status=HTTPStatus.OK):
+        self._send(status, json.dumps(obj, indent=2).encode(), 'application/json')
+
+    def _error(self, status, message):
+        self._json({'error': message}, status)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/charts':
+            return self._json({name: sorted({'dpi'} | ({'geo', 'start', 'end'}
+                                                      if name in GEO_CHARTS else set()))
+                               for name in CHARTS})
+        if url.path == '/stats':
+            return self._json({'data_version': self.service.version, **self.service.cache.stats()})
+
+        m = re.fullmatch(r'/chart/(\w+)\.png', url.path)
+        if m is None or m.group(1) not in CHARTS:
+            return self._error(HTTPStatus.NOT_FOUND, f'no such chart: {url.path}')
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            params = self.service.params(m.group(1), query)
+        except BadRequest as exc:
+            return self._error(HTTPStatus.BAD_REQUEST, str(exc))
+
+        t0 = time.perf_counter()
+        try:
+            png, hit, key = self.service.render(m.group(1), params)
+        except Exception as exc:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR,
+                               f'{m.group(1)} failed: {type(exc).__name__}: {exc}')
+        etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+        headers = {'ETag': etag, 'X-Cache': 'hit' if hit else 'miss',
+                   'X-Render-Time': f'{(time.perf_counter() - t0) * 1000:.3f}ms',
+                   'Cache-Control': 'no-cache'}
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            return
+        self._send(HTTPStatus.OK, png, 'image/png', headers)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/reload':
+            return self._error(HTTPStatus.NOT_FOUND, f'no such endpoint: {self.path}')
+        changed = self.service.reload()
+        self._json({'changed': changed, 'data_version': self.service.version})
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the charts over HTTP from in-memory data.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help=f'PNG cache size (default: {DEFAULT_CACHE_MB} MB)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    print('Loading population and spending data...')
+    ChartHandler.service = ChartService(args.cache_mb * 2**20)
+    ChartHandler.quiet = not args.verbose
+    server = ThreadingHTTPServer((args.host, args.port), ChartHandler)
+    print(f'Serving {len(CHARTS)} charts on http://{args.host}:{args.port}/ '
+          f'(data version {ChartHandler.service.version})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+cpi_index.py
+────────────
+Alberta Consumer Price Index for restating nominal spending in constant
+dollars.
+
+The rates come from the "Key Assumptions" table of each budget's
+economic_outlook_tables_*.xlsx ('Alberta Consumer Price Index (% change)',
+calendar years). Those workbooks start with Budget 2023 and cover 2017
+onward with 2018 missing, so the 2011-2016 rates are transcribed from
+the economic outlook tables of the PDF-only 2012 and 2013 fiscal plans
+(PDF_CPI).
+
+Every vintage reports several of the same years. Per calendar year the
+best-grounded figure wins — Actual over Estimate over Forecast
+(budget_extract.TYPE_RANK), then the latest budget — and years no vintage reports are interpolated
+linearly between their neighbours and flagged. The rates chain into an
+index level (first year = 100) that is cached as an .npz in the shared
+cache (data_store.CACHE_DIR), keyed by the SHA-256 of the source
+workbooks, so the workbooks are only read when one changes.
+
+Spending rows are aligned on Year, the fiscal year's starting calendar
+year — the same alignment headline_spending() uses for population.
+
+Usage:
+    python cpi_index.py                # print the reconciled index
+
+    from cpi_index import deflate
+    real = deflate(spending, ['K12_M', 'PostSec_M', 'Total_M'])   # latest year's dollars
+    real.attrs['prices']                                          # 'Real 2025 dollars'
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_store
+from budget_extract import BUDGET_DIR, TYPE_RANK
+from budget_ingest import load_workbook_facts
+from statcan_data import atomic_write_bytes
+
+CACHE_DIR = data_store.CACHE_DIR
+
+# Bump when the reconciliation rules or the cached layout change.
+CACHE_VERSION = 1
+
+OUTLOOK_GLOB = '*/economic_outlook_tables_*.xlsx'
+CPI_TABLE    = 'Key Assumptions'
+CPI_LINE     = 'Alberta Consumer Price Index (% change)'
+
+PRICES  = ('nominal', 'real')
+NOMINAL = 'Nominal figures'
+
+# Transcribed CPI assumptions (% change, calendar year) for the PDF-only
+# budgets: Budget 2012 fiscal plan p. 66, Budget 2013 fiscal plan p. 85.
+PDF_CPI = [
+    ('Budget 2012', 2011, 'Estimate', 2.4),
+    ('Budget 2012', 2012, 'Forecast', 2.5),
+    ('Budget 2012', 2013, 'Forecast', 2.3),
+    ('Budget 2012', 2014, 'Forecast', 2.3),
+    ('Budget 2012', 2015, 'Forecast', 2.3),
+    ('Budget 2013', 2012, 'Estimate', 1.1),
+    ('Budget 2013', 2013, 'Forecast', 1.8),
+    ('Budget 2013', 2014, 'Forecast', 1.8),
+    ('Budget 2013', 2015, 'Forecast', 1.8),
+    ('Budget 2013', 2016, 'Forecast', 1.8),
+]
+
+
+class CpiIndex:
+    """
+    One reconciled CPI rate per calendar year, years contiguous.
+
+    years    int    calendar years, first..last with no gaps
+    rates    float  % change on the previous year
+    flags    str    'actual' / 'estimate' / 'forecast' / 'interpolated'
+    budgets  str    budget the rate was taken from ('' when interpolated)
+    level    float  chained index, first year = 100
+    """
+
+    def __init__(self, years, rates, flags, budgets):
+        self.years   = np.asarray(years, dtype='int64')
+        self.rates   = np.asarray(rates, dtype='float64')
+        self.flags   = np.asarray(flags, dtype=str)
+        self.budgets = np.asarray(budgets, dtype=str)
+        growth = 1 + self.rates / 100
+        growth[0] = 1.0
+        self.level = 100 * np.cumprod(growth)
+
+    def _positions(self, years) -> np.ndarray:
+        pos = np.asarray(years, dtype='int64') - self.years[0]
+        if pos.size and (pos.min() < 0 or pos.max() >= len(self.years)):
+            raise ValueError(f'CPI covers {self.years[0]}-{self.years[-1]}, '
+                             f'not {np.min(years)}-{np.max(years)}')
+        return pos
+
+    def factor(self, years, base: int) -> np.ndarray:
+        """Multiplier from each year's dollars to base-year dollars."""
+        return self.level[self._positions([base])[0]] / self.level[self._positions(years)]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({'Year': self.years, 'CPI_Change_Pct': self.rates,
+                             'CPI_Level': self.level, 'Flag': self.flags,
+                             'Source': self.budgets})
+
+
+# ── Reconciliation ───────────────────────────────────────────────────────────
+
+def outlook_workbooks(budget_dir=BUDGET_DIR) -> list:
+    return sorted(Path(budget_dir).glob(OUTLOOK_GLOB))
+
+
+def cpi_vintages(paths) -> pd.DataFrame:
+    """Every budget's CPI rate per calendar year: Budget_Year / Year / Type / Rate."""
+    rows = list(PDF_CPI)
+    for path in paths:
+        for budget, table, item, period, kind, value in load_workbook_facts(path):
+            if table == CPI_TABLE and item == CPI_LINE and kind in TYPE_RANK and len(period) == 4:
+                rows.append((budget, int(period), kind, float(value)))
+    return pd.DataFrame(rows, columns=['Budget_Year', 'Year', 'Type', 'Rate'])
+
+
+def reconcile(vintages: pd.DataFrame) -> CpiIndex:
+    """Best rate per year (Actual > Estimate > Forecast, then latest budget); gaps interpolated."""
+    ranked = vintages.assign(_rank=vintages['Type'].map(TYPE_RANK))
+    best = (ranked.sort_values(['Year', '_rank', 'Budget_Year'], ascending=[True, True, False])
+                  .drop_duplicates('Year'))
+    years = np.arange(best['Year'].min(), best['Year'].max() + 1)
+    pos = best['Year'].to_numpy() - years[0]
+
+    rates = np.interp(years, best['Year'], best['Rate'])
+    flags = np.full(len(years), 'interpolated', dtype=object)
+    budgets = np.full(len(years), '', dtype=object)
+    flags[pos] = best['Type'].str.lower().to_numpy()
+    budgets[pos] = best['Budget_Year'].to_numpy()
+    return CpiIndex(years, rates, flags, budgets)
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _cache_path(paths) -> Path:
+    key = json.dumps([CACHE_VERSION, PDF_CPI, [data_store.sha256(p) for p in paths]])
+    return CACHE_DIR / f'cpi_index.{hashlib.sha256(key.encode()).hexdigest()[:16]}.npz'
+
+
+def load_cpi_index(budget_dir=BUDGET_DIR, use_cache: bool = True) -> CpiIndex:
+    """The reconciled index, read from / written to the shared cache."""
+    paths = outlook_workbooks(budget_dir)
+    cache = _cache_path(paths)
+    if use_cache and cache.exists():
+        with np.load(cache, allow_pickle=False) as npz:
+            return CpiIndex(npz['years'], npz['rates'], npz['flags'], npz['budgets'])
+
+    index = reconcile(cpi_vintages(paths))
+    if use_cache:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(cache, lambda fh: np.savez_compressed(
+            fh, years=index.years, rates=index.rates, flags=index.flags, budgets=index.budgets))
+    return index
+
+
+# ── Deflation ────────────────────────────────────────────────────────────────
+
+def deflate(df: pd.DataFrame, cols, base: int = None, year_col: str = 'Year',
+            index: CpiIndex = None) -> pd.DataFrame:
+    """
+    Copy of df with cols restated in constant base-year dollars (default:
+    the latest year in df). The label for chart subtitles is left in
+    attrs['prices'].
+    """
+    index = index or load_cpi_index()
+    years = df[year_col].to_numpy()
+    base = int(years.max()) if base is None else int(base)
+    factor = index.factor(years, base)
+
+    out = df.copy()
+    for col in cols:
+        out[col] = out[col].to_numpy() * factor
+    out.attrs['prices'] = f'Real {base} dollars'
+    return out
+
+
+def price_label(df: pd.DataFrame) -> str:
+    """'Nominal figures' or the 'Real YYYY dollars' label deflate() left on df."""
+    return df.attrs.get('prices', NOMINAL)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reconciled Alberta CPI index.')
+    parser.add_argument('--no-cache', action='store_true', help='re-read the workbooks')
+    args = parser.parse_args(argv)
+
+    index = load_cpi_index(use_cache=not args.no_cache)
+    print(index.to_frame().to_string(index=False, float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+data_store.py
+─────────────
+Path resolver and content-addressed store shared by every copy of the
+project in a checkout.
+
+The repository holds the analysis twice (top level and under "Canada
+Population Predictions Main") plus Data/17100009.csv and a third
+plots/. Instead of each copy keeping its own caches and renders:
+
+    source(name)   finds a source file (17100009.csv, budget_data/) in
+                   this tree first, then in the repository's Data/
+    CACHE_DIR      one parsed-data cache for the whole checkout
+                   (<repo>/.cache, or $ALBERTA_SHARED_DIR); entries are
+                   keyed by the SHA-256 of the source file, so identical
+                   copies in different trees share one entry
+    STORE_DIR      content-addressed objects (objects/ab/cdef...) with
+                   named refs (refs/<key>) pointing at them; rendered
+                   charts are kept here under their render fingerprint
+                   so any tree can reuse a chart another tree rendered
+
+`python data_store.py dedupe` hard-links every identical copy of the
+large read-only sources (budget workbooks, fiscal plan PDFs,
+17100009.csv) in the checkout to a single store object, so the tree
+holds each file's bytes once. Linked copies share one inode: their
+permissions are left as they were, and an edit made in place to one
+copy shows up in all of them, the object included. The scripts never
+write those sources, and git replaces files rather than writing into
+them; should a linked object be edited anyway, checkout() rehashes it,
+finds it no longer matches its name and drops it instead of handing
+out the changed bytes. Objects that are independent copies (charts,
+unlinked puts) are made read-only.
+
+Only this tree's scripts resolve paths through source() and CACHE_DIR;
+the top-level copy still reads its own files and keeps its own caches.
+
+Usage:
+    python data_store.py status     # store size and duplicated bytes in the checkout
+    python data_store.py dedupe     # hard-link duplicate sources to one object
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import stat
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def _repo_root(start: Path) -> Path:
+    for parent in (start, *start.parents):
+        if (parent / '.git').exists():
+            return parent
+    return start
+
+
+REPO_ROOT  = _repo_root(SCRIPT_DIR)
+SHARED_DIR = Path(os.environ.get('ALBERTA_SHARED_DIR', REPO_ROOT / '.cache'))
+CACHE_DIR  = SHARED_DIR
+STORE_DIR  = SHARED_DIR / 'store'
+
+# Where source() looks, in order.
+SOURCE_ROOTS = [SCRIPT_DIR, REPO_ROOT / 'Data']
+
+# Read-only inputs that `dedupe` may hard-link. Script outputs (charts,
+# derived CSVs) are excluded: they are rewritten in place.
+DEDUPE_PATTERNS = ['*.xlsx', '*.pdf', '17100009.csv']
+
+
+# ── Path resolver ────────────────────────────────────────────────────────────
+
+def source(name: str) -> Path:
+    """First SOURCE_ROOTS entry holding name; this tree's path if none does."""
+    for root in SOURCE_ROOTS:
+        path = root / name
+        if path.exists():
+            return path
+    return SOURCE_ROOTS[0] / name
+
+
+# ── Objects ──────────────────────────────────────────────────────────────────
+
+def sha256(path) -> str:
+    with open(path, 'rb') as fh:
+        return hashlib.file_digest(fh, 'sha256').hexdigest()
+
+
+def object_path(sha: str) -> Path:
+    return STORE_DIR / 'objects' / sha[:2] / sha[2:]
+
+
+def put(path, link: bool = False) -> str:
+    """
+    Add a file's bytes to the store and return its SHA-256. With link,
+    the object is a hard link to path (falling back to a copy across
+    file systems) and keeps path's permissions; otherwise it is an
+    independent, read-only copy.
+    """
+    path = Path(path)
+    sha = sha256(path)
+    obj = object_path(sha)
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(obj.name + '.tmp')
+        try:
+            if not link:
+                raise OSError
+            os.link(path, tmp)
+        except OSError:
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, obj)
+    return sha
+
+
+def checkout(sha: str, path, link: bool = False) -> bool:
+    """
+    Write object sha to path (hard link or copy); False if the store
+    lacks it. An object whose bytes no longer hash to sha (a linked
+    copy edited in place) is removed and treated as missing.
+    """
+    obj = object_path(sha)
+    if not obj.exists():
+        return False
+    if sha256(obj) != sha:
+        obj.unlink()
+        return False
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        if not link:
+            raise OSError
+        os.link(obj, tmp)
+    except OSError:
+        shutil.copyfile(obj, tmp)
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp, path)
+    return True
+
+
+# ── Refs ─────────────────────────────────────────────────────────────────────
+
+def _ref_path(key: str) -> Path:
+    return STORE_DIR / 'refs' / key
+
+
+def save_ref(key: str, path) -> str:
+    """Copy path into the store and point ref key at it."""
+    sha = put(path)
+    ref = _ref_path(key)
+    ref.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ref.with_name(ref.name + '.tmp')
+    tmp.write_text(sha)
+    os.replace(tmp, ref)
+    return sha
+
+
+def read_ref(key: str):
+    try:
+        sha = _ref_path(key).read_text().strip()
+    except OSError:
+        return None
+    return sha if object_path(sha).exists() else None
+
+
+def restore_ref(key: str, path) -> bool:
+    """Copy the object ref key points at to path; False if there is none."""
+    sha = read_ref(key)
+    return sha is not None and checkout(sha, path)
+
+
+# ── Deduplication ────────────────────────────────────────────────────────────
+
+def duplicate_sources(root: Path = REPO_ROOT) -> dict:
+    """
+    {sha256: [paths]} for DEDUPE_PATTERNS files under root (not .git /
+    .cache). Only files that share their size with another are hashed;
+    a file of unique size is its own group, keyed 'size:<bytes>'.
+    """
+    by_size = defaultdict(list)
+    for pattern in DEDUPE_PATTERNS:
+        for path in root.rglob(pattern):
+            if {'.git', '.cache'} & set(path.relative_to(root).parts) or not path.is_file():
+                continue
+            by_size[path.stat().st_size].append(path)
+    groups = defaultdict(list)
+    for size, paths in by_size.items():
+        if len(paths) == 1:
+            groups[f'size:{size}'].append(paths[0])
+            continue
+        for path in paths:
+            groups[sha256(path)].append(path)
+    return groups
+
+
+def dedupe(root: Path = REPO_ROOT, dry_run: bool = False):
+    """Hard-link every source under root to its store object; returns (files, bytes) linked."""
+    files = freed = 0
+    for sha, paths in duplicate_sources(root).items():
+        if len(paths) < 2:
+            continue
+        obj = object_path(sha)
+        if obj.exists():
+            todo = [p for p in paths if not os.path.samefile(obj, p)]
+        else:
+            # The first copy becomes the object itself.
+            if not dry_run:
+                put(paths[0], link=True)
+            todo = paths[1:]
+        for path in todo:
+            size = path.stat().st_size
+            if dry_run or checkout(sha, path, link=True):
+                files += 1
+                freed += size
+    return files, freed
+
+
+def _store_size() -> tuple:
+    objects = list((STORE_DIR / 'objects').rglob('*'))
+    return (sum(1 for p in objects if p.is_file()),
+            sum(p.stat().st_size for p in objects if p.is_file()))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Shared content-addressed data store.')
+    parser.add_argument('command', choices=['status', 'dedupe'],
+                        help='status: store size and duplicated bytes; dedupe: hard-link '
+                             'identical sources to one store object. Linked copies share an '
+                             'inode, so an in-place edit of one changes all; permissions are '
+                             'left untouched')
+    parser.add_argument('--root', type=Path, default=REPO_ROOT,
+                        help=f'checkout to scan (default: {REPO_ROOT})')
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                        help='with dedupe, report what would be linked')
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        count, size = _store_size()
+        print(f'Store:   {STORE_DIR}')
+        print(f'Objects: {count} ({size / 2**20:.1f} MB)')
+        groups = duplicate_sources(args.root)
+        dupes = {sha: paths for sha, paths in groups.items()
+                 if len({p.stat().st_ino for p in paths}) > 1}
+        extra = sum(paths[0].stat().st_size * (len({p.stat().st_ino for p in paths}) - 1)
+                    for paths in dupes.values())
+        print(f'Sources: {sum(map(len, groups.values()))} files, {len(groups)} distinct; '
+              f'{extra / 2**20:.1f} MB in unlinked duplicates')
+        return
+
+    files, freed = dedupe(args.root, args.dry_run)
+    verb = 'Would link' if args.dry_run else 'Linked'
+    print(f'{verb} {files} files to the store ({freed / 2**20:.1f} MB of duplicate bytes).')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+lazy_modules.py
+───────────────
+Deferred imports for the plotting stack.
+
+matplotlib.pyplot and seaborn take about a second to import. Scripts
+bind them with lazy_import() instead of `import`, so the import only
+happens the first time an attribute is used — i.e. when a chart is
+actually drawn. Commands that only read data or write CSVs never load
+them.
+
+Usage:
+    from lazy_modules import lazy_import
+    plt = lazy_import('matplotlib.pyplot')
+    sns = lazy_import('seaborn')
+    plt.subplots(...)          # matplotlib.pyplot is imported here
+"""
+
+import importlib
+import sys
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_import(name: str):
+    """The module itself if it is already imported, else a LazyModule."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
@@ -0,0 +1,468 @@
+"""
+population_forecast.py
+──────────────────────
+Quarterly population projections with prediction intervals for every
+GEO in 17100009.csv, fitted all at once.
+
+Three trend models, each fitted to the whole GEO × quarter matrix
+(PopulationMatrix) in a handful of array operations instead of one
+regression per series:
+
+    linear      VALUE = a + b·t, by batched weighted least squares
+                (one stacked set of 2 × 2 normal equations; missing
+                quarters get zero weight)
+    loglinear   log VALUE = a + b·t, the same solve on the log scale —
+                constant percentage growth; projections are the
+                back-transformed median
+    holt        Holt's linear exponential smoothing; the smoothing
+                recursion runs over quarters with every GEO and every
+                (alpha, beta) pair of a search grid as one array, and
+                each GEO keeps the pair with the smallest one-step SSE
+
+Intervals are normal-theory prediction intervals by default: the
+regression ones include parameter uncertainty, Holt's use the ETS(A,A,N)
+h-step variance. With --bootstrap N they are percentile intervals of N
+replicate paths instead — a (block) residual bootstrap that refits the
+trend models and simulates Holt's forward. Replicates are generated as
+size × GEO × quarter arrays in fixed chunks with one SeedSequence child
+each, and the chunks are spread over a process pool, so a seed gives the
+same intervals for any --jobs.
+
+Usage:
+    python population_forecast.py                            # 2012+ fit, 5 years ahead
+    python population_forecast.py --start 2000 --horizon 40 --level 0.8
+    python population_forecast.py --models holt --parquet
+    python population_forecast.py --bootstrap 5000 --block 4 --seed 7 --jobs 4
+
+    from population_forecast import forecast_all
+    fc = forecast_all(pop)['linear']          # Forecast
+    fc.mean[fc.row('Alberta')]                # projected quarters
+"""
+
+import argparse
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+import profiling
+from profiling import stage
+from statcan_data import load_population_table, PopulationMatrix
+from table_export import describe, write_table
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_CSV = SCRIPT_DIR / 'population_projections.csv'
+
+MODELS = ('linear', 'loglinear', 'holt')
+
+DEFAULT_START   = '2012-01'   # first quarter of the fit window
+DEFAULT_HORIZON = 20          # quarters projected (5 years)
+DEFAULT_LEVEL   = 0.95
+
+# Bootstrap intervals (--bootstrap N): replicates are drawn in fixed-size
+# chunks, one seed each, so results do not depend on the worker count.
+DEFAULT_REPLICATES = 2000
+DEFAULT_BLOCK      = 4        # quarters per resampled residual block
+DEFAULT_SEED       = 2025
+BOOTSTRAP_CHUNK    = 250
+
+# Holt smoothing parameters searched for every GEO.
+HOLT_ALPHAS = np.linspace(0.05, 1.0, 20)
+HOLT_BETAS  = np.linspace(0.0, 1.0, 21)
+
+
+class Forecast:
+    """
+    Projections of one model for every fitted GEO: mean, lower and upper
+    are geos × horizon arrays over the quarters in dates, the bounds from
+    normal theory or the bootstrap.
+    """
+
+    def __init__(self, model, geos, dates, mean, lower, upper, level, params, interval='normal'):
+        self.model = model
+        self.interval = interval        # 'normal' or 'bootstrap'
+        self.geos = list(geos)
+        self.dates = dates
+        self.mean, self.lower, self.upper = mean, lower, upper
+        self.level = level
+        self.params = params            # {name: per-GEO array}
+        self._row = {g: i for i, g in enumerate(self.geos)}
+
+    def row(self, geo: str) -> int:
+        return self._row[geo]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long GEO / REF_DATE / model / mean / lower / upper table."""
+        g, h = self.mean.shape
+        return pd.DataFrame({
+            'GEO':      np.repeat(self.geos, h),
+            'REF_DATE': np.tile(self.dates, g),
+            'model':    self.model,
+            'interval': self.interval,
+            'level':    self.level,
+            'mean':     self.mean.ravel(),
+            'lower':    self.lower.ravel(),
+            'upper':    self.upper.ravel(),
+        })
+
+
+# ── Fit window ───────────────────────────────────────────────────────────────
+
+def fit_window(pop: PopulationMatrix, start=DEFAULT_START, end=None):
+    """
+    (geos, geos × quarters values, their dates) for the inclusive fit
+    window. GEOs with too few observations in it to fit a trend (e.g.
+    Northwest Territories including Nunavut, last reported in 1991) are
+    left out.
+    """
+    cols = pop.columns(start, end)
+    y = pop.values[:, cols]
+    keep = np.isfinite(y).sum(axis=1) > 2
+    return [g for g, k in zip(pop.geos, keep) if k], y[keep], pop.dates[cols]
+
+
+def future_dates(last, horizon: int) -> np.ndarray:
+    """The horizon quarters after `last` (a datetime64 quarter start)."""
+    month = np.datetime64(last, 'M')
+    return (month + 3 * np.arange(1, horizon + 1)).astype('datetime64[D]')
+
+
+# ── Batched least squares ────────────────────────────────────────────────────
+
+def _normal_equations(w: np.ndarray):
+    """
+    Trend design X (n × 2) and the inverse of every row's Xᵀ W X for the
+    observation mask w, plus the rows with enough points to fit.
+    """
+    g, n = w.shape
+    X = np.stack([np.ones(n), np.arange(n, dtype='float64')], axis=1)
+    xtwx = np.einsum('gt,tk,tl->gkl', w.astype('float64'), X, X)
+    ok = w.sum(axis=1) > 2
+    xtwx[~ok] = np.eye(2)                    # keep the batch solvable; masked by callers
+    return X, np.linalg.inv(xtwx), ok
+
+
+def _future_design(n: int, horizon: int) -> np.ndarray:
+    return np.stack([np.ones(horizon), n - 1 + np.arange(1, horizon + 1)], axis=1)   # h × 2
+
+
+def batched_trend(y: np.ndarray, horizon: int, z: float):
+    """
+    Fit y[g] = a[g] + b[g]·t for every row at once, ignoring NaNs, and
+    project `horizon` steps past the window. Returns
+    (mean, half-width of the prediction interval, a, b), each per row.
+    """
+    g, n = y.shape
+    w = np.isfinite(y)
+    # Stacked normal equations: (Xᵀ W X)[g] β[g] = (Xᵀ W y)[g]
+    X, inv, ok = _normal_equations(w)
+    beta = np.einsum('gkl,gt,tl->gk', inv, np.where(w, y, 0.0), X)
+
+    obs = w.sum(axis=1)
+    resid = np.where(w, y - beta @ X.T, 0.0)
+    sigma2 = (resid ** 2).sum(axis=1) / np.maximum(obs - 2, 1)
+
+    Xf = _future_design(n, horizon)
+    mean = beta @ Xf.T
+    leverage = np.einsum('hk,gkl,hl->gh', Xf, inv, Xf)
+    half = z * np.sqrt(sigma2[:, None] * (1.0 + leverage))
+    mean[~ok] = half[~ok] = np.nan
+    return mean, half, beta[:, 0], beta[:, 1]
+
+
+def fit_linear(y, horizon, z):
+    mean, half, a, b = batched_trend(y, horizon, z)
+    return mean, mean - half, mean + half, {'intercept': a, 'slope': b}
+
+
+def fit_loglinear(y, horizon, z):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logy = np.where(y > 0, np.log(y), np.nan)
+    mean, half, a, b = batched_trend(logy, horizon, z)
+    return (np.exp(mean), np.exp(mean - half), np.exp(mean + half),
+            {'intercept': a, 'growth': np.expm1(b)})
+
+
+# ── Holt's linear trend ──────────────────────────────────────────────────────
+
+def _holt_start(y: np.ndarray):
+    """(observed mask, fittable rows, first observed column, starting level and trend) per row."""
+    g, n = y.shape
+    w = np.isfinite(y)
+    ok = w.sum(axis=1) > 2
+    first = np.where(w.any(axis=1), w.argmax(axis=1), n)
+    # Index of each row's second observation, for the starting trend.
+    second = np.where(ok, np.argmax(w & (np.arange(n) > first[:, None]), axis=1), 0)
+    rows = np.arange(g)
+    y0 = np.where(ok, y[rows, np.minimum(first, n - 1)], 0.0)
+    b0 = np.where(ok, (y[rows, second] - y0) / np.maximum(second - first, 1), 0.0)
+    return w, ok, first, y0, b0
+
+
+def _holt_run(y, alpha, beta, keep_errors: bool = False):
+    """
+    Holt's recursion for every row under k parameter pairs at once
+    (alpha, beta: k × 1 or k × rows). Returns the final level and trend
+    (k × rows), the one-step SSE, and with keep_errors the one-step
+    errors (k × rows × quarters; zero where nothing was predicted).
+
+    The state starts at each row's first observed quarter; later missing
+    quarters advance the trend without an update.
+    """
+    w, ok, first, y0, b0 = _holt_start(y)
+    k = np.broadcast_shapes(np.shape(alpha), np.shape(beta))[0]
+    level = np.broadcast_to(y0, (k, len(y0))).copy()
+    trend = np.broadcast_to(b0, (k, len(y0))).copy()
+    sse = np.zeros_like(level)
+    errors = []
+    for t in range(y.shape[1]):
+        started = t > first
+        step = level + trend
+        err = np.where(w[:, t] & started, np.nan_to_num(y[:, t]) - step, 0.0)
+        level = np.where(started, step + alpha * err, level)
+        trend = np.where(started, trend + alpha * beta * err, trend)
+        sse += err ** 2
+        if keep_errors:
+            errors.append(err)
+    return level, trend, sse, (np.stack(errors, axis=-1) if keep_errors else None)
+
+
+def fit_holt(y, horizon, z, alphas=HOLT_ALPHAS, betas=HOLT_BETAS):
+    """
+    Holt's method for every row and every (alpha, beta) grid pair in one
+    recursion over the quarters; each row keeps the pair with the
+    smallest one-step SSE.
+    """
+    g, n = y.shape
+    w, ok, *_ = _holt_start(y)
+    obs = w.sum(axis=1)
+    a, b = np.meshgrid(alphas, betas, indexing='ij')
+    a = a.reshape(-1, 1)                                         # grid × 1
+    b = b.reshape(-1, 1)
+    level, trend, sse, _ = _holt_run(y, a, b)                   # grid × geos
+
+    rows = np.arange(g)
+    best = sse.argmin(axis=0)
+    alpha, beta = a[best, 0], b[best, 0]
+    level, trend = level[best, rows], trend[best, rows]
+    sigma2 = sse[best, rows] / np.maximum(obs - 2, 1)
+
+    h = np.arange(1, horizon + 1)
+    mean = level[:, None] + h * trend[:, None]
+    # ETS(A,A,N): Var(h) = σ²·(1 + Σ_{j=1}^{h-1} (α(1 + βj))²); the
+    # shifted cumsum below drops the j = h term, so c2 is indexed by j = h.
+    c2 = (alpha[:, None] * (1 + beta[:, None] * h)) ** 2
+    var = sigma2[:, None] * (1 + np.concatenate([np.zeros((g, 1)), np.cumsum(c2, axis=1)[:, :-1]], axis=1))
+    half = z * np.sqrt(var)
+    mean[~ok] = half[~ok] = np.nan
+    return mean, mean - half, mean + half, {'alpha': alpha, 'beta': beta,
+                                            'level': level, 'trend': trend}
+
+
+_FITTERS = {'linear': fit_linear, 'loglinear': fit_loglinear, 'holt': fit_holt}
+
+
+# ── Bootstrap intervals ──────────────────────────────────────────────────────
+
+def _packed_residuals(resid: np.ndarray, w: np.ndarray):
+    """Each row's observed residuals moved to the front in time order, and their count."""
+    order = np.argsort(~w, axis=1, kind='stable')
+    return np.take_along_axis(np.where(w, resid, 0.0), order, axis=1), w.sum(axis=1)
+
+
+def block_indices(rng, counts, size: int, length: int, block: int) -> np.ndarray:
+    """
+    size × rows × length positions into each row's first counts[g]
+    residuals, drawn as circular blocks of `block` consecutive quarters
+    (block=1 is the plain residual bootstrap).
+    """
+    m = np.maximum(counts, 1)[None, :, None]
+    nblocks = -(-length // block)
+    starts = (rng.random((size, len(counts), nblocks)) * m).astype(np.int64)
+    idx = (starts[..., None] + np.arange(block)) % m[..., None]
+    return idx.reshape(size, len(counts), -1)[..., :length]
+
+
+def _trend_paths(y, horizon, rng, size, block):
+    """
+    size replicates of the projection paths of the linear trend: resampled
+    residuals are added to the fit, every replicate series is refitted
+    (one stacked solve — the normal matrices do not change), and future
+    residuals are added to the refitted trend.
+    """
+    g, n = y.shape
+    w = np.isfinite(y)
+    X, inv, ok = _normal_equations(w)
+    beta = np.einsum('gkl,gt,tl->gk', inv, np.where(w, y, 0.0), X)
+    fitted = beta @ X.T
+    obs = w.sum(axis=1)
+    # Rescale so resampled residuals keep the variance of the true errors.
+    scale = np.sqrt(obs / np.maximum(obs - 2, 1))[:, None]
+    packed, counts = _packed_residuals((y - fitted) * scale, w)
+
+    e = packed[np.arange(g)[:, None], block_indices(rng, counts, size, n + horizon, block)]
+    y_star = np.where(w, fitted + e[..., :n], 0.0)                          # size × g × n
+    beta_star = np.einsum('gkl,bgt,tl->bgk', inv, y_star, X)
+    return beta_star @ _future_design(n, horizon).T + e[..., n:]
+
+
+def _holt_paths(y, horizon, rng, size, block, alpha, beta):
+    """size simulated future paths of Holt's model with each row's fitted (alpha, beta)."""
+    g, n = y.shape
+    level, trend, _, errors = _holt_run(y, alpha[None], beta[None], keep_errors=True)
+    w, _, first, *_ = _holt_start(y)
+    predicted = w & (np.arange(n) > first[:, None])
+    packed, counts = _packed_residuals(errors[0], predicted)
+
+    e = packed[np.arange(g)[:, None], block_indices(rng, counts, size, horizon, block)]
+    level = np.repeat(level, size, axis=0)                                   # size × g
+    trend = np.repeat(trend, size, axis=0)
+    paths = np.empty((size, g, horizon))
+    for j in range(horizon):
+        paths[..., j] = level + trend + e[..., j]
+        level = level + trend + alpha * e[..., j]
+        trend = trend + alpha * beta * e[..., j]
+    return paths
+
+
+def _bootstrap_chunk(model, y, horizon, block, seed, size, holt_params=None):
+    """One chunk of replicate paths (size × rows × horizon) from its own seed."""
+    rng = np.random.default_rng(seed)
+    if model == 'holt':
+        return _holt_paths(y, horizon, rng, size, block, *holt_params)
+    if model == 'loglinear':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.exp(_trend_paths(np.where(y > 0, np.log(y), np.nan), horizon, rng, size, block))
+    return _trend_paths(y, horizon, rng, size, block)
+
+
+def bootstrap_bounds(model, y, horizon, level, replicates=DEFAULT_REPLICATES,
+                     block=DEFAULT_BLOCK, seed=DEFAULT_SEED, holt_params=None, mapper=map):
+    """
+    (lower, upper) prediction bounds from `replicates` bootstrap paths.
+
+    Replicates are drawn in chunks of BOOTSTRAP_CHUNK, each from its own
+    child of SeedSequence((seed, model)), so the bounds depend on the
+    seed only — not on how many processes `mapper` spreads the chunks over.
+    """
+    sizes = [BOOTSTRAP_CHUNK] * (replicates // BOOTSTRAP_CHUNK)
+    if replicates % BOOTSTRAP_CHUNK:
+        sizes.append(replicates % BOOTSTRAP_CHUNK)
+    seeds = np.random.SeedSequence([seed, MODELS.index(model)]).spawn(len(sizes))
+    n = len(sizes)
+    chunks = mapper(_bootstrap_chunk, [model] * n, [y] * n, [horizon] * n, [block] * n,
+                 seeds, sizes, [holt_params] * n)
+    paths = np.concatenate(list(chunks))
+    tail = (1 - level) / 2
+    lower, upper = np.quantile(paths, [tail, 1 - tail], axis=0)
+    return lower, upper
+
+
+# ── Entry points ─────────────────────────────────────────────────────────────
+
+def forecast_all(pop: PopulationMatrix, models=MODELS, start=DEFAULT_START, end=None,
+                 horizon: int = DEFAULT_HORIZON, level: float = DEFAULT_LEVEL,
+                 bootstrap: int = 0, block: int = DEFAULT_BLOCK, seed: int = DEFAULT_SEED,
+                 jobs: int = 1) -> dict:
+    """
+    {model: Forecast} for every GEO fit_window() keeps, fitted on
+    quarters [start, end].
+    With bootstrap > 0 the intervals come from that many bootstrap
+    replicates, spread over `jobs` worker processes.
+    """
+    geos, y, dates = fit_window(pop, start, end)
+    if not geos:
+        raise ValueError(f'no GEO has enough quarters to fit between {dates[0]} and {dates[-1]}'
+                         if len(dates) else f'no quarters between {start} and {end}')
+    future = future_dates(dates[-1], horizon)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    out = {}
+    with contextlib.ExitStack() as stack:
+        mapper = map
+        if bootstrap and jobs > 1:
+            mapper = stack.enter_context(ProcessPoolExecutor(max_workers=jobs)).map
+        for model in models:
+            with stage(f'fit_{model}', 'data'):
+                mean, lower, upper, params = _FITTERS[model](y, horizon, z)
+            interval = 'normal'
+            if bootstrap:
+                holt = (params['alpha'], params['beta']) if model == 'holt' else None
+                with stage(f'bootstrap_{model}', 'data', replicates=bootstrap):
+                    lower, upper = bootstrap_bounds(model, y, horizon, level, bootstrap,
+                                                    block, seed, holt, mapper)
+                lower[np.isnan(mean)] = upper[np.isnan(mean)] = np.nan
+                interval = 'bootstrap'
+            out[model] = Forecast(model, geos, future, mean, lower, upper, level, params, interval)
+    return out
+
+
+def projections_frame(forecasts: dict) -> pd.DataFrame:
+    """Every model's projections as one long table."""
+    return pd.concat([fc.to_frame() for fc in forecasts.values()], ignore_index=True)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Project every GEO in 17100009.csv.')
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=list(MODELS))
+    parser.add_argument('--start', default=DEFAULT_START,
+                        help=f'first quarter of the fit window (default: {DEFAULT_START})')
+    parser.add_argument('--end', help='last quarter of the fit window (default: latest)')
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON,
+                        help=f'quarters to project (default: {DEFAULT_HORIZON})')
+    parser.add_argument('--level', type=float, default=DEFAULT_LEVEL,
+                        help=f'prediction interval coverage (default: {DEFAULT_LEVEL})')
+    boot = parser.add_argument_group('bootstrap intervals')
+    boot.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                      help='replace the normal-theory intervals with N bootstrap replicates '
+                           f'(e.g. {DEFAULT_REPLICATES})')
+    boot.add_argument('--block', type=int, default=DEFAULT_BLOCK,
+                      help=f'quarters per resampled residual block (default: {DEFAULT_BLOCK}; '
+                           '1 = plain residual bootstrap)')
+    boot.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                      help=f'bootstrap seed (default: {DEFAULT_SEED})')
+    boot.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                      help='worker processes for the replicates (default: CPU count)')
+    parser.add_argument('--output', '-o', type=Path, default=OUTPUT_CSV)
+    parser.add_argument('--parquet', action='store_true',
+                        help='also write a .parquet copy (needs pyarrow)')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not 0 < args.level < 1:
+        parser.error('--level must be between 0 and 1')
+    if args.bootstrap < 0 or args.block < 1:
+        parser.error('--bootstrap must be >= 0 and --block >= 1')
+    profiling.configure(args, 'population_forecast')
+
+    with stage('load_population', 'data'):
+        pop = PopulationMatrix.from_frame(load_population_table())
+    try:
+        forecasts = forecast_all(pop, args.models, args.start, args.end, args.horizon, args.level,
+                                 args.bootstrap, args.block, args.seed, args.jobs)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    ab = forecasts[args.models[0]].row('Alberta')
+    print(f'\n=== Alberta, {forecasts[args.models[0]].dates[-1]} '
+          f'({args.horizon} quarters ahead, {args.level:.0%} '
+          f'{"bootstrap " if args.bootstrap else ""}interval) ===')
+    for model, fc in forecasts.items():
+        print(f'  {model:<10s} {fc.mean[ab, -1]:>12,.0f}   '
+              f'[{fc.lower[ab, -1]:,.0f} – {fc.upper[ab, -1]:,.0f}]')
+
+    with stage('write_csv', 'io', file=args.output.name):
+        written = write_table(projections_frame(forecasts), args.output, parquet=args.parquet)
+    print(f'\nProjections for {len(forecasts[args.models[0]].geos)} of {len(pop.geos)} '
+          f'geographies: {describe(written)}')
+    profiling.finish()
+
+
+if __name__ == '__main__':
+    main()
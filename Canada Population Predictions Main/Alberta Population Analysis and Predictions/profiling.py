@@ -0,0 +1,254 @@
+"""
+profiling.py
+────────────
+Opt-in stage instrumentation for the chart and CSV scripts (--profile).
+
+Code marks its steps with `with stage('savefig'):`. While profiling is
+off — the default — stage() is a shared no-op context manager, so the
+markers cost nothing. With it on, every stage records
+
+    wall time   time.perf_counter
+    CPU time    time.process_time (this process, all threads)
+    max RSS     the process's resident-set high-water mark at stage end
+    peak memory tracemalloc peak above the stage's starting usage
+                (only with --profile-memory; tracing slows Python code)
+
+Stages nest, so a chart shows its tight_layout and savefig as children.
+write_trace() saves the records as a Chrome trace (.json — open it in
+chrome://tracing or ui.perfetto.dev) or as one JSON record per line
+(.jsonl). Worker processes hand their records back with drain().
+
+Usage:
+    import profiling
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    profiling.configure(args, 'regenerate_plots')
+    with profiling.stage('load', 'data'):
+        ...
+    profiling.finish()
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:                       # Windows
+    resource = None
+
+SCRIPT_DIR  = Path(__file__).resolve().parent
+PROFILE_DIR = SCRIPT_DIR / '.cache' / 'profile'
+
+_NULL = contextlib.nullcontext()
+
+_state = {
+    'enabled': False,
+    'memory':  False,
+    'cprofile_dir': None,
+    'output':  None,
+}
+_events = []
+_stack = []
+
+
+def enabled() -> bool:
+    return _state['enabled']
+
+
+def enable(memory: bool = False, cprofile_dir=None, output=None):
+    """Start recording stages (and tracemalloc, when memory is True)."""
+    _state.update(enabled=True, memory=memory, output=output,
+                  cprofile_dir=Path(cprofile_dir) if cprofile_dir else None)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def settings() -> dict:
+    """The current switches, for passing to worker processes."""
+    return {k: _state[k] for k in ('enabled', 'memory', 'cprofile_dir')}
+
+
+def apply_settings(opts: dict):
+    """
+    Set up a worker process from settings(). Records a forked worker
+    inherited from its parent are dropped so drain() returns its own.
+    """
+    _events.clear()
+    if opts.get('enabled'):
+        enable(opts.get('memory', False), opts.get('cprofile_dir'))
+
+
+# ── Stages ───────────────────────────────────────────────────────────────────
+
+def _max_rss() -> int:
+    if resource is None:
+        return 0
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Stage:
+    __slots__ = ('name', 'cat', 'args', 't0', 'cpu0', 'ts', 'mem0', 'peak')
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        if _state['memory']:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem0 = self.peak = current
+        _stack.append(self)
+        self.ts = time.time_ns() // 1000
+        self.cpu0 = time.process_time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.t0
+        cpu = time.process_time() - self.cpu0
+        _stack.pop()
+        event = {
+            'name': self.name, 'cat': self.cat, 'ts': self.ts, 'dur': round(wall * 1e6),
+            'pid': os.getpid(), 'tid': threading.get_ident(),
+            'wall_s': wall, 'cpu_s': cpu, 'max_rss': _max_rss(),
+            'depth': len(_stack), **self.args,
+        }
+        if _state['memory']:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            event['peak_mem'] = self.peak - self.mem0
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, self.peak)
+        _events.append(event)
+        return False
+
+
+def stage(name: str, cat: str = 'stage', **args):
+    """Context manager timing one step; a no-op unless profiling is enabled."""
+    if not _state['enabled']:
+        return _NULL
+    return _Stage(name, cat, args)
+
+
+@contextlib.contextmanager
+def cprofiled(name: str):
+    """
+    Run the with-block under cProfile when a cProfile directory is set,
+    dumping <dir>/<name>.prof (view with snakeviz or pstats).
+    """
+    out_dir = _state['cprofile_dir']
+    if out_dir is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(out_dir / f'{name}.prof')
+
+
+def profile_call(name: str, func, *args):
+    """func(*args) under cprofiled(name)."""
+    with cprofiled(name):
+        return func(*args)
+
+
+# ── Records ──────────────────────────────────────────────────────────────────
+
+def drain() -> list:
+    """Remove and return the records collected in this process."""
+    events = list(_events)
+    _events.clear()
+    return events
+
+
+def extend(events):
+    """Add records collected in another process."""
+    _events.extend(events)
+
+
+def write_trace(path, events=None) -> Path:
+    """
+    Save records to path: Chrome trace event format for .json,
+    one JSON object per line for .jsonl.
+    """
+    path = Path(path)
+    events = _events if events is None else events
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.jsonl':
+        with open(path, 'w') as fh:
+            for e in events:
+                fh.write(json.dumps(e) + '\n')
+        return path
+
+    trace = []
+    for e in events:
+        args = {k: v for k, v in e.items() if k not in ('name', 'cat', 'ts', 'dur', 'pid', 'tid')}
+        trace.append({'name': e['name'], 'cat': e['cat'], 'ph': 'X', 'ts': e['ts'],
+                      'dur': e['dur'], 'pid': e['pid'], 'tid': e['tid'], 'args': args})
+    path.write_text(json.dumps({'traceEvents': trace, 'displayTimeUnit': 'ms'}))
+    return path
+
+
+def print_summary(events=None):
+    """Wall / CPU / memory per stage, children indented under parents."""
+    events = _events if events is None else events
+    print('\n--- Profile ---')
+    width = max([2 * e['depth'] + len(e['name']) + len(e.get('file', '')) + 3
+                 for e in events] + [5])
+    memory = any('peak_mem' in e for e in events)
+    head = f'  {"stage":<{width}}  {"wall":>8}  {"cpu":>8}  {"max rss":>9}'
+    print(head + (f'  {"peak mem":>9}' if memory else ''))
+    for e in sorted(events, key=lambda e: (e['pid'], e['ts'], e['depth'])):
+        name = '  ' * e['depth'] + e['name'] + (f' [{e["file"]}]' if 'file' in e else '')
+        line = (f'  {name:<{width}}  {e["wall_s"]:7.3f}s  {e["cpu_s"]:7.3f}s'
+                f'  {e["max_rss"] / 2**20:7.1f}MB')
+        if memory:
+            line += f'  {e.get("peak_mem", 0) / 2**20:7.1f}MB'
+        print(line)
+
+
+# ── Command line ─────────────────────────────────────────────────────────────
+
+def add_arguments(parser):
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', nargs='?', const='', metavar='PATH',
+                       help='record per-stage wall/CPU time and memory; writes a Chrome '
+                            'trace (.json, default .cache/profile/<script>.trace.json) '
+                            'or a JSON-lines log (.jsonl)')
+    group.add_argument('--profile-memory', action='store_true',
+                       help='with --profile, also trace peak Python memory per stage (slower)')
+    group.add_argument('--cprofile', nargs='?', const='', metavar='DIR',
+                       help='dump a cProfile .prof file per chart (default .cache/profile/)')
+
+
+def configure(args, script: str):
+    """Turn profiling on if the parsed args ask for it."""
+    if args.profile is None and args.cprofile is None:
+        return
+    output = None
+    if args.profile is not None:
+        output = Path(args.profile) if args.profile else PROFILE_DIR / f'{script}.trace.json'
+    cprofile_dir = None
+    if args.cprofile is not None:
+        cprofile_dir = Path(args.cprofile) if args.cprofile else PROFILE_DIR
+    enable(memory=args.profile_memory, cprofile_dir=cprofile_dir, output=output)
+
+
+def finish():
+    """Print the summary and write the trace requested by configure()."""
+    if not _state['enabled'] or _state['output'] is None:
+        return
+    print_summary()
+    print(f'Profile: {write_trace(_state["output"])}')
@@ -4,18 +4,61 @@ regenerate_plots.py
 Regenerates all 13 charts in plots/ using a unified
 Dark Grey + Gold color scheme.
 
+Only charts whose data slice, plotting function or shared code (theme,
+helpers, save path) changed since the last run are re-rendered;
+fingerprints live in .cache/render_manifest.json.
+Every rendered file is also kept in the shared data store under its
+fingerprint, so a chart another copy of the project (or an earlier run)
+already drew is checked out instead of rendered again.
+
 Usage:
-    python regenerate_plots.py
+    python regenerate_plots.py            # one worker process per CPU
+    python regenerate_plots.py --jobs 4   # cap the render pool
+    python regenerate_plots.py --jobs 1   # render serially in-process
+    python regenerate_plots.py --force    # ignore the manifest, re-render all
+    python regenerate_plots.py --force --profile   # per-stage timings + Chrome trace
+    python regenerate_plots.py --formats png print thumb webp svg --optimize-png
+    python regenerate_plots.py --prices real       # spending in constant (CPI) dollars
+
+    # Population charts for other provinces and windows, into plots/provinces/
+    python regenerate_plots.py --geos Ontario Quebec --years 2000-2025 2012-2025
+    python regenerate_plots.py --geos provinces --charts population_growth yoy_growth
 """
 
+import argparse
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import matplotlib.colors as mcolors
-import seaborn as sns
 from pathlib import Path
 
+import chart_export
+import data_store
+import profiling
+from lazy_modules import lazy_import
+from profiling import stage
+from statcan_data import load_population_table, PopulationMatrix
+from budget_extract import headline_spending
+from cpi_index import NOMINAL, PRICES, deflate, price_label
+from spending_series import annual_frame, load_annual_spending
+
+# The plotting stack is imported on first use, so a run with every chart
+# up to date (or an import from a data-only tool) never loads it.
+matplotlib = lazy_import('matplotlib')
+plt        = lazy_import('matplotlib.pyplot')
+mticker    = lazy_import('matplotlib.ticker')
+mcolors    = lazy_import('matplotlib.colors')
+mpatches   = lazy_import('matplotlib.patches')
+sns        = lazy_import('seaborn')
+
 # ═══ UNIFIED DARK GREY + GOLD THEME ════════════════════════════════════════
 BG_FIG   = '#1A1A1A'   # figure outer background
 BG_AX    = '#242424'   # axes / plot area
@@ -59,7 +102,13 @@ THEME_RC = {
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 PLOTS_DIR  = SCRIPT_DIR / 'plots'
-DATA_CSV   = SCRIPT_DIR / '17100009.csv'
+DATA_CSV   = data_store.source('17100009.csv')
+BUDGET_DIR = data_store.source('budget_data')
+MANIFEST   = SCRIPT_DIR / '.cache' / 'render_manifest.json'
+BATCH_DIR  = 'provinces'      # under PLOTS_DIR
+
+# Quarterly window shown by the Alberta growth charts (inclusive)
+AB_WINDOW = ('2012-01', '2025-01')
 
 
 # ── Helpers ─────────────────────────────────────────────────────────────────
@@ -76,68 +125,201 @@ def style_legend(leg):
         t.set_color(C_TEXT)
 
 
+def _year(when, default):
+    """Calendar year of a window bound (1990, '2012-01', None -> default)."""
+    return default if when is None else int(str(when)[:4])
+
+
+# Set by capture_png(): save_figure() then encodes into memory instead of plots/.
+_CAPTURE = None
+# Set by reuse_figures(): {key: FigureTemplate} of charts kept open for reuse.
+_TEMPLATES = None
+# Formats save_figure() writes (see chart_export.FORMATS); set by --formats.
+_FORMATS = ('png',)
+
+
+@contextlib.contextmanager
+def capture_png(dpi=150):
+    """
+    Collect the PNGs written by plot_* calls inside the block as
+    {filename: bytes}, rendered at dpi, instead of saving them to plots/.
+    """
+    global _CAPTURE
+    previous, _CAPTURE = _CAPTURE, {'dpi': dpi, 'png': {}}
+    try:
+        yield _CAPTURE['png']
+    finally:
+        _CAPTURE = previous
+
+
+class FigureTemplate:
+    """A drawn chart kept open so the next variant only updates its artists."""
+
+    def __init__(self, fig, **artists):
+        self.fig = fig
+        # tight_layout() starts from the current margins, so each variant
+        # is laid out from the margins the figure was built with.
+        self.margins = {k: getattr(fig.subplotpars, k)
+                        for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+        self.__dict__.update(artists)
+
+
+@contextlib.contextmanager
+def reuse_figures():
+    """
+    Inside the block, charts that support it keep their first figure as
+    a template: later calls update its lines, bars and text in place
+    and re-save, skipping figure construction, theming and styling.
+    Closes the templates on exit.
+    """
+    global _TEMPLATES
+    previous, _TEMPLATES = _TEMPLATES, {}
+    try:
+        yield
+    finally:
+        for tpl in _TEMPLATES.values():
+            plt.close(tpl.fig)
+        _TEMPLATES = previous
+
+
+def template(key):
+    """The kept figure for key (made current), or None outside reuse_figures()."""
+    tpl = _TEMPLATES.get(key) if _TEMPLATES is not None else None
+    if tpl is not None:
+        plt.figure(tpl.fig)
+        tpl.fig.subplots_adjust(**tpl.margins)
+    return tpl
+
+
+def keep_template(key, fig, **artists):
+    if _TEMPLATES is not None:
+        _TEMPLATES[key] = FigureTemplate(fig, **artists)
+
+
+def _refill(ax, fill, x, y, **kwargs):
+    """Redraw a fill_between area for new data and rescale ax to the new data."""
+    fill.remove()
+    ax.relim()                      # relim() skips collections; fill_between re-adds its extent
+    fill = ax.fill_between(x, y, **kwargs)
+    ax.autoscale_view()
+    return fill
+
+
+def _set_bars(axes, bars, heights, colors):
+    """Update bar heights and colours in place and rescale the (shared) axes."""
+    for rect, height, color in zip(bars, heights, colors):
+        rect.set_height(height)
+        rect.set_facecolor(color)
+    for ax in axes:
+        ax.relim()
+    for ax in axes:
+        ax.autoscale_view()
+
+
+def save_figure(filename):
+    """Lay out the current figure, write it to plots/ and close it (unless it is a template)."""
+    fig = plt.gcf()
+    with stage('tight_layout', 'render'):
+        fig.tight_layout()
+    # fig.savefig, not plt.savefig: pyplot redraws the whole canvas afterwards.
+    if _CAPTURE is not None:
+        buf = io.BytesIO()
+        with stage('savefig', 'render', file=filename):
+            fig.savefig(buf, format='png', dpi=_CAPTURE['dpi'], bbox_inches='tight')
+        _CAPTURE['png'][filename] = buf.getvalue()
+    elif _FORMATS != ('png',):
+        with stage('export', 'render', file=filename):
+            chart_export.export_figure(fig, filename, _FORMATS, PLOTS_DIR)
+        print(f'Saved -> plots/{filename} ({", ".join(_FORMATS)})')
+    else:
+        path = PLOTS_DIR / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with stage('savefig', 'render', file=filename):
+            fig.savefig(path, dpi=150, bbox_inches='tight')
+        print(f'Saved -> plots/{filename}')
+    if not any(tpl.fig is fig for tpl in (_TEMPLATES or {}).values()):
+        plt.close(fig)
+
+
 # ── Data loading ─────────────────────────────────────────────────────────────
 
 def load_population():
-    df = pd.read_csv(DATA_CSV)
-    df['REF_DATE'] = pd.to_datetime(df['REF_DATE'])
-    df['VALUE'] = pd.to_numeric(df['VALUE'], errors='coerce')
-    return df[['REF_DATE', 'GEO', 'VALUE']]
+    return load_population_table(DATA_CSV)
+
+
+def build_population_matrix(df_raw):
+    return PopulationMatrix.from_frame(df_raw)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # PLOT 1 — Alberta Population Growth (line chart)
 # ════════════════════════════════════════════════════════════════════════════
 
-def plot_population_growth(df_raw):
-    apply_theme()
-    alberta = df_raw[
-        (df_raw['GEO'] == 'Alberta') &
-        (df_raw['REF_DATE'] >= '2012-01-01') &
-        (df_raw['REF_DATE'] <= '2025-01-01')
-    ].copy().sort_values('REF_DATE')
+def plot_population_growth(pop, geo='Alberta', start=AB_WINDOW[0], end=AB_WINDOW[1],
+                           filename='alberta_population_growth.png'):
+    dates, values = pop.series(geo, start, end)
+    first, last = dates[[0, -1]].astype('datetime64[Y]').astype(int) + 1970
+    title = f'{geo} Population Growth ({first}–{last})'
 
+    tpl = template('population_growth')
+    if tpl is not None:
+        tpl.line.set_data(dates, values)
+        tpl.fill = _refill(tpl.ax, tpl.fill, dates, values, **tpl.fill_kw)
+        tpl.ax.title.set_text(title)
+        save_figure(filename)
+        return
+
+    apply_theme()
     fig, ax = plt.subplots(figsize=(12, 6))
-    ax.plot(alberta['REF_DATE'], alberta['VALUE'], linewidth=2.5, color=GOLD_2)
-    ax.fill_between(alberta['REF_DATE'], alberta['VALUE'], alpha=0.12, color=GOLD_2)
+    fill_kw = {'alpha': 0.12, 'color': GOLD_2}
+    line, = ax.plot(dates, values, linewidth=2.5, color=GOLD_2)
+    fill = ax.fill_between(dates, values, **fill_kw)
 
-    ax.set_title('Alberta Population Growth (2012–2025)', fontsize=16, fontweight='bold', pad=20)
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=12)
     ax.set_ylabel('Population', fontsize=12)
     ax.yaxis.set_major_formatter(mticker.EngFormatter())
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'alberta_population_growth.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/alberta_population_growth.png')
+    keep_template('population_growth', fig, ax=ax, line=line, fill=fill, fill_kw=fill_kw)
+    save_figure(filename)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # PLOT 2 — Quarterly Growth Rate (bar chart)
 # ════════════════════════════════════════════════════════════════════════════
 
-def plot_quarterly_growth_rate(df_raw):
-    apply_theme()
-    alberta = df_raw[
-        (df_raw['GEO'] == 'Alberta') &
-        (df_raw['REF_DATE'] >= '2012-01-01') &
-        (df_raw['REF_DATE'] <= '2025-01-01')
-    ].copy().sort_values('REF_DATE').reset_index(drop=True)
-    alberta['Growth_Rate_Pct'] = alberta['VALUE'].pct_change() * 100
-
-    colors = [GOLD_1 if x >= 1.0 else GOLD_DIM
-              for x in alberta['Growth_Rate_Pct'].fillna(0)]
-    avg = alberta['Growth_Rate_Pct'].mean()
+def plot_quarterly_growth_rate(pop, geo='Alberta', start=AB_WINDOW[0], end=AB_WINDOW[1],
+                               filename='quarterly_growth_rate.png'):
+    dates, values = pop.series(geo, start, end)
+    growth = np.empty_like(values)
+    growth[0] = np.nan
+    growth[1:] = (values[1:] / values[:-1] - 1) * 100
+
+    colors = np.where(np.nan_to_num(growth) >= 1.0, GOLD_1, GOLD_DIM)
+    avg = np.nanmean(growth)
+    title = f'{geo}: Quarterly Population Growth Rate (%)'
+    label = f'Average: {avg:.2f}%'
+
+    # One bar per quarter, so a template only fits the same window.
+    key = f'quarterly_growth_rate[{dates[0]}+{len(dates)}]'
+    tpl = template(key)
+    if tpl is not None:
+        tpl.avg_line.set_ydata([avg, avg])
+        tpl.legend.get_texts()[0].set_text(label)
+        _set_bars([tpl.ax], tpl.bars, growth, colors)
+        tpl.ax.title.set_text(title)
+        save_figure(filename)
+        return
 
+    apply_theme()
     fig, ax = plt.subplots(figsize=(14, 6))
-    ax.bar(alberta['REF_DATE'], alberta['Growth_Rate_Pct'],
-           width=60, color=colors, edgecolor=BG_FIG, linewidth=0.5)
+    bars = ax.bar(dates, growth,
+                  width=60, color=colors, edgecolor=BG_FIG, linewidth=0.5)
     ax.axhline(y=0, color=C_EDGE, linewidth=0.8)
-    ax.axhline(y=avg, color=GOLD_2, linewidth=2, linestyle='--',
-               label=f'Average: {avg:.2f}%')
+    avg_line = ax.axhline(y=avg, color=GOLD_2, linewidth=2, linestyle='--', label=label)
 
-    ax.set_title('Alberta: Quarterly Population Growth Rate (%)', fontsize=16, fontweight='bold', pad=20)
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Date', fontsize=12)
     ax.set_ylabel('Growth Rate (%)', fontsize=12)
 
@@ -145,120 +327,149 @@ def plot_quarterly_growth_rate(df_raw):
     style_legend(leg)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'quarterly_growth_rate.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/quarterly_growth_rate.png')
+    keep_template(key, fig, ax=ax, bars=bars, avg_line=avg_line, legend=leg)
+    save_figure(filename)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # PLOT 3 — Alberta's Share of Canada's Population (area chart)
 # ════════════════════════════════════════════════════════════════════════════
 
-def plot_population_share(df_raw):
-    apply_theme()
-    alberta = df_raw[df_raw['GEO'] == 'Alberta'].copy().sort_values('REF_DATE')
-    canada  = df_raw[df_raw['GEO'] == 'Canada'].copy().sort_values('REF_DATE')
-
-    share = alberta.merge(canada, on='REF_DATE', suffixes=('_AB', '_CA'))
-    share['AB_Share_Pct'] = (share['VALUE_AB'] / share['VALUE_CA']) * 100
+def plot_population_share(pop, geo='Alberta', start=None, end=None,
+                          filename='alberta_population_share.png'):
+    dates, region = pop.series(geo, start, end)
+    _, canada     = pop.series('Canada', start, end)
+
+    known = ~(np.isnan(region) | np.isnan(canada))
+    dates = dates[known]
+    share = (region[known] / canada[known]) * 100
+    title = f"{geo}'s Share of Canada's Total Population (%)"
+
+    tpl = template('population_share')
+    if tpl is not None:
+        tpl.line.set_data(dates, share)
+        tpl.fill = _refill(tpl.ax, tpl.fill, dates, share, **tpl.fill_kw)
+        for ann, i in zip(tpl.labels, (0, -1)):
+            ann.xy = ann.xyann = (dates[i], share[i])
+            ann.set_text(f'{share[i]:.1f}%')
+        tpl.ax.title.set_text(title)
+        save_figure(filename)
+        return
 
+    apply_theme()
     fig, ax = plt.subplots(figsize=(14, 6))
-    ax.plot(share['REF_DATE'], share['AB_Share_Pct'], linewidth=2.5, color=GOLD_2)
-    ax.fill_between(share['REF_DATE'], share['AB_Share_Pct'], alpha=0.15, color=GOLD_2)
+    fill_kw = {'alpha': 0.15, 'color': GOLD_2}
+    line, = ax.plot(dates, share, linewidth=2.5, color=GOLD_2)
+    fill = ax.fill_between(dates, share, **fill_kw)
 
-    ax.set_title("Alberta's Share of Canada's Total Population (%)", fontsize=16, fontweight='bold', pad=20)
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=12)
     ax.set_ylabel('Share (%)', fontsize=12)
 
-    first, last = share.iloc[0], share.iloc[-1]
-    ax.annotate(f"{first['AB_Share_Pct']:.1f}%",
-                xy=(first['REF_DATE'], first['AB_Share_Pct']),
-                fontsize=11, fontweight='bold', color=GOLD_1)
-    ax.annotate(f"{last['AB_Share_Pct']:.1f}%",
-                xy=(last['REF_DATE'], last['AB_Share_Pct']),
-                fontsize=11, fontweight='bold', color=GOLD_1)
+    labels = [ax.annotate(f'{share[i]:.1f}%', xy=(dates[i], share[i]),
+                          fontsize=11, fontweight='bold', color=GOLD_1)
+              for i in (0, -1)]
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'alberta_population_share.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/alberta_population_share.png')
+    keep_template('population_share', fig, ax=ax, line=line, fill=fill, fill_kw=fill_kw,
+                  labels=labels)
+    save_figure(filename)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # PLOT 4 — Year-over-Year Growth Analysis (dual bar chart)
 # ════════════════════════════════════════════════════════════════════════════
 
-def plot_yoy_growth(df_raw):
-    apply_theme()
-    alberta_all = df_raw[df_raw['GEO'] == 'Alberta'].copy().sort_values('REF_DATE').reset_index(drop=True)
+def plot_yoy_growth(pop, geo='Alberta', start=1990, end=None,
+                    filename='yoy_growth_analysis.png'):
+    years, values = pop.annual(geo, month=1)
 
-    q1 = alberta_all[alberta_all['REF_DATE'].dt.month == 1].copy().reset_index(drop=True)
-    q1['Year'] = q1['REF_DATE'].dt.year
+    q1 = pd.DataFrame({'Year': years, 'VALUE': values}).dropna().reset_index(drop=True)
     q1['YoY_Change']     = q1['VALUE'].diff()
     q1['YoY_Growth_Pct'] = q1['VALUE'].pct_change() * 100
-    q1 = q1[q1['Year'] >= 1990]
+    q1 = q1[q1['Year'].between(_year(start, 0), _year(end, 9999))]
 
     colors1 = [C_NEG if x < 0 else GOLD_2 for x in q1['YoY_Change'].fillna(0)]
     colors2 = [C_NEG if x < 0 else GOLD_2 for x in q1['YoY_Growth_Pct'].fillna(0)]
+    title1 = f'{geo}: Year-over-Year Population Change (Absolute)'
+    title2 = f'{geo}: Year-over-Year Population Growth Rate (%)'
+
+    # One bar per year, so a template only fits the same years.
+    key = f'yoy_growth[{q1["Year"].iloc[0]}+{len(q1)}]'
+    tpl = template(key)
+    if tpl is not None:
+        _set_bars([tpl.ax1, tpl.ax2], tpl.bars1, q1['YoY_Change'], colors1)
+        _set_bars([tpl.ax1, tpl.ax2], tpl.bars2, q1['YoY_Growth_Pct'], colors2)
+        tpl.ax1.title.set_text(title1)
+        tpl.ax2.title.set_text(title2)
+        save_figure(filename)
+        return
 
+    apply_theme()
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
 
-    ax1.bar(q1['Year'], q1['YoY_Change'], color=colors1, edgecolor=BG_FIG, linewidth=0.5)
-    ax1.set_title('Alberta: Year-over-Year Population Change (Absolute)', fontsize=14, fontweight='bold', pad=15)
+    bars1 = ax1.bar(q1['Year'], q1['YoY_Change'], color=colors1, edgecolor=BG_FIG, linewidth=0.5)
+    ax1.set_title(title1, fontsize=14, fontweight='bold', pad=15)
     ax1.set_ylabel('Population Change', fontsize=12)
     ax1.yaxis.set_major_formatter(mticker.EngFormatter())
     ax1.axhline(y=0, color=C_EDGE, linewidth=0.8)
 
-    ax2.bar(q1['Year'], q1['YoY_Growth_Pct'], color=colors2, edgecolor=BG_FIG, linewidth=0.5)
-    ax2.set_title('Alberta: Year-over-Year Population Growth Rate (%)', fontsize=14, fontweight='bold', pad=15)
+    bars2 = ax2.bar(q1['Year'], q1['YoY_Growth_Pct'], color=colors2, edgecolor=BG_FIG, linewidth=0.5)
+    ax2.set_title(title2, fontsize=14, fontweight='bold', pad=15)
     ax2.set_xlabel('Year', fontsize=12)
     ax2.set_ylabel('Growth Rate (%)', fontsize=12)
     ax2.axhline(y=0, color=C_EDGE, linewidth=0.8)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'yoy_growth_analysis.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/yoy_growth_analysis.png')
+    keep_template(key, fig, ax1=ax1, ax2=ax2, bars1=bars1, bars2=bars2)
+    save_figure(filename)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # SHARED — Spending / integration data
 # ════════════════════════════════════════════════════════════════════════════
 
-_SPENDING = pd.DataFrame([
-    {'Fiscal_Year': '2012-13', 'Year': 2012, 'K12_M': 6179,  'PostSec_M': 2856},
-    {'Fiscal_Year': '2013-14', 'Year': 2013, 'K12_M': 6210,  'PostSec_M': 2682},
-    {'Fiscal_Year': '2023-24', 'Year': 2023, 'K12_M': 8836,  'PostSec_M': 5604},
-    {'Fiscal_Year': '2024-25', 'Year': 2024, 'K12_M': 9252,  'PostSec_M': 6305},
-    {'Fiscal_Year': '2025-26', 'Year': 2025, 'K12_M': 9883,  'PostSec_M': 6635},
-])
-_SPENDING['Total_M'] = _SPENDING['K12_M'] + _SPENDING['PostSec_M']
-
-
-def build_integrated_df(df_raw):
-    pop = df_raw[
-        (df_raw['GEO'] == 'Alberta') &
-        (df_raw['REF_DATE'].dt.month == 1) &
-        (df_raw['REF_DATE'].dt.year.between(2012, 2025))
-    ][['REF_DATE', 'VALUE']].copy()
-    pop.columns = ['Date', 'Population']
-    pop['Year'] = pop['Date'].dt.year
-    pop = pop[['Year', 'Population']].reset_index(drop=True)
-
-    df = _SPENDING.merge(pop, on='Year', how='left')
-    df['K12_PerCapita']     = (df['K12_M']     * 1_000_000) / df['Population']
-    df['PostSec_PerCapita'] = (df['PostSec_M'] * 1_000_000) / df['Population']
-    df['Total_PerCapita']   = (df['Total_M']   * 1_000_000) / df['Population']
-
-    base = df.iloc[0]
-    df['Pop_Index']     = (df['Population'] / base['Population']) * 100
-    df['K12_Index']     = (df['K12_M']      / base['K12_M'])      * 100
-    df['PostSec_Index'] = (df['PostSec_M']  / base['PostSec_M'])  * 100
-    df['Total_Index']   = (df['Total_M']    / base['Total_M'])    * 100
-    return df
+def load_spending():
+    """Headline K-12 / post-secondary estimates, one row per budget year."""
+    return headline_spending(BUDGET_DIR)
+
+
+def priced_spending(spending, prices='nominal'):
+    """spending as is, or with its $M columns in the latest year's dollars."""
+    if prices == 'real':
+        return deflate(spending, ['K12_M', 'PostSec_M', 'Total_M'])
+    return spending
+
+
+def priced(title, df):
+    """title, with the real-dollar label appended when df was deflated."""
+    label = price_label(df)
+    return title if label == NOMINAL else f'{title}  |  {label}'
+
+
+def build_integrated_df(pop, annual, prices='nominal'):
+    """
+    Every fiscal year from 2012-13 with Q1 population, per-capita and
+    2012-13 = 100 index columns: spending_series.annual_frame(), whose
+    aligned() keeps spending and population on years both cover.
+    """
+    return annual_frame(pop, annual, prices=prices)
+
+
+def shade_interpolated(ax, x, df, alpha=0.05):
+    """
+    Shade and label the interpolated rows of df, drawn at positions x.
+    Returns whether there were any.
+    """
+    filled = (df['Flag'] == 'interpolated').to_numpy()
+    if not filled.any():
+        return False
+    xs, labels = np.asarray(x)[filled], df['Fiscal_Year'].to_numpy()[filled]
+    ax.axvspan(xs[0] - 0.5, xs[-1] + 0.5, alpha=alpha, color=C_TICK, zorder=1)
+    ax.text((xs[0] + xs[-1]) / 2, 0.95, f'Interpolated\n{labels[0]} – {labels[-1]}',
+            transform=ax.get_xaxis_transform(), ha='center', va='top', fontsize=11,
+            color=C_TICK, style='italic')
+    return True
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -266,9 +477,10 @@ def build_integrated_df(df_raw):
 # ════════════════════════════════════════════════════════════════════════════
 
 def plot_integration_indexed(df):
+    """Every fiscal year from the annual series; interpolated spending is dashed."""
     apply_theme()
-    era1 = df[df['Year'].isin([2012, 2013])]
-    era2 = df[df['Year'].isin([2023, 2024, 2025])]
+    years = df['Year'].to_numpy()
+    reported = (df['Flag'] != 'interpolated').to_numpy()
 
     series = [
         ('Pop_Index',     GOLD_1, 'o', 'Population'),
@@ -279,29 +491,34 @@ def plot_integration_indexed(df):
 
     fig, ax = plt.subplots(figsize=(14, 7))
     for col, color, marker, label in series:
-        ax.plot(era1['Year'], era1[col], color=color, linewidth=3,
-                marker=marker, markersize=11, zorder=5, label=label)
-        ax.plot(era2['Year'], era2[col], color=color, linewidth=3,
-                marker=marker, markersize=11, zorder=5)
+        values = df[col].to_numpy()
+        if col == 'Pop_Index':
+            ax.plot(years, values, color=color, linewidth=3,
+                    marker=marker, markersize=9, zorder=5, label=label)
+            continue
+        # Solid between reported years, dashed through the interpolated ones.
+        ax.plot(years, values, color=color, linewidth=2, linestyle='--', alpha=0.6, zorder=4)
+        ax.plot(years, np.where(reported, values, np.nan), color=color, linewidth=3,
+                marker=marker, markersize=9, zorder=5, label=label)
 
     ax.axhline(100, color=C_TICK, linewidth=1.2, linestyle='--',
                alpha=0.55, label='2012-13 Baseline (= 100)')
-    ax.axvspan(2013.4, 2022.6, alpha=0.05, color=C_TICK, zorder=1)
-    ax.text(2018, 109, 'Data gap\n2014 – 2022', ha='center', fontsize=11,
-            color=C_TICK, style='italic')
+    if shade_interpolated(ax, years, df):
+        ax.plot([], [], color=C_TICK, linewidth=2, linestyle='--', alpha=0.6,
+                label='Spending, interpolated years')
 
     for col, color, _, _ in series:
         val = df.iloc[-1][col]
-        ax.text(2025.25, val, f'{val:.0f}', color=color,
+        ax.text(years[-1] + 0.25, val, f'{val:.0f}', color=color,
                 fontsize=10, fontweight='bold', va='center')
 
-    ax.set_xlim(2011, 2027)
-    ax.set_xticks(df['Year'].tolist())
+    ax.set_xlim(years[0] - 1, years[-1] + 2)
+    ax.set_xticks(years.tolist())
     ax.set_xlabel('Calendar Year (Q1 population snapshot)', fontsize=13, labelpad=10)
     ax.set_ylabel('Index  (2012-13 = 100)', fontsize=13, labelpad=10)
     ax.set_title(
         'Alberta: Population Growth vs. Education Spending\n'
-        'Indexed to 2012-13 = 100  |  Nominal figures',
+        f'Indexed to 2012-13 = 100  |  {price_label(df)}',
         fontsize=18, fontweight='bold', pad=20
     )
 
@@ -309,10 +526,7 @@ def plot_integration_indexed(df):
     style_legend(leg)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'integration_indexed_growth.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/integration_indexed_growth.png')
+    save_figure('integration_indexed_growth.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -320,49 +534,47 @@ def plot_integration_indexed(df):
 # ════════════════════════════════════════════════════════════════════════════
 
 def plot_integration_per_capita(df):
+    """Every fiscal year from the annual series; interpolated years are hatched."""
     apply_theme()
     labels = df['Fiscal_Year'].values
     x = np.arange(len(labels))
     w = 0.38
-
-    fig, ax = plt.subplots(figsize=(14, 7))
-    bars1 = ax.bar(x - w/2, df['K12_PerCapita'], w, label='K-12',
-                   color=GOLD_2, edgecolor=BG_FIG, linewidth=1.5)
-    bars2 = ax.bar(x + w/2, df['PostSec_PerCapita'], w, label='Post-Secondary',
-                   color=GOLD_3, edgecolor=BG_FIG, linewidth=1.5)
-
-    for bars, color in [(bars1, GOLD_2), (bars2, GOLD_3)]:
-        for bar in bars:
-            h = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2, h + 18,
-                    f'${h:,.0f}', ha='center', va='bottom',
-                    fontsize=9, fontweight='bold', color=color)
-
-    gap_y = df['K12_PerCapita'].max() * 0.62
-    ax.axvline(1.5, color=C_TICK, linewidth=1.2, linestyle=':', alpha=0.55)
-    ax.text(1.5, gap_y, '9-year\ndata gap', ha='center', va='center',
-            fontsize=10, color=C_TICK, style='italic',
-            bbox=dict(boxstyle='round,pad=0.3', facecolor=BG_AX,
-                      edgecolor=C_EDGE, alpha=0.85))
-
+    filled = (df['Flag'] == 'interpolated').to_numpy()
+
+    fig, ax = plt.subplots(figsize=(16, 7))
+    for offset, col, color, label in [(-w/2, 'K12_PerCapita',     GOLD_2, 'K-12'),
+                                      ( w/2, 'PostSec_PerCapita', GOLD_3, 'Post-Secondary')]:
+        values = df[col].to_numpy()
+        # Reported and interpolated years are one container each, so each
+        # group is styled and labelled in a single call.
+        for mask, style in [(~filled, dict(label=label)),
+                            (filled,  dict(alpha=0.45, hatch='//'))]:
+            bars = ax.bar(x[mask] + offset, values[mask], w, color=color,
+                          edgecolor=BG_FIG, linewidth=1.5, **style)
+            ax.bar_label(bars, fmt='${:,.0f}', padding=3, rotation=90,
+                         fontsize=8, fontweight='bold', color=color)
+
+    handles, _ = ax.get_legend_handles_labels()
+    if shade_interpolated(ax, x, df):
+        handles.append(mpatches.Patch(facecolor=C_TICK, alpha=0.45, hatch='//',
+                                      edgecolor=BG_FIG, label='Interpolated years'))
+
+    ax.set_ylim(0, df[['K12_PerCapita', 'PostSec_PerCapita']].to_numpy().max() * 1.3)
     ax.set_xticks(x)
-    ax.set_xticklabels(labels, fontsize=12, fontweight='bold')
+    ax.set_xticklabels(labels, fontsize=11, fontweight='bold')
     ax.set_ylabel('Spending per Capita ($)', fontsize=13, labelpad=10)
     ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda v, _: f'${v:,.0f}'))
     ax.set_title(
         'Alberta: Education Spending per Capita\n'
-        'K-12 vs Post-Secondary  |  Nominal figures',
+        f'K-12 vs Post-Secondary  |  {price_label(df)}',
         fontsize=18, fontweight='bold', pad=20
     )
 
-    leg = ax.legend(fontsize=13, loc='upper left', framealpha=0.7)
+    leg = ax.legend(handles=handles, fontsize=13, loc='upper left', framealpha=0.7)
     style_legend(leg)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'integration_per_capita.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/integration_per_capita.png')
+    save_figure('integration_per_capita.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -390,12 +602,12 @@ def plot_integration_growth_rates(df):
     fig, ax = plt.subplots(figsize=(12, 6))
     y = np.arange(len(metrics))
 
-    for i in range(len(metrics)):
-        ax.hlines(y[i], 0, pcts[i], color=colors[i], linewidth=4, alpha=0.85)
-        ax.scatter(pcts[i], y[i], color=colors[i], s=280, zorder=5,
-                   edgecolor=BG_FIG, linewidth=2)
-        ax.text(pcts[i] + 3, y[i], f'+{pcts[i]:.1f}%',
-                va='center', fontsize=14, fontweight='bold', color=colors[i])
+    # One collection for all stems and one for all heads.
+    ax.hlines(y, 0, pcts, colors=colors, linewidth=4, alpha=0.85)
+    ax.scatter(pcts, y, c=colors, s=280, zorder=5, edgecolor=BG_FIG, linewidth=2)
+    for yi, pct, color in zip(y, pcts, colors):
+        ax.text(pct + 3, yi, f'+{pct:.1f}%',
+                va='center', fontsize=14, fontweight='bold', color=color)
 
     pop_pct = pcts[0]
     ax.axvline(pop_pct, color=GOLD_1, linewidth=1.5, linestyle='--', alpha=0.45)
@@ -409,30 +621,27 @@ def plot_integration_growth_rates(df):
     ax.set_xlim(-5, max(pcts) * 1.3)
     ax.set_title(
         'Education Spending vs. Population Growth\n'
-        '2012-13 to 2025-26  |  Nominal figures',
+        f'{first["Fiscal_Year"]} to {last["Fiscal_Year"]}  |  {price_label(df)}',
         fontsize=18, fontweight='bold', pad=20
     )
     ax.axvline(0, color=C_EDGE, linewidth=1)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'integration_growth_rates.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/integration_growth_rates.png')
+    save_figure('integration_growth_rates.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # SHARED — Education spending headline/growth tables
 # ════════════════════════════════════════════════════════════════════════════
 
-def build_education_df():
-    headline = pd.DataFrame([
-        {'Budget_Year': 'Budget 2012', 'Fiscal_Year': '2012-13', 'K-12 ($M)': 6179,  'Post-Secondary ($M)': 2856},
-        {'Budget_Year': 'Budget 2013', 'Fiscal_Year': '2013-14', 'K-12 ($M)': 6210,  'Post-Secondary ($M)': 2682},
-        {'Budget_Year': 'Budget 2023', 'Fiscal_Year': '2023-24', 'K-12 ($M)': 8836,  'Post-Secondary ($M)': 5604},
-        {'Budget_Year': 'Budget 2024', 'Fiscal_Year': '2024-25', 'K-12 ($M)': 9252,  'Post-Secondary ($M)': 6305},
-        {'Budget_Year': 'Budget 2025', 'Fiscal_Year': '2025-26', 'K-12 ($M)': 9883,  'Post-Secondary ($M)': 6635},
-    ])
+def build_education_df(spending, prices='nominal'):
+    spending = priced_spending(spending, prices)
+    headline = pd.DataFrame({
+        'Budget_Year':         spending['Budget_Year'],
+        'Fiscal_Year':         spending['Fiscal_Year'],
+        'K-12 ($M)':           spending['K12_M'],
+        'Post-Secondary ($M)': spending['PostSec_M'],
+    }).reset_index(drop=True)
     headline['Total ($M)'] = headline['K-12 ($M)'] + headline['Post-Secondary ($M)']
 
     b2012 = headline[headline['Budget_Year'] == 'Budget 2012'].iloc[0]
@@ -444,6 +653,8 @@ def build_education_df():
     })
     growth['Change ($M)'] = growth['Budget 2025 ($M)'] - growth['Budget 2012 ($M)']
     growth['Change (%)']  = ((growth['Budget 2025 ($M)'] / growth['Budget 2012 ($M)']) - 1) * 100
+    headline.attrs.update(spending.attrs)
+    growth.attrs.update(spending.attrs)
     return headline, growth
 
 
@@ -467,14 +678,11 @@ def plot_infographic_k12_vs_postsec(headline):
     )
 
     for container in ax.containers:
-        for bar in container:
-            h = bar.get_height()
-            if h > 0:
-                ax.text(bar.get_x() + bar.get_width()/2, h + 100,
-                        f'${h:,.0f}M', ha='center', va='bottom',
-                        fontsize=9, fontweight='bold', color=C_TEXT)
-
-    ax.set_title('Alberta Education Operating Expense\nK-12 vs Post-Secondary (Headline Estimate)',
+        labels = [f'${h:,.0f}M' if h > 0 else '' for h in container.datavalues]
+        ax.bar_label(container, labels=labels, padding=4,
+                     fontsize=9, fontweight='bold', color=C_TEXT)
+
+    ax.set_title(priced('Alberta Education Operating Expense\nK-12 vs Post-Secondary (Headline Estimate)', headline),
                  fontsize=18, fontweight='bold', pad=20)
     ax.set_xlabel('', fontsize=12)
     ax.set_ylabel('Operating Expense ($ millions)', fontsize=13, labelpad=10)
@@ -488,10 +696,7 @@ def plot_infographic_k12_vs_postsec(headline):
     leg.get_title().set_color(C_TEXT)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_k12_vs_postsec.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_k12_vs_postsec.png')
+    save_figure('infographic_k12_vs_postsec.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -506,36 +711,30 @@ def plot_infographic_total_stacked(headline):
     y_pos   = np.arange(len(budgets))
 
     fig, ax = plt.subplots(figsize=(14, 6))
-    ax.barh(y_pos, k12, height=0.55, label='K-12',
-            color=GOLD_2, edgecolor=BG_FIG, linewidth=1.2)
-    ax.barh(y_pos, ps, height=0.55, left=k12, label='Post-Secondary',
-            color=GOLD_3, edgecolor=BG_FIG, linewidth=1.2)
-
-    for i in range(len(budgets)):
-        ax.text(k12[i]/2, y_pos[i], f'${k12[i]:,.0f}M',
-                ha='center', va='center', fontsize=10, fontweight='bold', color=BG_FIG)
-        ax.text(k12[i] + ps[i]/2, y_pos[i], f'${ps[i]:,.0f}M',
-                ha='center', va='center', fontsize=10, fontweight='bold', color=BG_FIG)
-        total = k12[i] + ps[i]
-        ax.text(total + 150, y_pos[i], f'Total: ${total:,.0f}M',
-                ha='left', va='center', fontsize=11, fontweight='bold', color=GOLD_1)
+    bars_k12 = ax.barh(y_pos, k12, height=0.55, label='K-12',
+                       color=GOLD_2, edgecolor=BG_FIG, linewidth=1.2)
+    bars_ps  = ax.barh(y_pos, ps, height=0.55, left=k12, label='Post-Secondary',
+                       color=GOLD_3, edgecolor=BG_FIG, linewidth=1.2)
+
+    for bars in (bars_k12, bars_ps):
+        ax.bar_label(bars, fmt='${:,.0f}M', label_type='center',
+                     fontsize=10, fontweight='bold', color=BG_FIG)
+    ax.bar_label(bars_ps, labels=[f'Total: ${t:,.0f}M' for t in k12 + ps], padding=7,
+                 fontsize=11, fontweight='bold', color=GOLD_1)
 
     ax.set_yticks(y_pos)
     ax.set_yticklabels(budgets, fontsize=13, fontweight='bold')
     ax.invert_yaxis()
     ax.set_xlabel('Operating Expense ($ millions)', fontsize=13, labelpad=10)
     ax.xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'${x:,.0f}'))
-    ax.set_title('Total Education Spending by Budget Year\n(K-12 + Post-Secondary)',
+    ax.set_title(priced('Total Education Spending by Budget Year\n(K-12 + Post-Secondary)', headline),
                  fontsize=18, fontweight='bold', pad=20)
 
     leg = ax.legend(fontsize=12, loc='lower right', framealpha=0.7)
     style_legend(leg)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_total_stacked.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_total_stacked.png')
+    save_figure('infographic_total_stacked.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -552,21 +751,18 @@ def plot_infographic_growth_comparison(headline, growth):
     width = 0.32
 
     fig, ax = plt.subplots(figsize=(12, 7))
-    ax.bar(x - width/2, vals_2012, width, label='Budget 2012 (2012-13)',
-           color=GOLD_DIM, edgecolor=BG_FIG, linewidth=1.5)
-    ax.bar(x + width/2, vals_2025, width, label='Budget 2025 (2025-26)',
-           color=GOLD_1, edgecolor=BG_FIG, linewidth=1.5)
-
-    for i in range(len(categories)):
-        ax.text(x[i] - width/2, vals_2012[i] + 150,
-                f'${vals_2012[i]:,.0f}M', ha='center', va='bottom',
-                fontsize=10, fontweight='bold', color=GOLD_DIM)
-        ax.text(x[i] + width/2, vals_2025[i] + 150,
-                f'${vals_2025[i]:,.0f}M', ha='center', va='bottom',
-                fontsize=10, fontweight='bold', color=GOLD_1)
-        mid_y = max(vals_2012[i], vals_2025[i]) + 800
-        ax.annotate(f'+{change_pct[i]:.0f}%',
-                    xy=(x[i], mid_y), fontsize=16, fontweight='bold',
+    bars_2012 = ax.bar(x - width/2, vals_2012, width, label='Budget 2012 (2012-13)',
+                       color=GOLD_DIM, edgecolor=BG_FIG, linewidth=1.5)
+    bars_2025 = ax.bar(x + width/2, vals_2025, width, label='Budget 2025 (2025-26)',
+                       color=GOLD_1, edgecolor=BG_FIG, linewidth=1.5)
+
+    for bars, color in [(bars_2012, GOLD_DIM), (bars_2025, GOLD_1)]:
+        ax.bar_label(bars, fmt='${:,.0f}M', padding=3,
+                     fontsize=10, fontweight='bold', color=color)
+    mid_y = np.maximum(vals_2012, vals_2025) + 800
+    for xi, yi, pct in zip(x, mid_y, change_pct):
+        ax.annotate(f'+{pct:.0f}%',
+                    xy=(xi, yi), fontsize=16, fontweight='bold',
                     ha='center', va='bottom', color=GOLD_2,
                     bbox=dict(boxstyle='round,pad=0.3', facecolor=BG_AX,
                               edgecolor=GOLD_2, alpha=0.9))
@@ -576,17 +772,14 @@ def plot_infographic_growth_comparison(headline, growth):
     ax.set_ylabel('Operating Expense ($ millions)', fontsize=13, labelpad=10)
     ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'${x:,.0f}'))
     ax.set_ylim(0, max(vals_2025) * 1.35)
-    ax.set_title('Education Spending Growth: 2012 → 2025\n13 Years of Change',
+    ax.set_title(priced('Education Spending Growth: 2012 → 2025\n13 Years of Change', growth),
                  fontsize=18, fontweight='bold', pad=20)
 
     leg = ax.legend(fontsize=13, loc='upper left', framealpha=0.7)
     style_legend(leg)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_growth_2012_vs_2025.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_growth_2012_vs_2025.png')
+    save_figure('infographic_growth_2012_vs_2025.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -596,32 +789,32 @@ def plot_infographic_growth_comparison(headline, growth):
 def plot_infographic_donut_composition(headline):
     apply_theme()
     fig, axes = plt.subplots(1, 5, figsize=(22, 5))
-    fig.suptitle('K-12 vs Post-Secondary Share by Budget Year',
+    fig.suptitle(priced('K-12 vs Post-Secondary Share by Budget Year', headline),
                  fontsize=18, fontweight='bold', y=1.05)
 
-    for ax, (_, row) in zip(axes, headline.iterrows()):
-        vals  = [row['K-12 ($M)'], row['Post-Secondary ($M)']]
-        total = sum(vals)
-        pcts  = [v / total * 100 for v in vals]
+    # Every label is computed up front from the columns; the loop only draws.
+    vals   = headline[['K-12 ($M)', 'Post-Secondary ($M)']].to_numpy()
+    totals = vals.sum(axis=1)
+    pcts   = vals / totals[:, None] * 100
+    years  = headline['Budget_Year'].tolist()
+    total_labels = [f'${t:,.0f}M' for t in totals]
+    split_labels = [f'K-12: {k:.0f}%  |  Post-Sec: {p:.0f}%' for k, p in pcts]
 
+    for ax, v, year, total_label, split_label in zip(axes, vals, years, total_labels, split_labels):
         ax.pie(
-            vals, colors=[GOLD_2, GOLD_3], startangle=90,
+            v, colors=[GOLD_2, GOLD_3], startangle=90,
             wedgeprops=dict(width=0.4, edgecolor=BG_FIG, linewidth=2)
         )
-        ax.text(0,  0.08, f'${total:,.0f}M', ha='center', va='center',
+        ax.text(0,  0.08, total_label, ha='center', va='center',
                 fontsize=12, fontweight='bold', color=C_TEXT)
         ax.text(0, -0.12, 'Total', ha='center', va='center',
                 fontsize=9, color=C_TICK)
-        ax.set_title(row['Budget_Year'], fontsize=12, fontweight='bold',
-                     color=BUDGET_YEAR_PALETTE.get(row['Budget_Year'], C_TEXT), pad=12)
-        ax.text(0, -0.65,
-                f'K-12: {pcts[0]:.0f}%  |  Post-Sec: {pcts[1]:.0f}%',
+        ax.set_title(year, fontsize=12, fontweight='bold',
+                     color=BUDGET_YEAR_PALETTE.get(year, C_TEXT), pad=12)
+        ax.text(0, -0.65, split_label,
                 ha='center', va='center', fontsize=8, color=C_TICK)
 
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_donut_composition.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_donut_composition.png')
+    save_figure('infographic_donut_composition.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -645,7 +838,7 @@ def plot_infographic_heatmap(headline):
         ax=ax
     )
 
-    ax.set_title('Education Spending Heatmap\n(Higher = More Spending)',
+    ax.set_title(priced('Education Spending Heatmap\n(Higher = More Spending)', headline),
                  fontsize=16, fontweight='bold', pad=15)
     ax.set_ylabel('')
     ax.tick_params(axis='y', rotation=0)
@@ -655,10 +848,7 @@ def plot_infographic_heatmap(headline):
     cbar.ax.yaxis.label.set_color(C_TEXT)
     cbar.ax.tick_params(colors=C_TICK)
 
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_heatmap.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_heatmap.png')
+    save_figure('infographic_heatmap.png')
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -672,61 +862,499 @@ def plot_infographic_lollipop(growth):
     colors = [GOLD_2, GOLD_3, GOLD_1]
     y_pos  = np.arange(len(categories))
 
+    labels = [f'+{p:.0f}%  (+${m:,.0f}M)' for p, m in zip(pcts, growth['Change ($M)'])]
+
     fig, ax = plt.subplots(figsize=(10, 5))
-    for i in range(len(categories)):
-        ax.hlines(y=y_pos[i], xmin=0, xmax=pcts[i],
-                  color=colors[i], linewidth=3, alpha=0.8)
-        ax.scatter(pcts[i], y_pos[i], color=colors[i],
-                   s=250, zorder=5, edgecolor=BG_FIG, linewidth=2)
-        ax.text(pcts[i] + 3, y_pos[i],
-                f'+{pcts[i]:.0f}%  (+${growth["Change ($M)"].iloc[i]:,.0f}M)',
-                va='center', fontsize=13, fontweight='bold', color=colors[i])
+    # One collection for all stems and one for all heads.
+    ax.hlines(y=y_pos, xmin=0, xmax=pcts, colors=colors, linewidth=3, alpha=0.8)
+    ax.scatter(pcts, y_pos, c=colors, s=250, zorder=5, edgecolor=BG_FIG, linewidth=2)
+    for yi, pct, label, color in zip(y_pos, pcts, labels, colors):
+        ax.text(pct + 3, yi, label,
+                va='center', fontsize=13, fontweight='bold', color=color)
 
     ax.set_yticks(y_pos)
     ax.set_yticklabels(categories, fontsize=14, fontweight='bold')
     ax.set_xlabel('Growth (%)', fontsize=13, labelpad=10)
     ax.set_xlim(-5, max(pcts) * 1.4)
-    ax.set_title('Education Spending Growth 2012 → 2025\nPercentage Increase by Category',
+    ax.set_title(priced('Education Spending Growth 2012 → 2025\nPercentage Increase by Category', growth),
                  fontsize=16, fontweight='bold', pad=15)
     ax.axvline(x=0, color=C_EDGE, linewidth=1)
 
     sns.despine(left=True, bottom=True)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / 'infographic_lollipop_growth.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print('Saved -> plots/infographic_lollipop_growth.png')
+    save_figure('infographic_lollipop_growth.png')
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# RENDER SCHEDULER
+# ════════════════════════════════════════════════════════════════════════════
+
+# (section, plot function, names of the shared inputs it takes, output PNG)
+CHART_JOBS = [
+    ('Population charts',            'plot_population_growth',             ('pop',),                'alberta_population_growth.png'),
+    ('Population charts',            'plot_quarterly_growth_rate',         ('pop',),                'quarterly_growth_rate.png'),
+    ('Population charts',            'plot_population_share',              ('pop',),                'alberta_population_share.png'),
+    ('Population charts',            'plot_yoy_growth',                    ('pop',),                'yoy_growth_analysis.png'),
+    ('Integration charts',           'plot_integration_indexed',           ('df_int',),             'integration_indexed_growth.png'),
+    ('Integration charts',           'plot_integration_per_capita',        ('df_int',),             'integration_per_capita.png'),
+    ('Integration charts',           'plot_integration_growth_rates',      ('df_int',),             'integration_growth_rates.png'),
+    ('Education infographic charts', 'plot_infographic_k12_vs_postsec',    ('headline',),           'infographic_k12_vs_postsec.png'),
+    ('Education infographic charts', 'plot_infographic_total_stacked',     ('headline',),           'infographic_total_stacked.png'),
+    ('Education infographic charts', 'plot_infographic_growth_comparison', ('headline', 'growth'),  'infographic_growth_2012_vs_2025.png'),
+    ('Education infographic charts', 'plot_infographic_donut_composition', ('headline',),           'infographic_donut_composition.png'),
+    ('Education infographic charts', 'plot_infographic_heatmap',           ('headline',),           'infographic_heatmap.png'),
+    ('Education infographic charts', 'plot_infographic_lollipop',          ('growth',),             'infographic_lollipop_growth.png'),
+]
+
+# The part of the shared 'pop' matrix each population chart actually reads,
+# given the chart's geo/start/end arguments. Charts not listed here are
+# fingerprinted on their full inputs.
+CHART_DATA_SLICES = {
+    'plot_population_growth':     lambda d, p: d['pop'].series(p['geo'], p['start'], p['end']),
+    'plot_quarterly_growth_rate': lambda d, p: d['pop'].series(p['geo'], p['start'], p['end']),
+    'plot_population_share':      lambda d, p: (d['pop'].series(p['geo'], p['start'], p['end']),
+                                                d['pop'].series('Canada', p['start'], p['end'])),
+    'plot_yoy_growth':            lambda d, p: d['pop'].annual(p['geo'], month=1),
+}
+
+# Charts that take geo/start/end and can be batched over provinces.
+POPULATION_CHARTS = list(CHART_DATA_SLICES)
+
+# Inputs for the current process; filled once per worker by _init_worker.
+_SHARED = {}
+
+
+def build_shared_data(prices='nominal'):
+    """
+    Load and derive every chart input once, keyed by the names in
+    CHART_JOBS. prices='real' restates spending in the latest year's
+    dollars (cpi_index.py).
+    """
+    with stage('load_population', 'data'):
+        df_raw = load_population()
+    with stage('build_population_matrix', 'data'):
+        pop = build_population_matrix(df_raw)
+    with stage('load_spending', 'data'):
+        spending = load_spending()
+    with stage('build_education_df', 'data'):
+        headline, growth = build_education_df(spending, prices)
+    with stage('load_annual_spending', 'data'):
+        annual = load_annual_spending(BUDGET_DIR)
+    with stage('build_integrated_df', 'data'):
+        df_int = build_integrated_df(pop, annual, prices)
+    return {
+        'pop':      pop,
+        'df_int':   df_int,
+        'headline': headline,
+        'growth':   growth,
+    }
+
+
+def _init_worker(shared, profile=None, formats=('png',)):
+    global _FORMATS
+    matplotlib.use('Agg')
+    _SHARED.update(shared)
+    _FORMATS = tuple(formats)
+    if profile:
+        profiling.apply_settings(profile)
+    apply_theme()
+
+
+def _run_job(name, inputs):
+    """Render one chart; returns (name, seconds, profiling records)."""
+    t0 = time.perf_counter()
+    with stage(name, 'chart'):
+        profiling.profile_call(name, globals()[name], *(_SHARED[k] for k in inputs))
+    return name, time.perf_counter() - t0, profiling.drain()
+
+
+def _run_batch(name, inputs, calls):
+    """
+    Render one chart function for each keyword set in calls on a single
+    reused figure; returns (name, seconds, profiling records).
+    """
+    func = globals()[name]
+    args = [_SHARED[k] for k in inputs]
+    t0 = time.perf_counter()
+    with reuse_figures(), profiling.cprofiled(name):
+        for kwargs in calls:
+            with stage(name, 'chart', file=kwargs['filename']):
+                func(*args, **kwargs)
+    return name, time.perf_counter() - t0, profiling.drain()
+
+
+def render_charts(shared, jobs=1, chart_jobs=CHART_JOBS, formats=('png',), on_done=None):
+    """
+    Render the given CHART_JOBS entries and return {function name: seconds}.
+
+    jobs == 1 renders in this process. Otherwise each chart is a task on
+    a process pool; the shared inputs are shipped once per worker via
+    the pool initializer, not once per chart. on_done, if given, is
+    called with each finished chart's output filenames.
+    """
+    outputs = {name: output for _, name, _, output in chart_jobs}
+    timings = {}
+    if jobs == 1:
+        _init_worker(shared, formats=formats)
+        section = None
+        for sec, name, inputs, _ in chart_jobs:
+            if sec != section:
+                section = sec
+                print(f'\n--- {section} ---')
+            name, secs, events = _run_job(name, inputs)
+            profiling.extend(events)
+            timings[name] = secs
+            if on_done:
+                on_done([outputs[name]])
+        return timings
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(shared, profiling.settings(), formats)) as pool:
+        futures = [pool.submit(_run_job, name, inputs) for _, name, inputs, _ in chart_jobs]
+        for fut in as_completed(futures):
+            name, secs, events = fut.result()
+            profiling.extend(events)
+            timings[name] = secs
+            if on_done:
+                on_done([outputs[name]])
+    return timings
+
+
+# ── Province batches ─────────────────────────────────────────────────────────
+
+def _slug(geo):
+    return geo.lower().replace(' ', '_')
+
+
+def batch_jobs(pop, geos, windows, charts=POPULATION_CHARTS):
+    """
+    (section, plot function, inputs, output PNG, kwargs) for every chart ×
+    GEO × (start year, end year) window, written under plots/provinces/.
+    GEOs with no estimates in a window (Nunavut before 1991, ...) are skipped.
+    """
+    out = []
+    for geo in geos:
+        for start, end in windows:
+            if np.isnan(pop.series(geo, start, end)[1]).all():
+                print(f'Skipping {geo} {start}–{end}: no estimates in this window')
+                continue
+            for name in charts:
+                output = f'{BATCH_DIR}/{_slug(geo)}/{name[len("plot_"):]}_{start}-{end}.png'
+                kwargs = {'geo': geo, 'start': start, 'end': end, 'filename': output}
+                out.append((f'{geo} {start}–{end}', name, ('pop',), output, kwargs))
+    return out
+
+
+def render_batch(shared, jobs=1, batch=(), formats=('png',), on_done=None):
+    """
+    Render batch_jobs() entries and return {function name: seconds}.
+
+    Entries are grouped by chart function so each task draws many
+    GEO/window variants on one reused figure. With jobs > 1 each
+    function's variants are split into `jobs` tasks on the process pool.
+    on_done is called with each finished task's output filenames.
+    """
+    calls = {}
+    for _, name, inputs, _, kwargs in batch:
+        calls.setdefault((name, inputs), []).append(kwargs)
+
+    timings = {}
+    if jobs == 1:
+        _init_worker(shared, formats=formats)
+        for (name, inputs), group in calls.items():
+            print(f'\n--- {name} × {len(group)} ---')
+            name, secs, events = _run_batch(name, inputs, group)
+            profiling.extend(events)
+            timings[name] = secs
+            if on_done:
+                on_done([kwargs['filename'] for kwargs in group])
+        return timings
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(shared, profiling.settings(), formats)) as pool:
+        tasks = {}
+        for (name, inputs), group in calls.items():
+            for i in range(min(jobs, len(group))):
+                chunk = group[i::jobs]
+                tasks[pool.submit(_run_batch, name, inputs, chunk)] = chunk
+        for fut in as_completed(tasks):
+            name, secs, events = fut.result()
+            profiling.extend(events)
+            timings[name] = timings.get(name, 0.0) + secs
+            if on_done:
+                on_done([kwargs['filename'] for kwargs in tasks[fut]])
+    return timings
+
+
+def parse_windows(specs, pop):
+    """['2000-2025', ...] -> [(2000, 2025), ...], checked against the table's years."""
+    first, last = pop.dates[[0, -1]].astype('datetime64[Y]').astype(int) + 1970
+    windows = []
+    for spec in specs:
+        try:
+            start, end = (int(part) for part in spec.split('-'))
+        except ValueError:
+            raise ValueError(f'year range {spec!r} is not START-END, e.g. 2012-2025') from None
+        if not first <= start < end <= last:
+            raise ValueError(f'year range {spec!r} must lie within {first}-{last}')
+        windows.append((start, end))
+    return windows
+
+
+def resolve_geos(names, pop):
+    """GEO names as given; 'provinces' expands to every GEO except Canada."""
+    geos = []
+    for name in names:
+        if name == 'provinces':
+            geos += [g for g in pop.geos if g != 'Canada']
+        elif name in pop.geos:
+            geos.append(name)
+        else:
+            raise ValueError(f'unknown GEO {name!r}; choose from: {", ".join(pop.geos)}')
+    return list(dict.fromkeys(geos))
+
+
+# ── Incremental rebuilds ─────────────────────────────────────────────────────
+
+def _digest(obj, h):
+    """Feed a stable byte representation of a chart input into hash h."""
+    if isinstance(obj, PopulationMatrix):
+        for part in (obj.values, obj.dates, obj.geos):
+            _digest(part, h)
+    elif isinstance(obj, pd.DataFrame):
+        _digest([list(obj.columns), obj.attrs], h)
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f'{obj.dtype}{obj.shape}'.encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'(')
+        for item in obj:
+            _digest(item, h)
+        h.update(b')')
+    elif isinstance(obj, dict):
+        _digest(sorted(obj.items()), h)
+    else:
+        h.update(repr(obj).encode())
+
+
+def shared_source():
+    """
+    This module's source with every plot_* function cut out, plus
+    chart_export's: the theme, helpers, templates and save path that
+    every chart goes through.
+    """
+    module = inspect.getsource(sys.modules[__name__])
+    for name, func in globals().items():
+        if name.startswith('plot_') and inspect.isfunction(func):
+            module = module.replace(inspect.getsource(func), '')
+    return [module, inspect.getsource(chart_export)]
+
+
+def common_fingerprint():
+    """Hash of everything every chart shares: THEME_RC, palettes and the shared source."""
+    h = hashlib.sha256()
+    palette = {k: v for k, v in globals().items()
+               if k.startswith(('BG_', 'C_', 'GOLD_')) and isinstance(v, str)}
+    _digest([THEME_RC, BUDGET_YEAR_PALETTE, palette, shared_source()], h)
+    return h.hexdigest()
+
+
+def chart_params(name, kwargs=None):
+    """The chart's keyword arguments with its defaults filled in (filename aside)."""
+    func = globals()[name]
+    params = {k: p.default for k, p in inspect.signature(func).parameters.items()
+              if p.default is not inspect.Parameter.empty}
+    params.update(kwargs or {})
+    params.pop('filename', None)
+    return params
+
+
+def chart_fingerprint(name, inputs, shared, common=None, kwargs=None):
+    """
+    Hash of a chart's data slice and arguments, its plotting function's
+    source and common_fingerprint(), so a change to a helper the chart
+    calls (save_figure, template, a bar or label helper) re-renders it.
+    """
+    h = hashlib.sha256()
+    params = chart_params(name, kwargs)
+    slicer = CHART_DATA_SLICES.get(name)
+    data = slicer(shared, params) if slicer else [shared[k] for k in inputs]
+    _digest([data, params, common or common_fingerprint(), inspect.getsource(globals()[name])], h)
+    return h.hexdigest()
+
+
+def load_manifest():
+    try:
+        return json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    MANIFEST.parent.mkdir(exist_ok=True)
+    tmp = MANIFEST.with_name(MANIFEST.name + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, MANIFEST)
+
+
+def stale_jobs(shared, manifest, force=False, chart_jobs=CHART_JOBS, formats=('png',)):
+    """
+    Split chart_jobs (CHART_JOBS or batch_jobs() entries) into the ones
+    that need rendering and their new fingerprints. A chart is stale
+    when forced, when any of its output files is missing, or when its
+    fingerprint differs from the manifest.
+    """
+    common = common_fingerprint()
+    stale, fingerprints = [], {}
+    for job in chart_jobs:
+        _, name, inputs, output, *kwargs = job
+        fp = chart_fingerprint(name, inputs, shared, common, *kwargs)
+        fingerprints[output] = fp
+        missing = any(not (PLOTS_DIR / rel).exists()
+                      for rel in chart_export.export_paths(output, formats).values())
+        if force or manifest.get(output) != fp or missing:
+            stale.append(job)
+    return stale, fingerprints
+
+
+def _store_key(fp, fmt):
+    return f'charts/{fp}/{fmt}'
+
+
+def restore_from_store(stale, fingerprints, formats=('png',)):
+    """
+    Check out stale charts whose fingerprint some earlier run (in this
+    tree or another copy of it) already rendered in every format;
+    returns the jobs that still need rendering.
+    """
+    todo = []
+    for job in stale:
+        output = job[3]
+        paths = chart_export.export_paths(output, formats)
+        keys = {fmt: _store_key(fingerprints[output], fmt) for fmt in paths}
+        if all(data_store.read_ref(key) for key in keys.values()):
+            for fmt, rel in paths.items():
+                data_store.restore_ref(keys[fmt], PLOTS_DIR / rel)
+        else:
+            todo.append(job)
+    return todo
+
+
+def save_to_store(chart_jobs, fingerprints, formats=('png',)):
+    for _, _, _, output, *_ in chart_jobs:
+        for fmt, rel in chart_export.export_paths(output, formats).items():
+            data_store.save_ref(_store_key(fingerprints[output], fmt), PLOTS_DIR / rel)
+
+
+def print_timings(timings, wall):
+    print('\n--- Render timings ---')
+    width = max([len(name) for name in timings] + [len('total chart time')])
+    for _, name, _, _ in CHART_JOBS:
+        if name in timings:
+            print(f'  {name:<{width}}  {timings[name]:6.2f}s')
+    print(f'  {"total chart time":<{width}}  {sum(timings.values()):6.2f}s')
+    print(f'  {"wall time":<{width}}  {wall:6.2f}s')
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ════════════════════════════════════════════════════════════════════════════
 
-if __name__ == '__main__':
-    PLOTS_DIR.mkdir(exist_ok=True)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate all 13 charts in plots/.')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='worker processes for rendering (default: CPU count; 1 = serial)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every chart, ignoring the render manifest')
+    batch = parser.add_argument_group('province batches')
+    batch.add_argument('--geos', nargs='+', metavar='GEO',
+                       help="render the population charts for these GEOs ('provinces' = all "
+                            'but Canada) into plots/provinces/ instead of the 13 charts')
+    batch.add_argument('--years', nargs='+', metavar='START-END', default=['2012-2025'],
+                       help='year windows for --geos (default: 2012-2025)')
+    batch.add_argument('--charts', nargs='+', metavar='CHART',
+                       choices=[name[len('plot_'):] for name in POPULATION_CHARTS],
+                       help='population charts for --geos (default: all four)')
+    export = parser.add_argument_group('export')
+    export.add_argument('--formats', nargs='+', metavar='FORMAT', default=['png'],
+                        choices=list(chart_export.FORMATS),
+                        help='outputs per chart, from one layout: png (150 dpi), print '
+                             '(300-dpi PNG), thumb, webp, svg; extras go to plots/export/ '
+                             '(default: png)')
+    export.add_argument('--prices', choices=PRICES, default='nominal',
+                        help="spending in nominal dollars or, with 'real', in the latest "
+                             "budget year's dollars via the Alberta CPI (default: nominal)")
+    export.add_argument('--optimize-png', action='store_true',
+                        help='losslessly recompress finished PNGs in the background')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args, 'regenerate_plots')
 
-    print('Loading population data...')
-    df_raw = load_population()
-
-    print('\n--- Population charts ---')
-    plot_population_growth(df_raw)
-    plot_quarterly_growth_rate(df_raw)
-    plot_population_share(df_raw)
-    plot_yoy_growth(df_raw)
-
-    print('\n--- Integration charts (population vs spending) ---')
-    df_int = build_integrated_df(df_raw)
-    plot_integration_indexed(df_int)
-    plot_integration_per_capita(df_int)
-    plot_integration_growth_rates(df_int)
-
-    print('\n--- Education infographic charts ---')
-    headline, growth = build_education_df()
-    plot_infographic_k12_vs_postsec(headline)
-    plot_infographic_total_stacked(headline)
-    plot_infographic_growth_comparison(headline, growth)
-    plot_infographic_donut_composition(headline)
-    plot_infographic_heatmap(headline)
-    plot_infographic_lollipop(growth)
-
-    print('\nAll 13 plots regenerated with the Dark Grey + Gold theme.')
+    PLOTS_DIR.mkdir(exist_ok=True)
+    t0 = time.perf_counter()
+
+    print('Loading population and spending data...')
+    shared = build_shared_data(args.prices)
+
+    if args.geos:
+        try:
+            geos = resolve_geos(args.geos, shared['pop'])
+            windows = parse_windows(args.years, shared['pop'])
+        except ValueError as exc:
+            parser.error(str(exc))
+        charts = [f'plot_{c}' for c in args.charts] if args.charts else POPULATION_CHARTS
+        all_jobs, render = batch_jobs(shared['pop'], geos, windows, charts), render_batch
+    else:
+        all_jobs, render = CHART_JOBS, render_charts
+
+    formats = tuple(dict.fromkeys(['png', *args.formats]))
+    manifest = load_manifest()
+    with stage('stale_jobs', 'data'):
+        todo, fingerprints = stale_jobs(shared, manifest, args.force, all_jobs, formats)
+    restored = []
+    if not args.force:
+        with stage('restore_from_store', 'data'):
+            rendering = restore_from_store(todo, fingerprints, formats)
+        restored = [job for job in todo if job not in rendering]
+        todo = rendering
+    for _, _, _, output, *_ in restored:
+        manifest[output] = fingerprints[output]
+    if restored:
+        save_manifest(manifest)
+        print(f'\nRestored {len(restored)} plots from the shared store ({data_store.STORE_DIR}).')
+    if not todo:
+        print(f'\nAll {len(all_jobs)} plots are up to date (use --force to re-render).')
+        profiling.finish()
+        return
+
+    print(f'\n{len(all_jobs) - len(todo)} plots up to date, rendering {len(todo)}.')
+    jobs = max(1, min(args.jobs, len(todo)))
+    if jobs > 1:
+        print(f'Rendering on {jobs} worker processes...')
+    optimizer = on_done = None
+    if args.optimize_png:
+        # Each chart's PNGs are recompressed while the next charts render.
+        optimizer = chart_export.PngOptimizer()
+        on_done = lambda outputs: optimizer.submit(
+            PLOTS_DIR / rel for output in outputs
+            for rel in chart_export.export_paths(output, formats).values())
+    timings = render(shared, jobs, todo, formats, on_done)
+    if optimizer:
+        with stage('optimize_png', 'render'):
+            files, saved = optimizer.finish()
+        print(f'\nOptimized {files} PNGs, saved {saved / 1024:,.0f} KiB.')
+
+    with stage('save_to_store', 'render'):
+        save_to_store(todo, fingerprints, formats)
+    for _, _, _, output, *_ in todo:
+        manifest[output] = fingerprints[output]
+    save_manifest(manifest)
+
+    print_timings(timings, time.perf_counter() - t0)
+    profiling.finish()
+    print(f'\n{len(todo)} of {len(all_jobs)} plots regenerated with the Dark Grey + Gold theme.')
     print('Output directory: ' + str(PLOTS_DIR))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""
+spending_scenarios.py
+─────────────────────
+Per-capita education spending under every combination of a projected
+Alberta population path and a spending assumption, evaluated as one
+broadcast array operation.
+
+Population paths (population_forecast.py): each trend model's mean,
+lower and upper Q1 projection.
+
+Spending paths, K-12 and post-secondary, from the latest Estimate year:
+    flat        held at the latest Estimate
+    indexed     grown at each rate of a grid (e.g. inflation assumptions),
+                both components alike — or, with separate post-secondary
+                rates, every K-12 × post-secondary pair
+    target      each budget's own Estimate/Target plan, extended past its
+                last Target at the plan's growth rate
+
+The result is a ScenarioCube: a scenario × year × metric float array
+with the same metrics as build_integrated_df() (spending, per capita and
+2012-13 = 100 indices), plus the population and spending label of every
+scenario. Thousands of scenarios take milliseconds; nothing is built as
+a DataFrame until to_frame() is asked for.
+
+Usage:
+    python spending_scenarios.py                              # 2025–2030, 0–5 % indexed
+    python spending_scenarios.py --end 2032 --rates 0 0.02 0.04 --postsec-rates 0 0.02 0.04
+
+    from spending_scenarios import build_scenarios
+    cube = build_scenarios(pop, rows)
+    cube.sel('Total_PerCapita', 2030)       # one value per scenario
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import population_forecast as pf
+import profiling
+from profiling import stage
+from budget_extract import load_education_spending
+from statcan_data import atomic_write_bytes, load_population_table, PopulationMatrix
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_NPZ = SCRIPT_DIR / 'spending_scenarios.npz'
+
+GEO          = 'Alberta'
+BASE_YEAR    = 2012           # index base (2012-13 = 100), as in build_integrated_df()
+DEFAULT_END  = 2030
+DEFAULT_RATES = np.round(np.arange(0.0, 0.0501, 0.0025), 4)
+
+METRICS = ['Population', 'K12_M', 'PostSec_M', 'Total_M',
+           'K12_PerCapita', 'PostSec_PerCapita', 'Total_PerCapita',
+           'Pop_Index', 'K12_Index', 'PostSec_Index', 'Total_Index']
+
+
+class ScenarioCube:
+    """
+    values[s, y, m]: metric METRICS[m] in years[y] under scenario s,
+    which pairs population path population[s] with spending path
+    spending[s].
+    """
+
+    def __init__(self, values, years, population, spending):
+        self.values = values
+        self.years = np.asarray(years)
+        self.population = np.asarray(population)
+        self.spending = np.asarray(spending)
+        self._metric = {m: i for i, m in enumerate(METRICS)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def sel(self, metric: str, year=None) -> np.ndarray:
+        """scenarios × years for metric, or one value per scenario for a year — views."""
+        out = self.values[:, :, self._metric[metric]]
+        if year is None:
+            return out
+        return out[:, int(np.flatnonzero(self.years == year)[0])]
+
+    def where(self, population=None, spending=None) -> np.ndarray:
+        """Boolean mask of scenarios whose labels start with the given prefixes."""
+        mask = np.ones(len(self), dtype=bool)
+        if population is not None:
+            mask &= np.char.startswith(self.population.astype(str), population)
+        if spending is not None:
+            mask &= np.char.startswith(self.spending.astype(str), spending)
+        return mask
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long scenario / year table, one column per metric."""
+        s, y, _ = self.values.shape
+        df = pd.DataFrame(self.values.reshape(s * y, -1), columns=METRICS)
+        df.insert(0, 'Year', np.tile(self.years, s))
+        df.insert(0, 'Spending', np.repeat(self.spending, y))
+        df.insert(0, 'Population_Path', np.repeat(self.population, y))
+        return df
+
+    def save(self, path=OUTPUT_NPZ):
+        path = Path(path)
+        atomic_write_bytes(path, lambda fh: np.savez_compressed(
+            fh, values=self.values, years=self.years, metrics=np.asarray(METRICS),
+            population=self.population.astype(str), spending=self.spending.astype(str)))
+        return path
+
+    @classmethod
+    def load(cls, path=OUTPUT_NPZ) -> 'ScenarioCube':
+        with np.load(path, allow_pickle=False) as npz:
+            if list(npz['metrics']) != METRICS:
+                raise ValueError(f'{path} was saved with different metrics')
+            return cls(npz['values'], npz['years'], npz['population'], npz['spending'])
+
+
+# ── Population paths ─────────────────────────────────────────────────────────
+
+def population_paths(pop: PopulationMatrix, years, geo: str = GEO, models=pf.MODELS, **forecast_kw):
+    """
+    (labels, paths × years array) of Q1 population: observed where the
+    table has the quarter, else each model's mean / lower / upper
+    projection.
+    """
+    years = np.asarray(years)
+    obs_years, observed = pop.annual(geo, month=1)
+    # Quarters from the last observed one to January of the last year.
+    months = (np.datetime64(f'{years[-1]}-01', 'M') - pop.dates[-1].astype('datetime64[M]')).astype(int)
+    horizon = max(1, -(-months // 3))
+    forecasts = pf.forecast_all(pop, models, horizon=horizon, **forecast_kw)
+
+    labels, paths = [], []
+    for model, fc in forecasts.items():
+        row = fc.row(geo)
+        jan = fc.dates.astype('datetime64[M]').astype(int) % 12 == 0
+        fc_years = fc.dates[jan].astype('datetime64[Y]').astype(int) + 1970
+        for bound in ('mean', 'lower', 'upper'):
+            by_year = dict(zip(fc_years, getattr(fc, bound)[row, jan]))
+            by_year.update(zip(obs_years, observed))
+            labels.append(f'{model} {bound}')
+            paths.append([by_year.get(y, np.nan) for y in years])
+    return labels, np.array(paths, dtype='float64')
+
+
+# ── Spending paths ───────────────────────────────────────────────────────────
+
+def _year(fiscal_year) -> np.ndarray:
+    return np.asarray(pd.Series(fiscal_year).str[:4].astype(int))
+
+
+def latest_estimate(rows: pd.DataFrame):
+    """(year, [K-12, post-secondary] $M) of the most recent Estimate row."""
+    est = rows[rows['Type'] == 'Estimate']
+    last = est.iloc[int(np.argmax(_year(est['Fiscal_Year'])))]
+    return (int(last['Fiscal_Year'][:4]),
+            np.array([last['K12_Operating_Expense'], last['PostSecondary_Operating_Expense']], dtype='float64'))
+
+
+def flat_paths(base, years):
+    """(labels, 1 × years × components) spending held at base."""
+    return ['flat'], np.broadcast_to(base, (1, len(years), len(base))).copy()
+
+
+def growth_paths(base, years, rates, postsec_rates=None):
+    """
+    base grown at each annual rate from years[0]. With postsec_rates,
+    K-12 takes `rates` and post-secondary `postsec_rates`, crossed.
+    """
+    t = np.asarray(years) - years[0]
+    rates = np.asarray(rates, dtype='float64')
+    if postsec_rates is None:
+        pairs = np.stack([rates, rates], axis=1)
+        labels = [f'indexed {r:.2%}' for r in rates]
+    else:
+        k12, ps = np.meshgrid(rates, np.asarray(postsec_rates, dtype='float64'), indexing='ij')
+        pairs = np.stack([k12.ravel(), ps.ravel()], axis=1)
+        labels = [f'indexed K-12 {a:.2%} / PS {b:.2%}' for a, b in pairs]
+    # paths × years × components
+    return labels, base * (1 + pairs[:, None, :]) ** t[None, :, None]
+
+
+def target_paths(rows: pd.DataFrame, base, years):
+    """
+    One path per budget whose Estimate/Target plan reaches years[0]:
+    its planned figures where it has them, base before its first
+    planned year and the plan's own growth rate after its last.
+    """
+    years = np.asarray(years)
+    plans = rows[rows['Type'].isin(['Estimate', 'Target'])]
+    labels, paths = [], []
+    for budget, plan in plans.groupby('Budget_Year', sort=True):
+        plan_years = _year(plan['Fiscal_Year'])
+        if plan_years.max() < years[0]:
+            continue
+        order = np.argsort(plan_years)
+        plan_years = plan_years[order]
+        values = plan[['K12_Operating_Expense', 'PostSecondary_Operating_Expense']].to_numpy('float64')[order]
+        span = plan_years[-1] - plan_years[0]
+        rate = (values[-1] / values[0]) ** (1 / span) - 1 if span else np.zeros(2)
+
+        path = np.empty((len(years), 2))
+        before = years < plan_years[0]
+        after = years > plan_years[-1]
+        inside = ~before & ~after
+        path[before] = base
+        path[inside] = values[np.searchsorted(plan_years, years[inside])]
+        path[after] = values[-1] * (1 + rate) ** (years[after] - plan_years[-1])[:, None]
+        labels.append(f'target {budget}')
+        paths.append(path)
+    return labels, np.array(paths).reshape(-1, len(years), 2)
+
+
+# ── Evaluation ───────────────────────────────────────────────────────────────
+
+def evaluate(years, pop_labels, pop_paths, spend_labels, spend_paths, base_pop, base_spend) -> ScenarioCube:
+    """
+    Cross every population path (P × years) with every spending path
+    (S × years × 2) by broadcasting; scenario p·S + s pairs path p
+    with path s.
+    """
+    p, s, y = len(pop_paths), len(spend_paths), len(years)
+    people = pop_paths[:, None, :, None]                             # P × 1 × Y × 1
+    spend = np.concatenate([spend_paths, spend_paths.sum(axis=2, keepdims=True)], axis=2)[None]
+    base = np.append(base_spend, base_spend.sum())                   # K-12, PS, total
+
+    cube = np.empty((p, s, y, len(METRICS)))
+    cube[..., 0] = people[..., 0]
+    cube[..., 1:4] = spend
+    cube[..., 4:7] = spend * 1_000_000 / people
+    cube[..., 7] = people[..., 0] / base_pop * 100
+    cube[..., 8:11] = spend / base * 100
+    return ScenarioCube(cube.reshape(p * s, y, len(METRICS)), years,
+                        np.repeat(pop_labels, s), np.tile(spend_labels, p))
+
+
+def build_scenarios(pop: PopulationMatrix, rows: pd.DataFrame, end: int = DEFAULT_END,
+                    rates=DEFAULT_RATES, postsec_rates=None, geo: str = GEO, **forecast_kw) -> ScenarioCube:
+    """The full grid from the latest Estimate year through `end`."""
+    start, base = latest_estimate(rows)
+    if end < start:
+        raise ValueError(f'end year {end} is before {start}, the latest Estimate year; '
+                         f'scenarios run from {start} onward')
+    years = np.arange(start, end + 1)
+    with stage('population_paths', 'data'):
+        pop_labels, pop_paths = population_paths(pop, years, geo, **forecast_kw)
+
+    spend_labels, spend_paths = [], []
+    for labels, paths in (flat_paths(base, years),
+                          growth_paths(base, years, rates, postsec_rates),
+                          target_paths(rows, base, years)):
+        spend_labels += labels
+        spend_paths.append(paths)
+
+    # Index base: the 2012-13 Estimate and Q1 2012 population.
+    est = rows[rows['Type'] == 'Estimate']
+    first = est[_year(est['Fiscal_Year']) == BASE_YEAR].iloc[0]
+    base_spend = np.array([first['K12_Operating_Expense'], first['PostSecondary_Operating_Expense']], dtype='float64')
+    base_pop = pop.values[pop.row(geo), pop.column(BASE_YEAR)]
+
+    with stage('evaluate_grid', 'data'):
+        return evaluate(years, pop_labels, pop_paths, spend_labels, np.concatenate(spend_paths),
+                        base_pop, base_spend)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-capita education spending scenario grid.')
+    parser.add_argument('--end', type=int, default=DEFAULT_END,
+                        help=f'last projected year (default: {DEFAULT_END})')
+    parser.add_argument('--rates', type=float, nargs='+', default=list(DEFAULT_RATES),
+                        help='annual spending growth rates, e.g. inflation assumptions '
+                             '(default: 0 to 0.05 by 0.0025)')
+    parser.add_argument('--postsec-rates', type=float, nargs='+',
+                        help='separate post-secondary rates, crossed with --rates for K-12')
+    parser.add_argument('--output', '-o', type=Path, default=OUTPUT_NPZ,
+                        help=f'scenario cube (default: {OUTPUT_NPZ.name})')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args, 'spending_scenarios')
+
+    with stage('load_population', 'data'):
+        pop = PopulationMatrix.from_frame(load_population_table())
+    with stage('load_spending', 'data'):
+        rows = load_education_spending()
+    try:
+        cube = build_scenarios(pop, rows, args.end, args.rates, args.postsec_rates)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    per_capita = cube.sel('Total_PerCapita', args.end)
+    print(f'\n=== {len(cube):,d} scenarios, {cube.years[0]}–{cube.years[-1]} ===')
+    print(f'Total education spending per capita in {args.end}:')
+    for family in ('flat', 'indexed', 'target'):
+        vals = per_capita[cube.where(spending=family)]
+        print(f'  {family:<8s} ${np.nanmin(vals):>7,.0f} – ${np.nanmax(vals):>7,.0f}'
+              f'   (median ${np.nanmedian(vals):,.0f}, {len(vals):,d} scenarios)')
+    print(f'\nSaved -> {cube.save(args.output).name}')
+    profiling.finish()
+
+
+if __name__ == '__main__':
+    main()
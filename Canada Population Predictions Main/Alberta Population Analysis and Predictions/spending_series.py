@@ -0,0 +1,221 @@
+"""
+spending_series.py
+──────────────────
+One education spending figure per fiscal year, 2010-11 onward with no
+gaps, aligned to the annual (Q1) samples of the population matrix.
+
+The headline charts use one Estimate row per budget, which leaves
+2014-15 to 2021-22 empty. Every budget also reports the years around
+its Estimate (budget_extract.load_education_spending(): Actual, Budget,
+Forecast, Estimate, Target), and those overlap. Per fiscal year the
+best-grounded figure wins — Actual over Estimate over Forecast over
+Budget over Target (budget_extract.TYPE_RANK), then the latest budget —
+so a year a budget voted keeps the Estimate the headline charts show
+until its Actual is published. The years no budget reports are filled
+by log-linear (constant growth) interpolation between their
+neighbours. K-12 and post-secondary are filled separately; Total is
+their sum. Each year is flagged with the row type it came from, or
+'interpolated'.
+
+AnnualSpending holds the result as a contiguous years × component
+float array. aligned() cuts it and the population matrix to their
+common years, so per-capita and index columns are single array
+operations (add_metrics()) rather than merges of sparse rows.
+
+Usage:
+    python spending_series.py                  # budget_data/population_vs_spending_annual.csv
+    python spending_series.py --prices real    # ..._annual_real.csv, in CPI dollars
+
+    from spending_series import load_annual_spending, annual_frame
+    annual = load_annual_spending()
+    df     = annual_frame(pop, annual)         # 2012-13 .. 2025-26, 2012-13 = 100
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import profiling
+from profiling import stage
+from budget_extract import BUDGET_DIR, TYPE_RANK, load_education_spending
+from cpi_index import PRICES, deflate
+from statcan_data import load_population_table, PopulationMatrix
+from table_export import describe, write_table
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_CSV   = data_store.source('17100009.csv')
+OUTPUT_CSV = SCRIPT_DIR / 'budget_data' / 'population_vs_spending_annual.csv'
+
+GEO        = 'Alberta'
+BASE_YEAR  = 2012           # index base (2012-13 = 100), as in build_integrated_df()
+COMPONENTS = ['K12_M', 'PostSec_M', 'Total_M']
+
+
+class AnnualSpending:
+    """
+    Reconciled spending, one row per fiscal year, years contiguous.
+
+    years    int    fiscal year's starting calendar year
+    values   float  years × COMPONENTS, $ millions, C-contiguous
+    flags    str    'actual' / 'forecast' / 'estimate' / 'budget' /
+                    'target' / 'interpolated'
+    budgets  str    budget the row was taken from ('' when interpolated)
+    """
+
+    def __init__(self, years, values, flags, budgets):
+        self.years   = np.asarray(years, dtype='int64')
+        self.values  = np.ascontiguousarray(values, dtype='float64')
+        self.flags   = np.asarray(flags, dtype=str)
+        self.budgets = np.asarray(budgets, dtype=str)
+
+    def aligned(self, pop: PopulationMatrix, geo: str = GEO, start=None, end=None):
+        """
+        (years, population, values, positions) over the years both
+        timelines cover, within [start, end]; positions index this
+        series' rows.
+        """
+        pop_years, pop_values = pop.annual(geo, month=1)
+        # The population timeline is the table's; trim it to the years
+        # this GEO has estimates for.
+        known = np.flatnonzero(np.isfinite(pop_values))
+        p0, p1 = (pop_years[known[0]], pop_years[known[-1]]) if known.size else (0, -1)
+        lo = max(self.years[0], p0, start or self.years[0])
+        hi = min(self.years[-1], p1, end or self.years[-1])
+        if lo > hi:
+            raise ValueError(f'no year between {start or "the start"} and {end or "the end"} '
+                             f'has both spending and {geo} population '
+                             f'(spending {self.years[0]}-{self.years[-1]}, '
+                             f'population {p0}-{p1})')
+        years = np.arange(lo, hi + 1)
+        pos = years - self.years[0]
+        population = pop_values[years - pop_years[0]]
+        if np.isnan(population).any():
+            raise ValueError(f'{geo} population has no estimate for '
+                             f'{years[np.isnan(population)].tolist()}')
+        return years, population, self.values[pos], pos
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.values, columns=COMPONENTS)
+        df.insert(0, 'Year', self.years)
+        df.insert(0, 'Fiscal_Year', fiscal_labels(self.years))
+        df['Flag'] = self.flags
+        df['Source'] = self.budgets
+        return df
+
+
+def fiscal_labels(years) -> list:
+    """2012 -> '2012-13'."""
+    return [f'{y}-{(y + 1) % 100:02d}' for y in years]
+
+
+# ── Reconciliation ───────────────────────────────────────────────────────────
+
+def reconcile(rows: pd.DataFrame) -> AnnualSpending:
+    """
+    Best row per fiscal year from load_education_spending() output;
+    years no budget reports are interpolated at constant growth.
+    """
+    ranked = rows.assign(Year=rows['Fiscal_Year'].str[:4].astype(int),
+                         _rank=rows['Type'].map(TYPE_RANK))
+    best = (ranked.dropna(subset=['_rank'])
+                  .sort_values(['Year', '_rank', 'Budget_Year'], ascending=[True, True, False])
+                  .drop_duplicates('Year'))
+    known = best['Year'].to_numpy()
+    years = np.arange(known[0], known[-1] + 1)
+    pos = known - years[0]
+
+    parts = best[['K12_Operating_Expense', 'PostSecondary_Operating_Expense']].to_numpy(float)
+    values = np.empty((len(years), len(COMPONENTS)))
+    for j in range(parts.shape[1]):
+        values[:, j] = np.exp(np.interp(years, known, np.log(parts[:, j])))
+    values[pos, :2] = parts
+    values[:, 2] = values[:, 0] + values[:, 1]
+
+    flags = np.full(len(years), 'interpolated', dtype=object)
+    budgets = np.full(len(years), '', dtype=object)
+    flags[pos] = best['Type'].str.lower().to_numpy()
+    budgets[pos] = best['Budget_Year'].to_numpy()
+    return AnnualSpending(years, values, flags, budgets)
+
+
+def load_annual_spending(budget_dir=BUDGET_DIR, use_cache: bool = True) -> AnnualSpending:
+    return reconcile(load_education_spending(budget_dir, use_cache))
+
+
+# ── Derived metrics ──────────────────────────────────────────────────────────
+
+def add_metrics(df: pd.DataFrame, base: int = 0) -> pd.DataFrame:
+    """
+    Add per-capita and index (row `base` = 100) columns to a frame with
+    Population and COMPONENTS columns, in place; returns df.
+    """
+    spend = df[COMPONENTS].to_numpy()
+    population = df['Population'].to_numpy()
+    df[['K12_PerCapita', 'PostSec_PerCapita', 'Total_PerCapita']] = \
+        (spend * 1_000_000) / population[:, None]
+    df['Pop_Index'] = (population / population[base]) * 100
+    df[['K12_Index', 'PostSec_Index', 'Total_Index']] = (spend / spend[base]) * 100
+    return df
+
+
+def annual_frame(pop: PopulationMatrix, annual: AnnualSpending, geo: str = GEO,
+                 start: int = BASE_YEAR, end=None, prices: str = 'nominal') -> pd.DataFrame:
+    """
+    The dense counterpart of build_integrated_df(): every fiscal year
+    from start, with its flag, Q1 population, per-capita and
+    start = 100 index columns.
+    """
+    years, population, values, pos = annual.aligned(pop, geo, start, end)
+    df = pd.DataFrame(values, columns=COMPONENTS)
+    df.insert(0, 'Year', years)
+    df.insert(0, 'Fiscal_Year', fiscal_labels(years))
+    df.insert(2, 'Flag', annual.flags[pos])
+    df.insert(3, 'Population', population.astype('int64'))
+    if prices == 'real':
+        df = deflate(df, COMPONENTS)
+    return add_metrics(df)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+#  MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Gap-free annual education spending vs Alberta population.')
+    parser.add_argument('--start', type=int, default=BASE_YEAR,
+                        help=f'first fiscal year, also the index base (default: {BASE_YEAR})')
+    parser.add_argument('--prices', choices=PRICES, default='nominal',
+                        help="nominal dollars, or 'real' for the latest year's dollars "
+                             '(default: nominal)')
+    parser.add_argument('--parquet', action='store_true',
+                        help='also write a .parquet copy (needs pyarrow)')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure(args, 'spending_series')
+
+    with stage('load_population', 'data'):
+        pop = PopulationMatrix.from_frame(load_population_table(DATA_CSV))
+    with stage('load_annual_spending', 'data'):
+        annual = load_annual_spending()
+    with stage('annual_frame', 'data'):
+        try:
+            df = annual_frame(pop, annual, start=args.start, prices=args.prices)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    print(df[['Fiscal_Year', 'Flag', 'Population', 'Total_M', 'Total_PerCapita', 'Total_Index']]
+          .to_string(index=False, float_format='{:,.1f}'.format))
+    path = OUTPUT_CSV if args.prices == 'nominal' else \
+        OUTPUT_CSV.with_name(f'{OUTPUT_CSV.stem}_{args.prices}{OUTPUT_CSV.suffix}')
+    with stage('write_csv', 'io', file=path.name):
+        written = write_table(df, path, parquet=args.parquet)
+    print(f'Saved -> {path.parent.name}/: {describe(written)}')
+    profiling.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+statcan_data.py
+───────────────
+Shared loader for Statistics Canada Table 17-10-0009-01 (17100009.csv).
+
+The first load parses the CSV into a typed frame
+(REF_DATE datetime64, GEO category, VALUE int64) and saves it as a
+compressed .npz in the shared cache (data_store.CACHE_DIR). The .npz is
+named by the CSV's SHA-256, so every copy of the table in the checkout
+shares one parse; a small per-path stamp (size, mtime, SHA-256) lets
+warm runs skip hashing, so they never touch the CSV parser.
+
+The CSV is read in projected, filtered chunks (stream_table/read_table),
+so the same reader works on the much larger 17-10 demographic tables
+without loading them whole.
+
+PopulationMatrix pivots that frame once into a dense GEO × quarter
+array so charts slice rows and column ranges instead of re-masking
+the long table.
+
+Usage:
+    from statcan_data import load_population_table, PopulationMatrix
+    df  = load_population_table()
+    pop = PopulationMatrix.from_frame(df)
+    dates, values = pop.series('Alberta', '2012-01', '2025-01')
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_CSV   = data_store.source('17100009.csv')
+CACHE_DIR  = data_store.CACHE_DIR
+
+# Bump when the cached layout or the parsing rules change.
+CACHE_VERSION = 1
+
+COLUMNS = ['REF_DATE', 'GEO', 'VALUE']
+
+# Rows parsed per chunk by stream_table(); bounds peak memory on large tables.
+CHUNK_ROWS = 250_000
+
+
+# ── Source fingerprint ───────────────────────────────────────────────────────
+
+def file_fingerprint(path, with_hash: bool = True) -> dict:
+    """Size, mtime and (optionally) SHA-256 of a source file."""
+    path = Path(path)
+    st = path.stat()
+    fp = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    if with_hash:
+        fp['sha256'] = data_store.sha256(path)
+    return fp
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────────
+
+def _isin(series: pd.Series, wanted) -> pd.Series:
+    if isinstance(wanted, str):
+        return series == wanted
+    return series.isin(list(wanted))
+
+
+def stream_table(path, columns=COLUMNS, geos=None, start=None, end=None,
+                 where=None, chunksize: int = CHUNK_ROWS):
+    """
+    Yield typed, filtered chunks of a StatCan CSV without ever holding
+    the whole file in memory.
+
+    Only `columns` are parsed (DGUID, VECTOR, STATUS, ... are skipped by
+    the reader). Each chunk is filtered to `geos`, the inclusive
+    REF_DATE range [start, end] and any `where` = {column: value(s)}
+    conditions — e.g. {'Sex': 'Both sexes'} on the 17-10 age/sex tables —
+    before it is handed on, so peak memory is one raw chunk plus the
+    rows kept. REF_DATE may be monthly ('YYYY-MM') or annual ('YYYY').
+    """
+    columns = list(dict.fromkeys([*columns, *(where or {})]))
+    dtype = {c: str for c in columns}
+    dtype['VALUE'] = 'float64'
+    lo = None if start is None else pd.Timestamp(str(start))
+    hi = None if end is None else pd.Timestamp(str(end))
+
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunksize):
+        keep = pd.Series(True, index=chunk.index)
+        if geos is not None:
+            keep &= _isin(chunk['GEO'], geos)
+        for col, wanted in (where or {}).items():
+            keep &= _isin(chunk[col], wanted)
+        # Suppressed / missing estimates carry no value; drop them so
+        # VALUE can be a plain int64 column.
+        keep &= chunk['VALUE'].notna()
+        chunk = chunk.loc[keep].assign(
+            REF_DATE=lambda c: pd.to_datetime(c['REF_DATE'], format='ISO8601'))
+        if lo is not None:
+            chunk = chunk.loc[chunk['REF_DATE'] >= lo]
+        if hi is not None:
+            chunk = chunk.loc[chunk['REF_DATE'] <= hi]
+        if len(chunk):
+            yield chunk.assign(VALUE=chunk['VALUE'].astype('int64'))
+
+
+def read_table(path, columns=COLUMNS, geos=None, start=None, end=None,
+               where=None, chunksize: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Collect stream_table() into one frame. Text dimensions (GEO, Sex,
+    Age group, ...) become categoricals once the chunks are joined.
+    """
+    columns = list(dict.fromkeys([*columns, *(where or {})]))
+    chunks = list(stream_table(path, columns, geos, start, end, where, chunksize))
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.DataFrame({c: pd.Series(dtype=str) for c in columns})
+        df['REF_DATE'] = pd.Series(dtype='datetime64[ns]')
+        df['VALUE'] = pd.Series(dtype='int64')
+    for col in df.columns.difference(['REF_DATE', 'VALUE']):
+        df[col] = df[col].astype('category')
+    return df[columns]
+
+
+def parse_population_csv(path) -> pd.DataFrame:
+    """Parse the raw CSV into the typed REF_DATE / GEO / VALUE frame."""
+    return read_table(path, COLUMNS)
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _meta_path(source: Path) -> Path:
+    """Stamp for one source path; different copies get different stamps."""
+    tag = hashlib.sha1(str(source).encode()).hexdigest()[:8]
+    return CACHE_DIR / f'{source.stem}.{tag}.meta.json'
+
+
+def _npz_path(source: Path, sha: str) -> Path:
+    """Parsed table for source content sha, shared by every identical copy."""
+    return CACHE_DIR / f'{source.stem}.{sha[:16]}.npz'
+
+
+def atomic_write_bytes(path: Path, write):
+    """Call write(fh) on a temp file next to path, then rename it into place."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as fh:
+        write(fh)
+    os.replace(tmp, path)
+
+
+def _save_cache(df: pd.DataFrame, source: Path, fingerprint: dict):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    npz_path = _npz_path(source, fingerprint['sha256'])
+    geo = df['GEO'].cat
+    atomic_write_bytes(npz_path, lambda fh: np.savez_compressed(
+        fh,
+        ref_date=df['REF_DATE'].to_numpy().astype('datetime64[ns]'),
+        geo_codes=geo.codes.to_numpy(),
+        geo_categories=np.asarray(geo.categories, dtype=str),
+        value=df['VALUE'].to_numpy(dtype='int64'),
+    ))
+    _write_meta(_meta_path(source), source, fingerprint)
+
+
+def _write_meta(meta_path: Path, source: Path, fingerprint: dict):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    meta = {'version': CACHE_VERSION, 'source': source.name, **fingerprint}
+    atomic_write_bytes(meta_path, lambda fh: fh.write(json.dumps(meta, indent=2).encode()))
+
+
+def _load_cache(npz_path: Path) -> pd.DataFrame:
+    with np.load(npz_path, allow_pickle=False) as npz:
+        geo = pd.Categorical.from_codes(npz['geo_codes'], categories=npz['geo_categories'])
+        return pd.DataFrame({
+            'REF_DATE': npz['ref_date'],
+            'GEO':      geo,
+            'VALUE':    npz['value'],
+        })
+
+
+def _read_meta(meta_path: Path):
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def load_population_table(path=DATA_CSV, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Load 17100009.csv as a typed REF_DATE / GEO / VALUE frame,
+    going through the on-disk cache unless use_cache is False.
+
+    The stamp for this path is trusted when size and mtime match. If
+    they moved (fresh checkout, touched file, first load of this copy)
+    the SHA-256 decides: a parse of the same bytes made from any other
+    path is reused and only the stamp is written.
+    """
+    source = Path(path).resolve()
+    if not use_cache:
+        return parse_population_csv(source)
+
+    meta_path = _meta_path(source)
+    meta = _read_meta(meta_path)
+    stamp = file_fingerprint(source, with_hash=False)
+    if meta is not None and stamp['size'] == meta['size'] and stamp['mtime_ns'] == meta['mtime_ns']:
+        npz_path = _npz_path(source, meta['sha256'])
+        if npz_path.exists():
+            return _load_cache(npz_path)
+
+    sha = data_store.sha256(source)
+    npz_path = _npz_path(source, sha)
+    if npz_path.exists():
+        _write_meta(meta_path, source, {**stamp, 'sha256': sha})
+        return _load_cache(npz_path)
+
+    df = parse_population_csv(source)
+    _save_cache(df, source, {**stamp, 'sha256': sha})
+    return df
+
+
+# ── GEO × quarter matrix ─────────────────────────────────────────────────────
+
+def _month_number(when) -> int:
+    """Months since 0000-01; a bare year int means January of that year."""
+    if isinstance(when, (int, np.integer)):
+        return int(when) * 12
+    ts = pd.Timestamp(when)
+    return ts.year * 12 + ts.month - 1
+
+
+class PopulationMatrix:
+    """
+    Dense geographies × quarters view of the long-format table.
+
+    values[i, j] is the population of geos[i] in quarter dates[j]
+    (NaN where StatCan has no estimate, e.g. Nunavut before 1991).
+    Quarters form a contiguous grid, so a date maps to its column by
+    arithmetic and a GEO maps to its row through a dict — both O(1).
+    Every accessor slices the matrix, so results are views, not copies.
+    """
+
+    def __init__(self, values: np.ndarray, geos, first_month: int):
+        self.values = values
+        self.geos = list(geos)
+        self.first_month = first_month
+        self._row = {g: i for i, g in enumerate(self.geos)}
+        months = first_month + 3 * np.arange(values.shape[1])
+        self.dates = (months - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]')
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'PopulationMatrix':
+        """Pivot a REF_DATE / GEO / VALUE frame in one vectorized pass."""
+        geo = df['GEO'].astype('category').cat
+        months = df['REF_DATE'].to_numpy().astype('datetime64[M]').astype('int64') + 1970 * 12
+        first = int(months.min())
+        cols = (months - first) // 3
+        values = np.full((len(geo.categories), int(cols.max()) + 1), np.nan)
+        values[geo.codes.to_numpy(), cols] = df['VALUE'].to_numpy(dtype='float64')
+        return cls(values, geo.categories, first)
+
+    # -- lookups ---------------------------------------------------------------
+
+    def row(self, geo: str) -> int:
+        return self._row[geo]
+
+    def column(self, when) -> int:
+        offset = _month_number(when) - self.first_month
+        if offset % 3 or not 0 <= offset // 3 < self.values.shape[1]:
+            raise KeyError(f'{when!r} is not a quarter in this table')
+        return offset // 3
+
+    def columns(self, start=None, end=None) -> slice:
+        """Column slice for the inclusive date range [start, end]."""
+        n = self.values.shape[1]
+        lo = 0 if start is None else -(-(_month_number(start) - self.first_month) // 3)
+        hi = n if end is None else (_month_number(end) - self.first_month) // 3 + 1
+        return slice(min(max(lo, 0), n), min(max(hi, 0), n))
+
+    # -- slices ----------------------------------------------------------------
+
+    def series(self, geo: str, start=None, end=None):
+        """(dates, values) for one GEO over [start, end] — both views."""
+        cols = self.columns(start, end)
+        return self.dates[cols], self.values[self.row(geo), cols]
+
+    def annual_matrix(self, month: int = 1, start=None, end=None):
+        """
+        (years, values) for every GEO sampled once a year at the given
+        month (1 = Q1 / January): values is a geos × years strided view.
+        """
+        cols = self.columns(start, end)
+        first = cols.start
+        phase = (month - 1 - (self.first_month + 3 * first)) % 12
+        if phase % 3:
+            raise KeyError(f'month {month} is not a quarter month in this table')
+        step = slice(first + phase // 3, cols.stop, 4)
+        years = self.dates[step].astype('datetime64[Y]').astype('int64') + 1970
+        return years, self.values[:, step]
+
+    def annual(self, geo: str, month: int = 1, start=None, end=None):
+        """(years, values) for one GEO, one sample a year — a view."""
+        years, values = self.annual_matrix(month, start, end)
+        return years, values[self.row(geo)]
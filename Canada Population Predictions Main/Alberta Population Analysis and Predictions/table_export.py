@@ -0,0 +1,80 @@
+"""
+table_export.py
+───────────────
+Dirty-checking writer for the derived CSV outputs
+(alberta_yoy_growth.csv, provincial_yoy_growth.csv,
+budget_data/population_vs_spending.csv, budget_data/education_spending_*.csv).
+
+Each table is serialised in memory first and compared with the file
+already on disk (size, then SHA-256). Identical content leaves the file
+untouched, mtime included, so downstream rebuilds and syncs see no
+change; new content goes to a temp file that is renamed into place, so
+readers never see a half-written CSV.
+
+With parquet=True a .parquet copy is written next to the CSV under the
+same rule. Parquet needs pyarrow; without it only the CSV is written.
+
+Usage:
+    from table_export import write_table
+    written = write_table(df, 'alberta_yoy_growth.csv', parquet=True)
+    # {Path('alberta_yoy_growth.csv'): False, Path('alberta_yoy_growth.parquet'): True}
+"""
+
+import hashlib
+import io
+from pathlib import Path
+
+import pandas as pd
+
+from data_store import sha256
+from statcan_data import atomic_write_bytes
+
+
+def write_if_changed(path, data: bytes) -> bool:
+    """Atomically write data to path unless it already holds exactly that; True if written."""
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(data) and sha256(path) == hashlib.sha256(data).hexdigest():
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, lambda fh: fh.write(data))
+    return True
+
+
+def csv_bytes(df: pd.DataFrame, index: bool = False, **kwargs) -> bytes:
+    """The bytes df.to_csv(path, ...) would write."""
+    return df.to_csv(index=index, **kwargs).encode('utf-8')
+
+
+def parquet_bytes(df: pd.DataFrame, index: bool = False):
+    """df as Parquet bytes, or None when pyarrow is not installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=index)
+    return buf.getvalue()
+
+
+def write_table(df: pd.DataFrame, path, parquet: bool = False, index: bool = False, **csv_kwargs) -> dict:
+    """
+    Write df to path as CSV (and path.with_suffix('.parquet') if asked),
+    skipping each file whose content is unchanged. Returns
+    {path: written?} for every file considered.
+    """
+    path = Path(path)
+    written = {path: write_if_changed(path, csv_bytes(df, index, **csv_kwargs))}
+    if parquet:
+        data = parquet_bytes(df, index)
+        if data is not None:
+            pq = path.with_suffix('.parquet')
+            written[pq] = write_if_changed(pq, data)
+    return written
+
+
+def describe(written: dict) -> str:
+    """'a.csv (unchanged), a.parquet' for progress messages."""
+    return ', '.join(p.name + ('' if changed else ' (unchanged)') for p, changed in written.items())
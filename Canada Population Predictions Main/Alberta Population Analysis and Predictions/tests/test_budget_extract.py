@@ -0,0 +1,40 @@
+import openpyxl
+
+import budget_extract as be
+
+
+def _workbook(tmp_path, k12, psec):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Expense Summary'
+    for row in [
+        ('Budget 2025 - Expense Summary',),
+        ('(millions of dollars)',),
+        (None, '2023-24', '2024-25', None, '2025-26'),
+        (None, 'Actual', 'Budget', 'Forecast', 'Estimate'),
+        ('Operating Expense:',),
+        ('    Education (Kinder - Gr. 12)', *k12),
+        ('Advanced Ed (post-second.)', *psec),
+    ]:
+        ws.append(row)
+    path = tmp_path / 'expense_tables_2025-28.xlsx'
+    wb.save(path)
+    return path
+
+
+def test_extract_expense_workbook(tmp_path):
+    df = be.extract_expense_workbook(_workbook(tmp_path, [8878, 9252, 9457, 9883.4],
+                                               [6233, 6305, 6628, 6635]))
+    assert df['Fiscal_Year'].tolist() == ['2023-24', '2024-25', '2024-25 (F)', '2025-26']
+    assert df['Type'].tolist() == ['Actual', 'Budget', 'Forecast', 'Estimate']
+    assert df['K12_Operating_Expense'].tolist() == [8878, 9252, 9457, 9883]
+    assert df['Total_Education_Expense'].tolist() == [15111, 15557, 16085, 16518]
+    assert (df['Budget_Year'] == 'Budget 2025').all()
+
+
+def test_blank_cells_skip_their_column(tmp_path):
+    df = be.extract_expense_workbook(_workbook(tmp_path, [8878, None, 9457, 9883],
+                                               [6233, 6305, 6628, None]))
+    assert df['Fiscal_Year'].tolist() == ['2023-24', '2024-25 (F)']
+    assert df['Total_Education_Expense'].tolist() == [15111, 16085]
+    assert df.columns.tolist() == be.COLUMNS
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cpi_index as ci
+
+
+def _vintages():
+    # 2010: Actual beats an Estimate; 2011: two Forecasts, the later budget
+    # wins; 2012: Estimate beats a later Forecast; 2013: reported by none.
+    return pd.DataFrame([
+        ('Budget 2012', 2010, 'Estimate', 2.0),
+        ('Budget 2013', 2010, 'Actual',   1.0),
+        ('Budget 2012', 2011, 'Forecast', 3.0),
+        ('Budget 2013', 2011, 'Forecast', 2.0),
+        ('Budget 2012', 2012, 'Estimate', 4.0),
+        ('Budget 2013', 2012, 'Forecast', 5.0),
+        ('Budget 2013', 2014, 'Forecast', 2.0),
+    ], columns=['Budget_Year', 'Year', 'Type', 'Rate'])
+
+
+def test_reconcile_ranks_and_interpolates():
+    index = ci.reconcile(_vintages())
+    np.testing.assert_array_equal(index.years, [2010, 2011, 2012, 2013, 2014])
+    np.testing.assert_allclose(index.rates, [1.0, 2.0, 4.0, 3.0, 2.0])
+    assert list(index.flags) == ['actual', 'forecast', 'estimate', 'interpolated', 'forecast']
+    assert list(index.budgets) == ['Budget 2013', 'Budget 2013', 'Budget 2012', '', 'Budget 2013']
+
+
+def test_level_chains_from_the_first_year():
+    index = ci.reconcile(_vintages())
+    np.testing.assert_allclose(index.level, [100, 102, 106.08, 109.2624, 111.447648])
+
+
+def test_deflate_restates_in_base_year_dollars():
+    index = ci.reconcile(_vintages())
+    df = pd.DataFrame({'Year': [2011, 2012, 2014], 'X': [100.0, 100.0, 100.0]})
+
+    real = ci.deflate(df, ['X'], index=index)
+    np.testing.assert_allclose(real['X'], [100 * 111.447648 / 102, 100 * 1.03 * 1.02, 100])
+    assert ci.price_label(real) == 'Real 2014 dollars'
+    assert ci.price_label(df) == ci.NOMINAL
+
+    np.testing.assert_allclose(ci.deflate(df, ['X'], base=2011, index=index)['X'],
+                               [100, 100 / 1.04, 100 * 102 / 111.447648])
+    np.testing.assert_allclose(index.factor([2013], 2012), [1 / 1.03])
+
+
+def test_factor_outside_the_index_raises():
+    index = ci.reconcile(_vintages())
+    with pytest.raises(ValueError, match='CPI covers 2010-2014'):
+        index.factor([2009, 2012], 2014)
+    with pytest.raises(ValueError):
+        index.factor([2012], 2015)
+
+
+def test_budget_workbooks_reconcile():
+    index = ci.load_cpi_index()
+    frame = index.to_frame().set_index('Year')
+    assert frame.loc[2011, 'CPI_Level'] == 100
+    assert frame.loc[2018, 'Flag'] == 'interpolated'
+    assert frame.loc[2018, 'CPI_Change_Pct'] == pytest.approx(1.7)
+    assert tuple(frame.loc[2022, ['CPI_Change_Pct', 'Flag', 'Source']]) == (6.4, 'actual', 'Budget 2025')
+    assert frame.loc[2025, 'CPI_Level'] == pytest.approx(138.27, abs=0.01)
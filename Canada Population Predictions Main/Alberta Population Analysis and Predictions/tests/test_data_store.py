@@ -0,0 +1,65 @@
+import os
+import stat
+
+import pytest
+
+import data_store as ds
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ds, 'STORE_DIR', tmp_path / 'store')
+
+
+def _file(tmp_path, name, data=b'bytes'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_put_and_checkout_copy(tmp_path):
+    sha = ds.put(_file(tmp_path, 'a.csv'))
+    obj = ds.object_path(sha)
+    assert obj.read_bytes() == b'bytes'
+    assert not obj.stat().st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+    out = tmp_path / 'out' / 'a.csv'
+    assert ds.checkout(sha, out)
+    assert out.read_bytes() == b'bytes'
+    assert not os.path.samefile(obj, out)
+    assert not ds.checkout('0' * 64, tmp_path / 'missing.csv')
+
+
+def test_refs_point_at_objects(tmp_path):
+    assert ds.read_ref('charts/a.png') is None
+    sha = ds.save_ref('charts/a.png', _file(tmp_path, 'a.png', b'png'))
+    assert ds.read_ref('charts/a.png') == sha
+
+    out = tmp_path / 'restored.png'
+    assert ds.restore_ref('charts/a.png', out)
+    assert out.read_bytes() == b'png'
+
+    ds.object_path(sha).chmod(0o644)
+    ds.object_path(sha).unlink()
+    assert ds.read_ref('charts/a.png') is None
+    assert not ds.restore_ref('charts/a.png', out)
+
+
+def test_dedupe_links_copies_and_drops_edited_objects(tmp_path):
+    root = tmp_path / 'repo'
+    (root / 'a').mkdir(parents=True)
+    (root / 'b').mkdir()
+    first = _file(root / 'a', '17100009.csv', b'x' * 100)
+    second = _file(root / 'b', '17100009.csv', b'x' * 100)
+
+    assert ds.dedupe(root) == (1, 100)
+    sha = ds.sha256(first)
+    assert os.path.samefile(first, second)
+    assert os.path.samefile(first, ds.object_path(sha))
+
+    # An in-place write reaches the object through the shared inode.
+    with open(first, 'r+b') as fh:
+        fh.write(b'y')
+    assert not ds.checkout(sha, tmp_path / 'out.csv')
+    assert not ds.object_path(sha).exists()
+    assert not (tmp_path / 'out.csv').exists()
@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import population_forecast as pf
+from statcan_data import PopulationMatrix
+
+ALPHA, BETA = 0.5, 0.4
+HORIZON = 6
+
+
+def _series(rows=3, quarters=48, seed=0):
+    rng = np.random.default_rng(seed)
+    drift = np.linspace(1_000, 5_000, rows)[:, None]
+    return 1e6 + np.cumsum(drift + rng.normal(0, 2_000, (rows, quarters)), axis=1)
+
+
+def _holt_variance_factors():
+    """Var(h) / σ² implied by fit_holt's intervals for one (α, β) pair."""
+    mean, _, upper, _ = pf.fit_holt(_series(), HORIZON, z=1.0,
+                                    alphas=np.array([ALPHA]), betas=np.array([BETA]))
+    half = upper - mean
+    return (half / half[:, :1]) ** 2
+
+
+def test_holt_variance_matches_closed_form():
+    # ETS(A,A,N): 1 + Σ_{j=1}^{h-1} (α(1 + βj))²
+    expected = 1 + np.concatenate([[0], np.cumsum((ALPHA * (1 + BETA * np.arange(1, HORIZON))) ** 2)])
+    np.testing.assert_allclose(expected, [1, 1.49, 2.30, 3.51, 5.20, 7.45])
+    np.testing.assert_allclose(_holt_variance_factors(), np.broadcast_to(expected, (3, HORIZON)))
+
+
+def test_holt_variance_matches_simulation():
+    rng = np.random.default_rng(1)
+    e = rng.standard_normal((200_000, HORIZON))
+    level = trend = np.zeros(len(e))
+    paths = np.empty_like(e)
+    for h in range(HORIZON):
+        step = level + trend
+        paths[:, h] = step + e[:, h]
+        level = step + ALPHA * e[:, h]
+        trend = trend + ALPHA * BETA * e[:, h]
+    np.testing.assert_allclose(_holt_variance_factors()[0], paths.var(axis=0), rtol=0.03)
+
+
+@pytest.mark.parametrize('model', pf.MODELS)
+def test_bootstrap_bounds_do_not_depend_on_jobs(model):
+    y = _series()
+    holt = (np.full(3, ALPHA), np.full(3, BETA)) if model == 'holt' else None
+    args = (model, y, HORIZON, 0.9, 600, 4, 7, holt)
+    serial = pf.bootstrap_bounds(*args)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = pf.bootstrap_bounds(*args, mapper=pool.map)
+    for a, b in zip(serial, parallel):
+        np.testing.assert_array_equal(a, b)
+    assert (serial[0] < serial[1]).all()
+
+
+def test_bootstrap_bounds_depend_on_seed():
+    y = _series()
+    a = pf.bootstrap_bounds('linear', y, HORIZON, 0.9, 300, 4, 1)
+    b = pf.bootstrap_bounds('linear', y, HORIZON, 0.9, 300, 4, 2)
+    assert not np.array_equal(a[0], b[0])
+
+
+def test_forecast_all_leaves_out_geos_without_a_fit_window():
+    dates = pd.date_range('1990-01-01', '2013-10-01', freq='QS-JAN')
+    old = dates[dates < '1992-01-01']
+    pop = PopulationMatrix.from_frame(pd.DataFrame({
+        'REF_DATE': dates.append(old),
+        'GEO': ['Alberta'] * len(dates) + ['Old'] * len(old),
+        'VALUE': np.r_[1000 + 10 * np.arange(len(dates)), np.full(len(old), 50)]}))
+
+    for fc in pf.forecast_all(pop, horizon=4).values():
+        assert fc.geos == ['Alberta']
+        assert np.isfinite(fc.mean).all() and np.isfinite(fc.lower).all()
+        assert (fc.to_frame()['GEO'] == 'Alberta').all()
+    with pytest.raises(ValueError, match='no GEO has enough quarters'):
+        pf.forecast_all(pop, start='2013-07')
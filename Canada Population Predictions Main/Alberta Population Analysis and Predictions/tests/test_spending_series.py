@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import spending_series as ss
+from statcan_data import load_population_table, PopulationMatrix
+
+
+def _rows():
+    # K-12 and post-secondary both grow 10% a year. 2012-13: Estimate beats
+    # a later Forecast; 2013-14: Estimate beats Target; 2014-15 and 2015-16:
+    # no budget; 2016-17: Actual beats a later Estimate, the latest Actual wins.
+    return pd.DataFrame([
+        ('Budget 2013', '2012-13', 'Estimate', 110.0,  55.0),
+        ('Budget 2014', '2012-13', 'Forecast', 100.0,  50.0),
+        ('Budget 2013', '2013-14', 'Target',   200.0, 100.0),
+        ('Budget 2014', '2013-14', 'Estimate', 121.0,  60.5),
+        ('Budget 2017', '2016-17', 'Actual',   150.0,  75.0),
+        ('Budget 2018', '2016-17', 'Actual',   161.051, 80.5255),
+        ('Budget 2019', '2016-17', 'Estimate', 170.0,  85.0),
+    ], columns=['Budget_Year', 'Fiscal_Year', 'Type',
+                'K12_Operating_Expense', 'PostSecondary_Operating_Expense'])
+
+
+def test_reconcile_ranks_and_interpolates():
+    annual = ss.reconcile(_rows())
+    np.testing.assert_array_equal(annual.years, [2012, 2013, 2014, 2015, 2016])
+    k12 = 110 * 1.1 ** np.arange(5)
+    np.testing.assert_allclose(annual.values, np.column_stack([k12, k12 / 2, k12 * 1.5]))
+    assert list(annual.flags) == ['estimate', 'estimate', 'interpolated', 'interpolated', 'actual']
+    assert list(annual.budgets) == ['Budget 2013', 'Budget 2014', '', '', 'Budget 2018']
+
+
+def test_annual_frame_indexes_from_start():
+    annual = ss.reconcile(_rows())
+    population = pd.DataFrame({
+        'REF_DATE': pd.to_datetime([f'{y}-01-01' for y in range(2011, 2018)]),
+        'GEO': 'Alberta', 'VALUE': 1_000_000 * 1.05 ** np.arange(-2, 5)})
+    df = ss.annual_frame(PopulationMatrix.from_frame(population), annual, start=2013, end=2015)
+
+    assert list(df['Fiscal_Year']) == ['2013-14', '2014-15', '2015-16']
+    np.testing.assert_allclose(df['Pop_Index'], [100, 105, 110.25])
+    np.testing.assert_allclose(df['Total_Index'], [100, 110, 121])
+    np.testing.assert_allclose(df['K12_PerCapita'], [121, 126.76190476, 132.79818594])
+
+    with pytest.raises(ValueError, match='no year between 2030'):
+        ss.annual_frame(PopulationMatrix.from_frame(population), annual, start=2030)
+
+
+def test_budget_documents_reconcile():
+    annual = ss.load_annual_spending()
+    frame = annual.to_frame().set_index('Year')
+    assert tuple(frame.loc[2012, ['Total_M', 'Flag', 'Source']]) == (9035, 'estimate', 'Budget 2012')
+    assert (frame.loc[2016:2021, 'Flag'] == 'interpolated').all()
+    np.testing.assert_allclose(frame['Total_M'], frame['K12_M'] + frame['PostSec_M'])
+
+    # Unreported years grow at the constant rate between their neighbours.
+    k12 = frame.loc[2015:2022, 'K12_M'].to_numpy()
+    np.testing.assert_allclose(k12[1:] / k12[:-1], (k12[-1] / k12[0]) ** (1 / 7))
+
+    df = ss.annual_frame(PopulationMatrix.from_frame(load_population_table(ss.DATA_CSV)), annual)
+    assert df['Fiscal_Year'].iloc[[0, -1]].tolist() == ['2012-13', '2025-26']
+    assert df['Total_Index'].iloc[-1] == pytest.approx(182.8, abs=0.05)
+
+
+def test_aligned_trims_to_years_with_population():
+    annual = ss.reconcile(_rows())
+    population = pd.DataFrame({
+        'REF_DATE': pd.to_datetime([f'{y}-01-01' for y in range(2011, 2018)] * 2),
+        'GEO': ['Alberta'] * 7 + ['Old'] * 7,
+        'VALUE': [1_000_000] * 7 + [500] * 7})
+    # 'Old' stops reporting after 2014; the matrix holds NaN from 2015 on.
+    pop = PopulationMatrix.from_frame(population[~((population['GEO'] == 'Old')
+                                                   & (population['REF_DATE'].dt.year > 2014))])
+
+    years, values, _, _ = annual.aligned(pop, 'Old')
+    assert years.tolist() == [2012, 2013, 2014]
+    assert values.tolist() == [500, 500, 500]
+    with pytest.raises(ValueError, match='population 2011-2014'):
+        annual.aligned(pop, 'Old', start=2015)
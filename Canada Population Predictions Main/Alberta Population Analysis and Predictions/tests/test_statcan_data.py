@@ -0,0 +1,128 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import statcan_data as sd
+
+CSV = '''REF_DATE,GEO,DGUID,UOM,VALUE,STATUS
+2012-01,Alberta,x,Persons,100,
+2012-04,Alberta,x,Persons,110,
+2012-01,Canada,x,Persons,1000,
+2012-04,Canada,x,Persons,,..
+'''
+
+
+def _csv(tmp_path, text=CSV, name='table.csv'):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_read_table_filters_and_projects(tmp_path):
+    df = sd.read_table(_csv(tmp_path), geos='Canada', where={'UOM': 'Persons'}, chunksize=2)
+    assert df.columns.tolist() == ['REF_DATE', 'GEO', 'VALUE', 'UOM']
+    assert df['VALUE'].tolist() == [1000]
+    assert df['VALUE'].dtype == 'int64'
+
+
+def test_read_table_with_no_matches_keeps_the_where_columns(tmp_path):
+    df = sd.read_table(_csv(tmp_path), geos='Nowhere', where={'UOM': 'Persons'})
+    assert df.empty
+    assert df.columns.tolist() == ['REF_DATE', 'GEO', 'VALUE', 'UOM']
+    assert df['REF_DATE'].dtype == 'datetime64[ns]'
+    assert isinstance(df['UOM'].dtype, pd.CategoricalDtype)
+
+
+# ── npz cache ────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def parses(tmp_path, monkeypatch):
+    """Cache in tmp_path; returns the list of paths actually parsed."""
+    monkeypatch.setattr(sd, 'CACHE_DIR', tmp_path / 'cache')
+    seen = []
+    parse = sd.parse_population_csv
+    monkeypatch.setattr(sd, 'parse_population_csv', lambda path: seen.append(path) or parse(path))
+    return seen
+
+
+def test_cache_reparses_only_when_the_content_changes(tmp_path, parses):
+    path = _csv(tmp_path)
+    assert sd.load_population_table(path)['VALUE'].tolist() == [100, 110, 1000]
+    assert sd.load_population_table(path)['VALUE'].tolist() == [100, 110, 1000]
+    assert len(parses) == 1
+
+    # Same bytes, new size/mtime stamp: the SHA matches, the parse is reused.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert sd.load_population_table(path)['VALUE'].tolist() == [100, 110, 1000]
+    assert len(parses) == 1
+    meta = json.loads(sd._meta_path(path.resolve()).read_text())
+    assert meta['mtime_ns'] == st.st_mtime_ns + 10**9
+
+    # Same size, different bytes: a new SHA and a new parse.
+    path.write_text(CSV.replace(',100,', ',101,'))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    assert sd.load_population_table(path)['VALUE'].tolist() == [101, 110, 1000]
+    assert len(parses) == 2
+    assert len(list((tmp_path / 'cache').glob('table.*.npz'))) == 2
+
+
+def test_cache_is_shared_by_identical_copies(tmp_path, parses):
+    (tmp_path / 'copy').mkdir()
+    sd.load_population_table(_csv(tmp_path))
+    df = sd.load_population_table(_csv(tmp_path / 'copy'))
+    assert len(parses) == 1
+    assert df['GEO'].tolist() == ['Alberta', 'Alberta', 'Canada']
+
+
+# ── PopulationMatrix ─────────────────────────────────────────────────────────
+
+def _matrix():
+    # Twelve quarters from 2011-07 (so the grid does not start in January).
+    dates = pd.date_range('2011-07-01', periods=12, freq='QS-JAN')
+    return sd.PopulationMatrix.from_frame(pd.DataFrame({
+        'REF_DATE': dates.append(dates),
+        'GEO': ['Alberta'] * 12 + ['Canada'] * 12,
+        'VALUE': np.r_[np.arange(12), 100 + np.arange(12)]}))
+
+
+def test_column_maps_only_quarters_in_the_table():
+    pop = _matrix()
+    assert pop.column('2011-07') == 0
+    assert pop.column('2012-01-01') == 2
+    assert pop.column(2014) == 10
+    for when in ['2012-02', '2011-04', '2014-07', 2030]:
+        with pytest.raises(KeyError):
+            pop.column(when)
+
+
+def test_columns_rounds_inward_and_clamps():
+    pop = _matrix()
+    assert pop.columns('2012-02', '2012-12') == slice(3, 6)
+    assert pop.columns(1990, 2030) == slice(0, 12)
+    assert pop.columns(2030) == slice(12, 12)
+    assert pop.columns(end=1990) == slice(0, 0)
+    dates, values = pop.series('Canada', '2012-02', '2012-12')
+    assert values.tolist() == [103, 104, 105]
+    assert str(dates[0]) == '2012-04-01'
+
+
+def test_annual_matrix_follows_the_month_phase():
+    pop = _matrix()
+    years, values = pop.annual_matrix(month=1)
+    assert years.tolist() == [2012, 2013, 2014]
+    assert values.tolist() == [[2, 6, 10], [102, 106, 110]]
+    assert np.shares_memory(values, pop.values)
+
+    years, values = pop.annual('Alberta', month=7)
+    assert years.tolist() == [2011, 2012, 2013]
+    assert values.tolist() == [0, 4, 8]
+
+    years, values = pop.annual('Alberta', start='2012-04')
+    assert years.tolist() == [2013, 2014]
+
+    with pytest.raises(KeyError, match='month 2'):
+        pop.annual_matrix(month=2)
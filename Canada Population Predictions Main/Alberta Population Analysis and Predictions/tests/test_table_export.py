@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+import table_export as te
+
+
+def _age(path):
+    """Push path's mtime an hour back, so a rewrite would show."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 3600 * 10**9))
+    return path.stat().st_mtime_ns
+
+
+def test_write_if_changed_leaves_identical_files_alone(tmp_path):
+    path = tmp_path / 'out' / 'table.csv'
+    assert te.write_if_changed(path, b'a,b\n1,2\n')
+    mtime, inode = _age(path), path.stat().st_ino
+
+    assert not te.write_if_changed(path, b'a,b\n1,2\n')
+    assert path.stat().st_mtime_ns == mtime
+    assert path.stat().st_ino == inode
+
+    # Same size, different bytes: rewritten.
+    assert te.write_if_changed(path, b'a,b\n1,3\n')
+    assert path.read_bytes() == b'a,b\n1,3\n'
+    assert not list(path.parent.glob('*.tmp'))
+
+
+def test_write_table_reports_each_file(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'Year': [2024, 2025], 'Value': [1.5, 2.0]})
+    path = tmp_path / 'table.csv'
+    pq = path.with_suffix('.parquet')
+
+    assert te.write_table(df, path, parquet=True) == {path: True, pq: True}
+    mtimes = {p: _age(p) for p in (path, pq)}
+    assert te.write_table(df, path, parquet=True) == {path: False, pq: False}
+    assert {p: p.stat().st_mtime_ns for p in (path, pq)} == mtimes
+    assert te.describe({path: False, pq: True}) == 'table.csv (unchanged), table.parquet'
+
+    pd.testing.assert_frame_equal(pd.read_csv(path), df)
+    assert te.write_table(df.assign(Value=[1.5, 2.5]), path) == {path: True}